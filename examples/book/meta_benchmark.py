@@ -0,0 +1,129 @@
+"""Microbenchmark for aggregating the _meta primary keys of a document.
+
+Compares the set based Transform.get_primary_keys with the previous list
+based version on the _keys of large fan-out book documents. No database
+connection is required.
+
+    python examples/book/meta_benchmark.py --nsize 5000
+"""
+
+import random
+import timeit
+import typing as t
+
+import click
+
+from pgsync.transform import Transform
+
+
+def legacy_get_primary_keys(primary_keys: dict) -> dict:
+    """Transform.get_primary_keys before the set based aggregator."""
+
+    def squash_list(values, _values=None):
+        if not _values:
+            _values = []
+        if isinstance(values, dict):
+            if len(values) == 1:
+                _values.append(values)
+            else:
+                for key, value in values.items():
+                    _values.extend(squash_list({key: value}))
+        elif isinstance(values, list):
+            for value in values:
+                _values.extend(squash_list(value))
+        return _values
+
+    target = []
+    for values in squash_list(primary_keys):
+        if len(values) > 1:
+            for key, value in values.items():
+                target.append({key: value})
+            continue
+        target.append(values)
+
+    target3 = []
+    for values in target:
+        for key, value in values.items():
+            if isinstance(value, dict):
+                target3.append({key: value})
+            elif isinstance(value, list):
+                _value: t.Dict[t.Any, t.Any] = {}
+                for v in value:
+                    for _k, _v in v.items():
+                        _value.setdefault(_k, [])
+                        if isinstance(_v, list):
+                            _value[_k].extend(_v)
+                        else:
+                            _value[_k].append(_v)
+                target3.append({key: _value})
+
+    target4 = {}
+    for values in target3:
+        for key, value in values.items():
+            if key not in target4:
+                target4[key] = {}
+            for k, v in value.items():
+                if k not in target4[key]:
+                    target4[key][k] = []
+                if isinstance(v, list):
+                    for _v in v:
+                        if _v not in target4[key][k]:
+                            target4[key][k].append(_v)
+                else:
+                    if v not in target4[key][k]:
+                        target4[key][k].append(v)
+                target4[key][k] = sorted(target4[key][k])
+    return target4
+
+
+def book_keys(nsize: int) -> list:
+    """The _keys of a book with nsize authors and languages."""
+    ids: t.Callable[[], int] = lambda: random.randint(1, nsize)  # noqa: E731
+    return [
+        {"publisher": {"id": [ids()]}},
+        [
+            [
+                {"author": [{"id": [ids()]}]},
+                [
+                    {"city": {"id": ids()}},
+                    [{"country": {"id": ids()}}, {"continent": {"id": 1}}],
+                ],
+                {"book_author": [{"id": [ids()]}]},
+            ]
+            for _ in range(nsize)
+        ],
+        [
+            {"language": [{"id": [ids()]}], "book_language": [{"id": [i]}]}
+            for i in range(nsize)
+        ],
+        {"rating": {"id": [ids()]}},
+    ]
+
+
+@click.command()
+@click.option("--nsize", "-n", default=5000, help="Number of children")
+@click.option("--repeat", "-r", default=5, help="Number of repeats")
+def main(nsize: int, repeat: int) -> None:
+    keys: list = book_keys(nsize)
+
+    # both must build the same _meta
+    assert legacy_get_primary_keys(keys) == Transform.get_primary_keys(keys)
+
+    legacy: float = min(
+        timeit.repeat(
+            lambda: legacy_get_primary_keys(keys), number=1, repeat=repeat
+        )
+    )
+    set_based: float = min(
+        timeit.repeat(
+            lambda: Transform.get_primary_keys(keys), number=1, repeat=repeat
+        )
+    )
+    print(f"children:  {nsize}")
+    print(f"list:      {legacy * 1000:.1f}ms")
+    print(f"set based: {set_based * 1000:.1f}ms")
+    print(f"speedup:   {legacy / set_based:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
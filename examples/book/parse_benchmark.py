@@ -0,0 +1,170 @@
+"""Microbenchmark for parsing test_decoding rows.
+
+Compares the single pass LogicalSlotParser with the previous regex based
+parser on examples/book style rows. No database connection is required.
+
+    python examples/book/parse_benchmark.py --nsize 20000 --min-speedup 5
+"""
+
+import json
+import random
+import timeit
+import typing as t
+
+import click
+from faker import Faker
+
+from pgsync.base import Base, LogicalSlotParser, Payload
+from pgsync.constants import (
+    DELETE,
+    LOGICAL_SLOT_PREFIX,
+    LOGICAL_SLOT_SUFFIX,
+    TG_OPS,
+    UPDATE,
+)
+from pgsync.exc import LogicalSlotParseError
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def book_row(faker: Faker, tg_op: str) -> str:
+    """Generate a test_decoding row for the book table."""
+    columns: t.List[str] = [
+        f"id[integer]:{random.randint(1, 10**6)}",
+        f"isbn[character varying]:{_quote(faker.isbn13())}",
+        f"title[character varying]:{_quote(faker.sentence())}",
+        f"description[character varying]:{_quote(faker.text())}",
+        "copyright[character varying]:null",
+        f"tags[jsonb]:{_quote(json.dumps(faker.words()))}",
+        f"doc[jsonb]:{_quote(json.dumps(faker.pydict(5, value_types=[str, int])))}",
+        f"publisher_id[integer]:{random.randint(1, 100)}",
+        f"publish_date[timestamp without time zone]:{_quote(str(faker.date_time()))}",
+        f"rating[double precision]:{random.random() * 5}",
+    ]
+    if tg_op == DELETE:
+        # only the replica identity is logged
+        return f"table public.book: DELETE: {columns[0]}"
+    if tg_op == UPDATE and random.random() < 0.2:
+        return (
+            f"table public.book: UPDATE: old-key: {columns[0]} "
+            f"new-tuple: {' '.join(columns)}"
+        )
+    return f"table public.book: {tg_op}: {' '.join(columns)}"
+
+
+def legacy_parse_value(type_: str, value: str) -> t.Any:
+    """Base.parse_value before the single pass parser."""
+    if value.lower() == "null":
+        return None
+    if type_.lower() in Base.INT_TYPES:
+        value = int(value)
+    if type_.lower() in Base.CHAR_TYPES:
+        value = value.lstrip("'").rstrip("'")
+    if type_.lower() == "boolean":
+        value = bool(value)
+    if type_.lower() in Base.FLOAT_TYPES:
+        value = float(value)
+    return value
+
+
+def legacy_parse_logical_slot(row: str) -> Payload:
+    """Base.parse_logical_slot before the single pass parser."""
+
+    def _parse_logical_slot(data: str) -> t.Iterator[t.Tuple[str, t.Any]]:
+        pos: int = 0
+        while True:
+            match = LOGICAL_SLOT_SUFFIX.search(data, pos)
+            if not match:
+                break
+            key = (match.groupdict().get("key") or "").replace('"', "")
+            raw_value = match.groupdict().get("value") or ""
+            type_ = match.groupdict().get("type") or ""
+            yield key, legacy_parse_value(type_, raw_value)
+            start, end = match.span()
+            pos = end if end > start else end + 1
+
+    match = LOGICAL_SLOT_PREFIX.search(row)
+    if not match:
+        raise LogicalSlotParseError(f"No match for row: {row}")
+
+    data: dict = {"old": None, "new": None}
+    data.update(**match.groupdict())
+    payload: Payload = Payload(**data)
+    suffix: str = f"{row[match.span()[1]:]} "
+
+    if "old-key" in suffix and "new-tuple" in suffix:
+        i: int = suffix.find("old-key:")
+        j: int = suffix.find("new-tuple:")
+        for key, value in _parse_logical_slot(suffix[i + len("old-key:") : j]):
+            payload.old[key] = value
+        for key, value in _parse_logical_slot(suffix[j + len("new-tuple:") :]):
+            payload.new[key] = value
+    else:
+        for key, value in _parse_logical_slot(suffix):
+            payload.new[key] = value
+    return payload
+
+
+@click.command()
+@click.option("--nsize", "-n", default=20000, help="Number of rows")
+@click.option("--repeat", "-r", default=5, help="Number of repeats")
+@click.option(
+    "--min-speedup",
+    default=0.0,
+    help="Fail unless the single pass parser is this much faster",
+)
+def main(nsize: int, repeat: int, min_speedup: float) -> None:
+    faker: Faker = Faker()
+    tg_ops: t.List[str] = [op for op in TG_OPS if op != "TRUNCATE"]
+    rows: t.List[str] = [
+        book_row(faker, random.choice(tg_ops)) for _ in range(nsize)
+    ]
+    parser: LogicalSlotParser = LogicalSlotParser(
+        Base.INT_TYPES, Base.FLOAT_TYPES, Base.CHAR_TYPES
+    )
+
+    # both parsers must agree on the keys they extract
+    for row in rows[:100]:
+        old: Payload = legacy_parse_logical_slot(row)
+        new: Payload = parser.parse(row)
+        assert (old.tg_op, old.schema, old.table) == (
+            new.tg_op,
+            new.schema,
+            new.table,
+        )
+        assert old.new.keys() == new.new.keys()
+        assert old.old.keys() == new.old.keys()
+
+    legacy: float = min(
+        timeit.repeat(
+            lambda: [legacy_parse_logical_slot(row) for row in rows],
+            number=1,
+            repeat=repeat,
+        )
+    )
+    single_pass: float = min(
+        timeit.repeat(
+            lambda: [parser.parse(row) for row in rows],
+            number=1,
+            repeat=repeat,
+        )
+    )
+    print(f"rows:        {nsize}")
+    print(f"regex:       {legacy:.3f}s ({nsize / legacy:,.0f} rows/s)")
+    print(
+        f"single pass: {single_pass:.3f}s "
+        f"({nsize / single_pass:,.0f} rows/s)"
+    )
+    print(f"speedup:     {legacy / single_pass:.1f}x")
+    # timings vary with the machine and its load, so only checked on request
+    if legacy / single_pass < min_speedup:
+        raise click.ClickException(
+            f"single pass parser is {legacy / single_pass:.1f}x faster, "
+            f"expected at least {min_speedup}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import logging
 import os
 import random
+import re
 import threading
 import time
 import typing as t
@@ -19,12 +20,11 @@ from .constants import (
     BUILTIN_SCHEMAS,
     DEFAULT_SCHEMA,
     DELETE,
-    LOGICAL_SLOT_PREFIX,
-    LOGICAL_SLOT_SUFFIX,
     MATERIALIZED_VIEW,
     PLUGIN,
     TG_OPS,
     TRIGGER_FUNC,
+    TRUNCATE,
     UPDATE,
 )
 from .exc import (
@@ -152,6 +152,241 @@ class Payload(object):
         return constraints
 
 
+class LogicalSlotParser(object):
+    """
+    Single pass parser for test_decoding rows.
+
+    e.g.
+    table public.book: UPDATE: old-key: id[integer]:1 new-tuple: id[integer]:2 title[text]:'it''s'
+
+    Rows for a table and operation share the same column names and types
+    in the same order. The first such row is tokenized and compiled into a
+    row pattern with one capture group per column, along with a converter
+    for each (table, column). Every following row for that table is then
+    parsed with a single match and a single pass over the captured values.
+    Rows that do not fit the cached pattern (e.g. after DDL, with
+    unchanged TOAST values or with an old-key tuple) fall back to the
+    generic tokenizer.
+
+    Values are converted by type:
+    - integer and float types to int and float
+    - booleans as true/false
+    - character values without their quotes, embedded quotes ('')
+      unescaped
+    - other quoted values, e.g timestamps and json, kept as the literal
+    - unchanged TOAST values are omitted since their value is not sent
+    """
+
+    PREFIX = re.compile(
+        r'table ("[^"]*(?:""[^"]*)*"|[^.]+)'  # schema
+        r'\.("[^"]*(?:""[^"]*)*"|[^:]+)'  # table
+        r": ([A-Z]+):"  # tg_op
+    )
+    KEY = r'("[^"]*(?:""[^"]*)*"|[^\s\["]+)'  # "Weird ""Key""" or key
+    TYPE = r"\[([^:]+)\]:"  # e.g integer or character varying[]
+    QUOTED = r"'([^']*(?:''[^']*)*)'"  # 'it''s' without the quotes
+    BARE = r"(\S+)"  # null, numbers, booleans
+    COLUMN = re.compile(
+        rf" (?:(old-key:|new-tuple:)|{KEY}{TYPE}(?:{QUOTED}|{BARE}))"
+    )
+    NULL = "null"
+    UNCHANGED_TOAST = "unchanged-toast-datum"
+    OLD_KEY = "old-key:"
+
+    def __init__(
+        self,
+        int_types: t.Iterable[str],
+        float_types: t.Iterable[str],
+        char_types: t.Iterable[str],
+    ) -> None:
+        self.int_types: t.FrozenSet[str] = frozenset(int_types)
+        self.float_types: t.FrozenSet[str] = frozenset(float_types)
+        self.char_types: t.FrozenSet[str] = frozenset(char_types)
+        # types test_decoding prints without quotes
+        self.bare_types: t.FrozenSet[str] = (
+            self.int_types | self.float_types | {"boolean", "numeric"}
+        )
+        # type name -> converter for bare and quoted values
+        self._converters: t.Dict[str, t.Callable[[str], t.Any]] = {}
+        self._quoted_converters: t.Dict[str, t.Callable[[str], t.Any]] = {}
+        # row prefix e.g "table public.book: INSERT:" -> row plan
+        self._plans: t.Dict[str, _RowPlan] = {}
+
+    def converter(
+        self, type_: str, quoted: bool = False
+    ) -> t.Callable[[str], t.Any]:
+        """Return the (cached) converter for a type name."""
+        cache: dict = self._quoted_converters if quoted else self._converters
+        try:
+            return cache[type_]
+        except KeyError:
+            pass
+        name: str = type_.lower()
+        func: t.Callable[[str], t.Any]
+        if quoted:
+            # keep the literal as is e.g timestamps and json
+            func = _unescape if name in self.char_types else _quote
+        elif name in self.int_types:
+            func = int
+        elif name in self.float_types:
+            func = float
+        elif name == "boolean":
+            func = _boolean
+        else:
+            func = _literal
+        cache[type_] = func
+        return func
+
+    def parse(self, row: str) -> Payload:
+        """Parse a test_decoding row into a Payload."""
+        match: t.Optional[re.Match] = self.PREFIX.match(row)
+        if not match:
+            raise LogicalSlotParseError(f"No match for row: {row}")
+
+        # e.g "table public.book: INSERT:"
+        prefix: str = match.group()
+        plan: t.Optional[_RowPlan] = self._plans.get(prefix)
+        if plan is not None:
+            columns: t.Optional[re.Match] = plan.pattern.match(
+                row, match.end()
+            )
+            if columns is not None:
+                try:
+                    return Payload(
+                        tg_op=plan.tg_op,
+                        table=plan.table,
+                        schema=plan.schema,
+                        new={
+                            key: None if value is None else func(value)
+                            for key, func, value in zip(
+                                plan.keys, plan.converters, columns.groups()
+                            )
+                        },
+                    )
+                except ValueError as e:
+                    raise LogicalSlotParseError(f"{e} for row: {row}")
+
+        schema, table, tg_op = match.groups()
+        if tg_op not in TG_OPS:
+            raise LogicalSlotParseError(
+                f"Unknown {tg_op} operation for row: {row}"
+            )
+        payload: Payload = Payload(
+            tg_op=tg_op,
+            table=_unquote_identifier(table),
+            schema=_unquote_identifier(schema),
+        )
+        if tg_op == TRUNCATE:
+            return payload
+
+        tokens: t.List[tuple] = self.COLUMN.findall(row, match.end())
+        self._tokenize(row, payload, tokens)
+        plan = self._plan(payload, tokens)
+        if plan is not None:
+            self._plans[prefix] = plan
+        return payload
+
+    def _tokenize(
+        self, row: str, payload: Payload, tokens: t.List[tuple]
+    ) -> None:
+        values: t.Dict[str, t.Any] = payload.new
+        try:
+            for marker, key, type_, quoted, bare in tokens:
+                if marker:
+                    if marker == self.OLD_KEY:
+                        if payload.tg_op != UPDATE:
+                            raise LogicalSlotParseError(
+                                f"Unknown {payload.tg_op} operation for "
+                                f"row: {row}"
+                            )
+                        values = payload.old
+                    else:
+                        values = payload.new
+                    continue
+                key = _unquote_identifier(key)
+                if not bare:
+                    values[key] = self.converter(type_, quoted=True)(quoted)
+                elif bare == self.NULL:
+                    values[key] = None
+                elif bare != self.UNCHANGED_TOAST:
+                    values[key] = self.converter(type_)(bare)
+        except ValueError as e:
+            raise LogicalSlotParseError(f"{e} for row: {row}")
+
+    def _plan(
+        self, payload: Payload, tokens: t.List[tuple]
+    ) -> t.Optional["_RowPlan"]:
+        """Compile a row pattern from the tokens of a plain tuple."""
+        patterns: t.List[str] = []
+        keys: t.List[str] = []
+        funcs: t.List[t.Callable[[str], t.Any]] = []
+        for marker, key, type_, quoted, bare in tokens:
+            if marker or bare == self.UNCHANGED_TOAST:
+                return None
+            # null does not tell us if the type is quoted
+            if bare == self.NULL:
+                quoted_type: bool = type_.lower() not in self.bare_types
+            else:
+                quoted_type = not bare
+            value: str = self.QUOTED if quoted_type else self.BARE
+            patterns.append(
+                rf" {re.escape(key)}{re.escape(f'[{type_}]:')}"
+                rf"(?:{self.NULL}|{value})"
+            )
+            keys.append(_unquote_identifier(key))
+            funcs.append(self.converter(type_, quoted=quoted_type))
+        if not patterns:
+            return None
+        return _RowPlan(
+            re.compile("".join(patterns) + r"\Z"),
+            keys,
+            funcs,
+            payload,
+        )
+
+
+class _RowPlan(object):
+    """Compiled row pattern and converters for one table and operation."""
+
+    __slots__ = ("pattern", "keys", "converters", "tg_op", "table", "schema")
+
+    def __init__(
+        self,
+        pattern: re.Pattern,
+        keys: t.List[str],
+        converters: t.List[t.Callable[[str], t.Any]],
+        payload: Payload,
+    ) -> None:
+        self.pattern: re.Pattern = pattern
+        self.keys: t.List[str] = keys
+        self.converters: t.List[t.Callable[[str], t.Any]] = converters
+        self.tg_op: str = payload.tg_op
+        self.table: str = payload.table
+        self.schema: str = payload.schema
+
+
+def _unquote_identifier(value: str) -> str:
+    if value[:1] == '"':
+        return value[1:-1].replace('""', '"')
+    return value
+
+
+def _unescape(value: str) -> str:
+    return value.replace("''", "'")
+
+
+def _quote(value: str) -> str:
+    return f"'{value}'"
+
+
+def _boolean(value: str) -> bool:
+    return value == "true"
+
+
+def _literal(value: str) -> str:
+    return value
+
+
 class TupleIdentifierType(sa.types.UserDefinedType):
     cache_ok: bool = True
 
@@ -243,6 +478,7 @@ class Base(object):
         self.verbose: bool = verbose
         self._conn = None
         self._session = None
+        self._logical_slot_parser: t.Optional[LogicalSlotParser] = None
         # Per-thread set of advisory lock keys currently held, to make
         # advisory_lock() re-entrant without requiring the nested call to
         # acquire a second backend connection.
@@ -487,29 +723,31 @@ class Base(object):
     def replication_slots(
         self,
         slot_name: str,
-        plugin: str = PLUGIN,
+        plugin: t.Optional[str] = PLUGIN,
         slot_type: str = "logical",
     ) -> t.List[str]:
         """List replication slots.
 
+        Slots for any output plugin are listed when plugin is None.
+
         SELECT * FROM PG_REPLICATION_SLOTS
         """
+        filters: list = [
+            sa.column("slot_name") == slot_name,
+            sa.column("slot_type") == slot_type,
+        ]
+        if plugin is not None:
+            filters.append(sa.column("plugin") == plugin)
         return self.fetchall(
             sa.select("*")
             .select_from(sa.text("PG_REPLICATION_SLOTS"))
-            .where(
-                sa.and_(
-                    *[
-                        sa.column("slot_name") == slot_name,
-                        sa.column("slot_type") == slot_type,
-                        sa.column("plugin") == plugin,
-                    ]
-                )
-            ),
+            .where(sa.and_(*filters)),
             label="replication_slots",
         )
 
-    def create_replication_slot(self, slot_name: str) -> None:
+    def create_replication_slot(
+        self, slot_name: str, plugin: str = PLUGIN
+    ) -> None:
         """Create a replication slot.
 
         TODO:
@@ -527,7 +765,7 @@ class Base(object):
                     sa.select("*").select_from(
                         sa.func.PG_CREATE_LOGICAL_REPLICATION_SLOT(
                             slot_name,
-                            PLUGIN,
+                            plugin,
                         )
                     )
                 )
@@ -539,7 +777,7 @@ class Base(object):
     def drop_replication_slot(self, slot_name: str) -> None:
         """Drop a replication slot."""
         logger.debug(f"Dropping replication slot: {slot_name}")
-        if self.replication_slots(slot_name):
+        if self.replication_slots(slot_name, plugin=None):
             try:
                 with self.advisory_lock(
                     slot_name, max_retries=None, retry_interval=0.1
@@ -554,6 +792,49 @@ class Base(object):
                 raise
         logger.debug(f"Dropped replication slot: {slot_name}")
 
+    # Publications...
+    def publication_exists(self, name: str) -> bool:
+        """Check if a publication exists.
+
+        SELECT COUNT(*) FROM PG_PUBLICATION WHERE pubname = 'name'
+        """
+        return self.exists(
+            sa.select(sa.func.COUNT())
+            .select_from(sa.text("PG_PUBLICATION"))
+            .where(sa.column("pubname") == name),
+            label="publication_exists",
+        )
+
+    def create_publication(
+        self, name: str, tables: t.Iterable[t.Tuple[str, str]]
+    ) -> None:
+        """Create a publication limited to the given (schema, table) pairs.
+
+        CREATE PUBLICATION name FOR TABLE schema.table, ...
+        """
+        logger.debug(f"Creating publication: {name}")
+        preparer = self.engine.dialect.identifier_preparer
+        relations: str = ", ".join(
+            f"{preparer.quote_schema(schema)}.{preparer.quote(table)}"
+            for schema, table in sorted(set(tables))
+        )
+        self.execute(
+            sa.text(
+                f"CREATE PUBLICATION {preparer.quote(name)} "
+                f"FOR TABLE {relations}"
+            )
+        )
+        logger.debug(f"Created publication: {name}")
+
+    def drop_publication(self, name: str) -> None:
+        """Drop a publication."""
+        logger.debug(f"Dropping publication: {name}")
+        preparer = self.engine.dialect.identifier_preparer
+        self.execute(
+            sa.text(f"DROP PUBLICATION IF EXISTS {preparer.quote(name)}")
+        )
+        logger.debug(f"Dropped publication: {name}")
+
     def advisory_key(self, slot_name: str) -> int:
         """Compute a stable bigint advisory key from slot name."""
         if self.is_mysql_compat:
@@ -724,6 +1005,7 @@ class Base(object):
         statement: sa.sql.Select = sa.select(
             sa.text("xid"),
             sa.text("data"),
+            sa.text("lsn"),
         ).select_from(
             func(
                 slot_name,
@@ -763,6 +1045,19 @@ class Base(object):
             )
         )[0]
 
+    def confirmed_flush_lsn(self, slot_name: str) -> t.Optional[str]:
+        """The LSN up to which the slot's changes have been consumed.
+
+        SELECT CONFIRMED_FLUSH_LSN FROM PG_REPLICATION_SLOTS
+        """
+        row: t.Optional[sa.engine.row.Row] = self.fetchone(
+            sa.select(sa.column("confirmed_flush_lsn"))
+            .select_from(sa.text("PG_REPLICATION_SLOTS"))
+            .where(sa.column("slot_name") == slot_name),
+            label="confirmed_flush_lsn",
+        )
+        return row[0] if row else None
+
     def logical_slot_get_changes(
         self,
         slot_name: str,
@@ -827,6 +1122,23 @@ class Base(object):
             )
             return self.fetchall(statement)
 
+    def replication_slot_advance(self, slot_name: str, upto_lsn: str) -> None:
+        """Advance a logical replication slot up to upto_lsn.
+
+        Changes before upto_lsn are discarded without being returned and
+        the next peek/get starts decoding from there.
+
+        SELECT * FROM PG_REPLICATION_SLOT_ADVANCE('testdb', '0/16B6A28')
+        """
+        with self.advisory_lock(
+            slot_name, max_retries=None, retry_interval=0.1
+        ):
+            self.execute(
+                sa.select(sa.text("*")).select_from(
+                    sa.func.PG_REPLICATION_SLOT_ADVANCE(slot_name, upto_lsn)
+                )
+            )
+
     def logical_slot_count_changes(
         self,
         slot_name: str,
@@ -1045,6 +1357,27 @@ class Base(object):
             self.enable_trigger(schema, table)
             logger.debug(f"Enabled trigger on table: {schema}.{table}")
 
+    def relation_pages(self, table: str, schema: str) -> int:
+        """
+        Get the number of heap pages of a table.
+
+        SELECT PG_RELATION_SIZE('schema.table'::regclass)
+        / CURRENT_SETTING('block_size')::int
+        """
+        return self.fetchone(
+            sa.select(
+                sa.func.PG_RELATION_SIZE(
+                    sa.cast(
+                        sa.literal(f'"{schema}"."{table}"'),
+                        sa.dialects.postgresql.REGCLASS,
+                    ),
+                    type_=sa.BigInteger,
+                )
+                // sa.cast(sa.func.CURRENT_SETTING("block_size"), sa.Integer)
+            ),
+            label="relation_pages",
+        )[0]
+
     @property
     def txid_current(self) -> int:
         """
@@ -1086,94 +1419,33 @@ class Base(object):
 
         return _pg_visible_in_snapshot
 
-    def parse_value(self, type_: str, value: str) -> t.Optional[str]:
+    @property
+    def logical_slot_parser(self) -> LogicalSlotParser:
+        if self._logical_slot_parser is None:
+            self._logical_slot_parser = LogicalSlotParser(
+                self.INT_TYPES, self.FLOAT_TYPES, self.CHAR_TYPES
+            )
+        return self._logical_slot_parser
+
+    def parse_value(self, type_: str, value: str) -> t.Any:
         """
-        Parse datatypes from db.
+        Parse a test_decoding value of a type e.g 'it''s' or 42.
 
-        NB: All integers are long in python3 and call to convert is just int
+        Converted by the LogicalSlotParser used for whole rows.
         """
         if self.verbose:
             logger.debug(f"type: {type_} value: {value}")
-        if value.lower() == "null":
+        if value.lower() == LogicalSlotParser.NULL:
             return None
-        if type_.lower() in self.INT_TYPES:
-            try:
-                value = int(value)
-            except ValueError:
-                raise
-        if type_.lower() in self.CHAR_TYPES:
-            value = value.lstrip("'").rstrip("'")
-        if type_.lower() == "boolean":
-            value = bool(value)
-        if type_.lower() in self.FLOAT_TYPES:
-            try:
-                value = float(value)
-            except ValueError:
-                raise
-        return value
+        if len(value) > 1 and value[0] == value[-1] == "'":
+            return self.logical_slot_parser.converter(type_, quoted=True)(
+                value[1:-1]
+            )
+        return self.logical_slot_parser.converter(type_)(value)
 
     def parse_logical_slot(self, row: str) -> Payload:
-
-        def _parse_logical_slot(data: str) -> t.Iterator[t.Tuple[str, t.Any]]:
-            pos: int = 0
-            while True:
-                match = LOGICAL_SLOT_SUFFIX.search(data, pos)
-                if not match:
-                    break
-
-                key = (match.groupdict().get("key") or "").replace('"', "")
-                raw_value = match.groupdict().get("value") or ""
-                type_ = match.groupdict().get("type") or ""
-
-                parsed = self.parse_value(type_, raw_value)
-                yield key, parsed
-
-                start, end = match.span()
-                # advance safely even if the pattern can match zero-length
-                pos = end if end > start else end + 1
-
-        match = LOGICAL_SLOT_PREFIX.search(row)
-        if not match:
-            raise LogicalSlotParseError(f"No match for row: {row}")
-
-        data: dict = {"old": None, "new": None}
-        data.update(**match.groupdict())
-        payload: Payload = Payload(**data)
-
-        span = match.span()
-        # including trailing space below is deliberate
-        suffix: str = f"{row[span[1]:]} "
-
-        if "old-key" in suffix and "new-tuple" in suffix:
-            # this can only be an UPDATE operation
-            if payload.tg_op != UPDATE:
-                msg = f"Unknown {payload.tg_op} operation for row: {row}"
-                raise LogicalSlotParseError(msg)
-
-            i: int = suffix.find("old-key:")
-            if i > -1:
-                j: int = suffix.find("new-tuple:")
-                if j > -1:
-                    s: str = suffix[i + len("old-key:") : j]
-                    for key, value in _parse_logical_slot(s):
-                        payload.old[key] = value
-
-            i = suffix.find("new-tuple:")
-            if i > -1:
-                s = suffix[i + len("new-tuple:") :]
-                for key, value in _parse_logical_slot(s):
-                    payload.new[key] = value
-        else:
-            # this can be an INSERT, DELETE, UPDATE or TRUNCATE operation
-            if payload.tg_op not in TG_OPS:
-                raise LogicalSlotParseError(
-                    f"Unknown {payload.tg_op} operation for row: {row}"
-                )
-
-            for key, value in _parse_logical_slot(suffix):
-                payload.new[key] = value
-
-        return payload
+        """Parse a test_decoding row into a Payload."""
+        return self.logical_slot_parser.parse(row)
 
     # Querying...
     def execute(
@@ -1230,18 +1502,49 @@ class Base(object):
         statement: sa.sql.Select,
         chunk_size: t.Optional[int] = None,
         stream_results: t.Optional[bool] = None,
+        params: t.Optional[dict] = None,
+        snapshot: t.Optional[str] = None,
     ):
         chunk_size = chunk_size or QUERY_CHUNK_SIZE
         stream_results = stream_results or STREAM_RESULTS
         with self.engine.connect() as conn:
+            if snapshot is not None:
+                # read from a snapshot exported with pg_export_snapshot()
+                conn.execution_options(isolation_level="REPEATABLE READ")
+                conn.execute(sa.text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
             result = conn.execution_options(
                 stream_results=stream_results
-            ).execute(statement.select())
+            ).execute(statement.select(), params)
             for partition in result.partitions(chunk_size):
                 for keys, row, *primary_keys in partition:
                     yield keys, row, primary_keys
             result.close()
-        self.engine.clear_compiled_cache()
+        # statements with literal values are never reused, so don't let
+        # them pile up in the compiled cache. Bound statements are reused.
+        if params is None:
+            self.engine.clear_compiled_cache()
+
+    def explain_plan(
+        self,
+        statement: sa.sql.Select,
+        params: t.Optional[dict] = None,
+        analyze: bool = False,
+    ) -> dict:
+        """
+        Get the query plan of a statement.
+
+        EXPLAIN (ANALYZE, FORMAT JSON) SELECT ...
+        """
+        compiled: sa.sql.compiler.Compiled = statement.compile(
+            dialect=self.engine.dialect
+        )
+        options: str = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        with self.engine.connect() as conn:
+            plan: list = conn.exec_driver_sql(
+                f"EXPLAIN ({options}) {compiled}",
+                compiled.construct_params(params),
+            ).scalar()
+        return plan[0]
 
     def fetchcount(self, statement: sa.sql.Subquery) -> int:
         with self.engine.connect() as conn:
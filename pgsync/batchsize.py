@@ -0,0 +1,97 @@
+"""Adaptive batch sizes driven by measured latency."""
+
+import logging
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSize(object):
+    """
+    AIMD controller for a batch size setting.
+
+    The size starts at the configured setting and grows additively by a
+    tenth of it while a batch completes within the target latency. It is
+    halved when a batch is slower than the target or was rejected with a
+    429. The size stays within ADAPTIVE_BATCH_SIZE_MIN_RATIO and
+    ADAPTIVE_BATCH_SIZE_MAX_RATIO of the setting.
+
+    When ADAPTIVE_BATCH_SIZE is off the setting is returned unchanged.
+
+    e.g
+        batch_size = BatchSize("FILTER_CHUNK_SIZE", latency=1.0)
+        for chunk in chunks(filters, batch_size.size):
+            ...
+            batch_size.observe(elapsed)
+    """
+
+    def __init__(self, name: str, latency: float) -> None:
+        self.name: str = name
+        self.latency: float = latency
+        self._size: t.Optional[int] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def setting(self) -> int:
+        return getattr(settings, self.name)
+
+    @property
+    def minimum(self) -> int:
+        return max(
+            1, int(self.setting * settings.ADAPTIVE_BATCH_SIZE_MIN_RATIO)
+        )
+
+    @property
+    def maximum(self) -> int:
+        return max(
+            self.minimum,
+            int(self.setting * settings.ADAPTIVE_BATCH_SIZE_MAX_RATIO),
+        )
+
+    @property
+    def size(self) -> int:
+        """Return the current batch size."""
+        if not settings.ADAPTIVE_BATCH_SIZE or self._size is None:
+            return self.setting
+        return self._size
+
+    def observe(self, elapsed: float, rejected: bool = False) -> int:
+        """Adjust the batch size from the latency of the last batch."""
+        if not settings.ADAPTIVE_BATCH_SIZE:
+            return self.setting
+        with self._lock:
+            size: int = self.size
+            if rejected or elapsed > self.latency:
+                size = max(self.minimum, size // 2)
+            else:
+                size = min(self.maximum, size + max(1, self.setting // 10))
+            if size != self._size:
+                logger.debug(
+                    f"{self.name}: {size} (elapsed={elapsed:.3f}s "
+                    f"rejected={rejected})"
+                )
+            self._size = size
+        return size
+
+    @contextmanager
+    def measure(self, sink: t.Any = None) -> t.Generator:
+        """
+        Observe the time taken by the block.
+
+        The batch counts as rejected if the sink saw a 429 meanwhile.
+        """
+        if not settings.ADAPTIVE_BATCH_SIZE:
+            yield
+            return
+        rejected: int = sink.rejected if sink is not None else 0
+        started: float = time.time()
+        yield
+        self.observe(
+            time.time() - started,
+            rejected=sink is not None and sink.rejected > rejected,
+        )
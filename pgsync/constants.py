@@ -41,6 +41,7 @@ NODE_ATTRIBUTES = [
     "schema",
     "table",
     "transform",
+    "watermark",
 ]
 
 # Relationship attributes
@@ -185,6 +186,8 @@ META = "_meta"
 
 # Logical decoding output plugin
 PLUGIN = "test_decoding"
+# Binary logical replication output plugin (WAL mode only)
+PGOUTPUT = "pgoutput"
 
 # Trigger function
 TRIGGER_FUNC = "table_notify"
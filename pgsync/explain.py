@@ -0,0 +1,83 @@
+"""Checks on the JSON query plans of the sync queries."""
+
+import typing as t
+
+SEQ_SCAN = "Seq Scan"
+NESTED_LOOP = "Nested Loop"
+
+
+def plan_nodes(plan: dict) -> t.Iterator[dict]:
+    """Yield every node of a query plan, depth first."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def plan_rows(plan: dict) -> float:
+    """Rows a plan node returns per loop, actual if it was analyzed."""
+    return plan.get("Actual Rows", plan.get("Plan Rows", 0))
+
+
+def cost_per_docs(plan: dict, docs: int = 1000) -> float:
+    """
+    Estimated cost of the query spread over a number of documents.
+
+    The root plan node returns one row per document.
+    """
+    return plan["Total Cost"] / max(plan_rows(plan), 1) * docs
+
+
+def plan_issues(
+    plan: dict,
+    seq_scans: bool = True,
+    loop_rows: int = 1000,
+    misestimate: float = 10.0,
+) -> t.List[t.Tuple[t.Optional[str], str]]:
+    """
+    Find the parts of a query plan that won't scale.
+
+    Returns (relation, issue) pairs for:
+    - sequential scans of a table
+    - nested loops repeating a sequential scan for loop_rows or more rows
+    - row counts off from the estimate by a factor of misestimate
+    """
+    issues: t.List[t.Tuple[t.Optional[str], str]] = []
+    for node in plan_nodes(plan):
+        relation: t.Optional[str] = node.get("Relation Name")
+        if seq_scans and node["Node Type"] == SEQ_SCAN and relation:
+            issues.append(
+                (
+                    relation,
+                    f"Sequential scan on {relation} "
+                    f"(~{node['Plan Rows']} rows)",
+                )
+            )
+
+        if node["Node Type"] == NESTED_LOOP and len(node.get("Plans", [])) > 1:
+            outer, inner = node["Plans"][:2]
+            rows: float = plan_rows(outer)
+            if rows >= loop_rows:
+                for scan in plan_nodes(inner):
+                    if scan["Node Type"] == SEQ_SCAN:
+                        issues.append(
+                            (
+                                scan.get("Relation Name"),
+                                f"Nested loop repeats a sequential scan on "
+                                f"{scan.get('Relation Name')} for "
+                                f"~{rows} rows",
+                            )
+                        )
+
+        if "Actual Rows" in node:
+            estimated: float = max(node["Plan Rows"], 1)
+            actual: float = max(node["Actual Rows"], 1)
+            if max(estimated / actual, actual / estimated) >= misestimate:
+                issues.append(
+                    (
+                        relation,
+                        f"{node['Node Type']} estimated "
+                        f"{node['Plan Rows']} rows but returned "
+                        f"{node['Actual Rows']}",
+                    )
+                )
+    return issues
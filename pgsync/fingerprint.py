@@ -0,0 +1,207 @@
+"""Fingerprints of indexed documents to skip unchanged re-indexes."""
+
+import abc
+import hashlib
+import json
+import logging
+import threading
+import typing as t
+from collections import defaultdict, OrderedDict
+from itertools import islice
+
+from redis import Redis
+
+from .settings import REDIS_RETRY_ON_TIMEOUT, REDIS_SOCKET_TIMEOUT
+from .urls import get_redis_url
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(source: t.Union[str, dict]) -> str:
+    """Return a hash of a doc _source, either a dict or JSON text."""
+    if not isinstance(source, str):
+        source = json.dumps(source, sort_keys=True, default=str)
+    return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+
+class Fingerprints(abc.ABC):
+    """
+    Store of the _source hash last indexed per doc _id.
+
+    Subclasses implement get, set, forget and clear over a batch of ids.
+    A hash is held back as the doc is handed to the sink and only stored
+    once the sink acknowledges the doc as written, so a doc that fails
+    or is lost in a crash is sent again.
+    """
+
+    def __init__(self, chunk_size: int = 1000) -> None:
+        self.chunk_size: int = chunk_size
+        # hashes of the docs sent but not yet acknowledged, in send order
+        self._pending: t.Dict[str, t.List[str]] = defaultdict(list)
+        self._pending_lock: threading.Lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get(self, ids: t.List[str]) -> t.List[t.Optional[str]]:
+        """Return the stored hash of each id, None if there is none."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, mapping: t.Dict[str, str]) -> None:
+        """Store the hash of each id."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def forget(self, ids: t.List[str]) -> None:
+        """Drop the stored hash of each id."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Drop every stored hash."""
+        raise NotImplementedError
+
+    def changed(self, docs: t.Iterable[dict], skip: bool = True) -> t.Iterator:
+        """
+        Yield the docs whose _source differs from when last indexed.
+
+        Partial updates and deletes pass through and drop the hash of
+        their doc. With skip off every doc passes through and only the
+        hashes are recorded, e.g for a full load into a new index.
+        """
+        docs = iter(docs)
+        while True:
+            chunk: t.List[dict] = list(islice(docs, self.chunk_size))
+            if not chunk:
+                break
+            indexed: t.List[dict] = [
+                doc for doc in chunk if doc.get("_op_type", "index") == "index"
+            ]
+            stored: t.Dict[str, t.Optional[str]] = (
+                dict(
+                    zip(
+                        [doc["_id"] for doc in indexed],
+                        self.get([doc["_id"] for doc in indexed]),
+                    )
+                )
+                if skip and indexed
+                else {}
+            )
+            forgotten: t.List[str] = []
+            skipped: int = 0
+            for doc in chunk:
+                if doc.get("_op_type", "index") != "index":
+                    stored[doc["_id"]] = None
+                    forgotten.append(doc["_id"])
+                    with self._pending_lock:
+                        self._pending.pop(doc["_id"], None)
+                    yield doc
+                    continue
+                value: str = fingerprint(doc["_source"])
+                if skip and stored.get(doc["_id"]) == value:
+                    skipped += 1
+                    continue
+                with self._pending_lock:
+                    self._pending[doc["_id"]].append(value)
+                yield doc
+            if forgotten:
+                self.forget(forgotten)
+            if skipped:
+                logger.debug(f"Skipped {skipped} unchanged docs")
+
+    def acknowledge(self, written: t.List[str], failed: t.List[str]) -> None:
+        """
+        Store the hashes of the docs the sink wrote.
+
+        Each result settles the oldest hash held back for its _id. A
+        failed _id drops its hash, so the doc is sent again.
+        """
+        hashes: t.Dict[str, str] = {}
+        with self._pending_lock:
+            for ids, ok in ((written, True), (failed, False)):
+                for key in ids:
+                    values: t.Optional[t.List[str]] = self._pending.get(key)
+                    if not values:
+                        continue
+                    value: str = values.pop(0)
+                    if not values:
+                        del self._pending[key]
+                    if ok:
+                        hashes[key] = value
+                    else:
+                        hashes.pop(key, None)
+        if failed:
+            self.forget(failed)
+        if hashes:
+            self.set(hashes)
+
+
+class LRUFingerprints(Fingerprints):
+    """In-process fingerprints of the most recently indexed docs."""
+
+    def __init__(self, maxsize: int, chunk_size: int = 1000) -> None:
+        super().__init__(chunk_size=chunk_size)
+        self.maxsize: int = maxsize
+        self._hashes: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, ids: t.List[str]) -> t.List[t.Optional[str]]:
+        with self._lock:
+            values: t.List[t.Optional[str]] = []
+            for key in ids:
+                values.append(self._hashes.get(key))
+                if key in self._hashes:
+                    self._hashes.move_to_end(key)
+            return values
+
+    def set(self, mapping: t.Dict[str, str]) -> None:
+        with self._lock:
+            for key, value in mapping.items():
+                self._hashes[key] = value
+                self._hashes.move_to_end(key)
+            while len(self._hashes) > self.maxsize:
+                self._hashes.popitem(last=False)
+
+    def forget(self, ids: t.List[str]) -> None:
+        with self._lock:
+            for key in ids:
+                self._hashes.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+
+
+class RedisFingerprints(Fingerprints):
+    """Fingerprints in a Redis/Valkey hash shared by every process."""
+
+    def __init__(
+        self,
+        name: str,
+        namespace: str = "fingerprint",
+        chunk_size: int = 1000,
+        **kwargs,
+    ) -> None:
+        super().__init__(chunk_size=chunk_size)
+        url: str = get_redis_url(**kwargs)
+        self.key: str = f"{namespace}:{name}"
+        self.__db: Redis = Redis.from_url(
+            url,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            retry_on_timeout=REDIS_RETRY_ON_TIMEOUT,
+        )
+
+    def get(self, ids: t.List[str]) -> t.List[t.Optional[str]]:
+        return [
+            value.decode() if value is not None else None
+            for value in self.__db.hmget(self.key, ids)
+        ]
+
+    def set(self, mapping: t.Dict[str, str]) -> None:
+        self.__db.hset(self.key, mapping=mapping)
+
+    def forget(self, ids: t.List[str]) -> None:
+        self.__db.hdel(self.key, *ids)
+
+    def clear(self) -> None:
+        self.__db.delete(self.key)
+        logger.info(f"Cleared fingerprints {self.key}")
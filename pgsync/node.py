@@ -10,7 +10,7 @@ from dataclasses import dataclass
 
 import sqlalchemy as sa
 
-from pgsync.settings import IS_MYSQL_COMPAT
+from pgsync.settings import IS_MYSQL_COMPAT, TRANSFORM_PUSHDOWN
 
 from .constants import (
     DEFAULT_SCHEMA,
@@ -33,6 +33,7 @@ from .exc import (
     SchemaError,
     TableNotInNodeError,
 )
+from .transform import Transform, TransformPlan
 
 
 @dataclass
@@ -136,6 +137,7 @@ class Node(object):
     relationship: t.Optional[dict] = None
     parent: t.Optional[Node] = None
     base_tables: t.Optional[list] = None
+    watermark: t.Optional[str] = None
     is_through: bool = False
 
     def __post_init__(self):
@@ -143,6 +145,10 @@ class Node(object):
         self.columns = self.columns or []
         self.children: t.List[Node] = []
         self.table_columns: t.List[str] = self.model.columns.keys()
+        if self.watermark and self.watermark not in self.table_columns:
+            raise ColumnNotFoundError(
+                f'Column "{self.watermark}" not present on table "{self.table}"'
+            )
         if not self.model.primary_keys:
             setattr(self.model, "primary_keys", self.primary_key)
 
@@ -161,6 +167,10 @@ class Node(object):
 
         self.setup()
 
+        # the transforms the query applies and the ones left for Python
+        self.pushdown: dict = {}
+        self.residual_transform: dict = self.transform or {}
+
         self.relationship: Relationship = Relationship(self.relationship)
         self._subquery = None
         self._filters: list = []
@@ -302,6 +312,42 @@ class Node(object):
                 self.columns.append(column_name)
                 self.columns.append(self.model.c[column_name])
 
+    def split_transform(self) -> None:
+        """
+        Push the transforms the query can apply down into it.
+
+        The children must be split first, since a child with transforms
+        left in Python keeps its label.
+        """
+        fields: t.List[str] = self.columns[::2] + [
+            child.label for child in self.children
+        ]
+        text_fields: t.Set[str] = {
+            key
+            for key, column in zip(self.columns[::2], self.columns[1::2])
+            if isinstance(column.type, sa.String)
+            # the text functions drop the padding of a CHAR(n) value
+            and not isinstance(column.type, (sa.Enum, sa.CHAR))
+        }
+        fixed: t.Set[str] = {
+            child.label
+            for child in self.children
+            if Transform.compile(child.transform_nodes)
+        }
+        self.pushdown, self.residual_transform = Transform.pushdown(
+            self.transform, fields, text_fields, fixed=fixed
+        )
+
+    @property
+    def transform_nodes(self) -> dict:
+        """The nodes of this branch with the transforms left in Python."""
+        return {
+            "table": self.table,
+            "label": self.label,
+            "transform": self.residual_transform,
+            "children": [child.transform_nodes for child in self.children],
+        }
+
     @property
     def primary_keys(self) -> t.List[sa.sql.ColumnElement]:
         return [
@@ -368,6 +414,13 @@ class Tree(threading.local):
         self.__schemas: t.Set[str] = set()
         self.root: t.Optional[Node] = None
         self.build(self.nodes)
+        if TRANSFORM_PUSHDOWN:
+            for node in self.traverse_post_order():
+                node.split_transform()
+        # compiled once rather than walking the schema for every document
+        self.transform_plan: TransformPlan = Transform.compile(
+            self.root.transform_nodes
+        )
 
     def display(self) -> None:
         self.root.display()
@@ -412,6 +465,7 @@ class Tree(threading.local):
             columns=nodes.get("columns", []),
             relationship=nodes.get("relationship", {}),
             base_tables=nodes.get("base_tables", []),
+            watermark=nodes.get("watermark"),
         )
         if self.root is None:
             self.root = node
@@ -0,0 +1,294 @@
+"""PGSync pgoutput decoder.
+
+Decodes the binary logical replication protocol emitted by the built-in
+``pgoutput`` plugin directly into :class:`~pgsync.base.Payload` objects.
+
+Only protocol version 1 messages are handled:
+
+- ``B`` Begin, ``C`` Commit, ``O`` Origin, ``Y`` Type, ``M`` Message
+- ``R`` Relation (cached per relation OID)
+- ``I`` Insert, ``U`` Update, ``D`` Delete, ``T`` Truncate
+
+https://www.postgresql.org/docs/current/protocol-logicalrep-message-formats.html
+"""
+
+import logging
+import struct
+import typing as t
+
+from .base import Payload
+from .constants import DELETE, INSERT, TRUNCATE, UPDATE
+from .exc import LogicalSlotParseError
+
+logger = logging.getLogger(__name__)
+
+# message types
+BEGIN = b"B"
+COMMIT = b"C"
+MESSAGE = b"M"
+ORIGIN = b"O"
+RELATION = b"R"
+TYPE = b"Y"
+INSERT_MSG = b"I"
+UPDATE_MSG = b"U"
+DELETE_MSG = b"D"
+TRUNCATE_MSG = b"T"
+
+# tuple data submessages
+NEW_TUPLE = 0x4E  # N
+KEY_TUPLE = 0x4B  # K
+OLD_TUPLE = 0x4F  # O
+
+# column value kinds
+NULL_VALUE = 0x6E  # n
+UNCHANGED_TOAST = 0x75  # u
+TEXT_VALUE = 0x74  # t
+
+# column flag marking a replica identity (key) column
+KEY_FLAG = 1
+
+_INT8 = struct.Struct("!b")
+_INT16 = struct.Struct("!h")
+_INT32 = struct.Struct("!i")
+_UINT32 = struct.Struct("!I")
+
+
+def _bool(value: str) -> bool:
+    return value == "t"
+
+
+# builtin type OIDs (pg_type.h) mapped to a text converter.
+# Anything not listed is passed through as text.
+TYPE_CONVERTERS: t.Dict[int, t.Callable[[str], t.Any]] = {
+    16: _bool,  # bool
+    20: int,  # int8
+    21: int,  # int2
+    23: int,  # int4
+    26: int,  # oid
+    700: float,  # float4
+    701: float,  # float8
+}
+
+
+def _text(value: str) -> str:
+    return value
+
+
+class Relation(object):
+    """Cached relation metadata from a pgoutput Relation message."""
+
+    __slots__ = ("oid", "schema", "table", "columns", "converters", "keys")
+
+    def __init__(
+        self,
+        oid: int,
+        schema: str,
+        table: str,
+        columns: t.List[t.Tuple[int, str, int]],
+    ):
+        self.oid: int = oid
+        self.schema: str = schema
+        self.table: str = table
+        # list of column names in attnum order
+        self.columns: t.List[str] = [name for _, name, _ in columns]
+        # converters are resolved once per relation, not once per value
+        self.converters: t.List[t.Callable[[str], t.Any]] = [
+            TYPE_CONVERTERS.get(type_oid, _text) for _, _, type_oid in columns
+        ]
+        # replica identity columns
+        self.keys: t.Set[str] = {
+            name for flags, name, _ in columns if flags & KEY_FLAG
+        }
+
+
+class PgOutputDecoder(object):
+    """Stateful decoder for a single pgoutput replication stream.
+
+    Relation messages are always sent by the server before the first
+    change for that relation in a session (and again whenever its
+    definition changes), so the decoder caches them by OID and reuses the
+    metadata to decode subsequent tuples.
+    """
+
+    def __init__(self) -> None:
+        self.relations: t.Dict[int, Relation] = {}
+        # xid of the transaction currently being decoded
+        self.xid: t.Optional[int] = None
+
+    def decode(self, data: bytes) -> t.Tuple[bytes, t.List[Payload]]:
+        """
+        Decode one pgoutput message.
+
+        Returns:
+            A tuple of the message type (e.g. ``b"C"``) and the list of
+            payloads it produced (empty for non-DML messages).
+        """
+        kind: bytes = data[:1]
+        if kind == BEGIN:
+            # final_lsn (int64), commit timestamp (int64), xid (int32)
+            self.xid = _UINT32.unpack_from(data, 17)[0]
+            return kind, []
+        if kind == COMMIT:
+            self.xid = None
+            return kind, []
+        if kind == RELATION:
+            self._relation(data)
+            return kind, []
+        if kind == INSERT_MSG:
+            return kind, [self._insert(data)]
+        if kind == UPDATE_MSG:
+            return kind, [self._update(data)]
+        if kind == DELETE_MSG:
+            return kind, [self._delete(data)]
+        if kind == TRUNCATE_MSG:
+            return kind, self._truncate(data)
+        if kind in (ORIGIN, TYPE, MESSAGE):
+            return kind, []
+        raise LogicalSlotParseError(f"Unknown pgoutput message: {kind!r}")
+
+    def is_transactional_message(self, data: bytes) -> bool:
+        """Return True if a logical decoding Message is transactional."""
+        return bool(_INT8.unpack_from(data, 1)[0] & 1)
+
+    def _relation(self, data: bytes) -> None:
+        oid: int = _UINT32.unpack_from(data, 1)[0]
+        pos: int = 5
+        schema, pos = _string(data, pos)
+        table, pos = _string(data, pos)
+        # replica identity setting (int8)
+        pos += 1
+        ncols: int = _INT16.unpack_from(data, pos)[0]
+        pos += 2
+        columns: t.List[t.Tuple[int, str, int]] = []
+        for _ in range(ncols):
+            flags: int = data[pos]
+            name, pos = _string(data, pos + 1)
+            type_oid: int = _UINT32.unpack_from(data, pos)[0]
+            # type oid (int32) + type modifier (int32)
+            pos += 8
+            columns.append((flags, name, type_oid))
+        # the namespace of pg_catalog relations is sent as an empty string
+        self.relations[oid] = Relation(
+            oid, schema or "pg_catalog", table, columns
+        )
+        logger.debug(f"Cached relation {oid}: {schema}.{table}")
+
+    def _get_relation(self, data: bytes) -> Relation:
+        oid: int = _UINT32.unpack_from(data, 1)[0]
+        try:
+            return self.relations[oid]
+        except KeyError:
+            raise LogicalSlotParseError(
+                f"Change for unknown relation oid: {oid}"
+            )
+
+    def _payload(self, tg_op: str, relation: Relation) -> Payload:
+        return Payload(
+            tg_op=tg_op,
+            table=relation.table,
+            schema=relation.schema,
+            xmin=self.xid,
+        )
+
+    def _insert(self, data: bytes) -> Payload:
+        relation: Relation = self._get_relation(data)
+        payload: Payload = self._payload(INSERT, relation)
+        # oid (int32) + 'N'
+        payload.new, _ = _tuple(data, 6, relation)
+        return payload
+
+    def _update(self, data: bytes) -> Payload:
+        relation: Relation = self._get_relation(data)
+        payload: Payload = self._payload(UPDATE, relation)
+        pos: int = 5
+        submessage: int = data[pos]
+        if submessage in (KEY_TUPLE, OLD_TUPLE):
+            payload.old, pos = _tuple(
+                data,
+                pos + 1,
+                relation,
+                keys_only=submessage == KEY_TUPLE,
+            )
+            submessage = data[pos]
+        if submessage != NEW_TUPLE:
+            raise LogicalSlotParseError(
+                f"Unexpected tuple type {chr(submessage)!r} in UPDATE for "
+                f"{relation.schema}.{relation.table}"
+            )
+        payload.new, _ = _tuple(data, pos + 1, relation)
+        return payload
+
+    def _delete(self, data: bytes) -> Payload:
+        relation: Relation = self._get_relation(data)
+        payload: Payload = self._payload(DELETE, relation)
+        submessage: int = data[5]
+        # with test_decoding DELETE values are reported as the "new" row.
+        # Keep that shape so downstream handling is plugin agnostic.
+        payload.new, _ = _tuple(
+            data,
+            6,
+            relation,
+            keys_only=submessage == KEY_TUPLE,
+        )
+        return payload
+
+    def _truncate(self, data: bytes) -> t.List[Payload]:
+        nrelations: int = _INT32.unpack_from(data, 1)[0]
+        # nrelations (int32) + options (int8)
+        pos: int = 6
+        payloads: t.List[Payload] = []
+        for _ in range(nrelations):
+            oid: int = _UINT32.unpack_from(data, pos)[0]
+            pos += 4
+            relation: t.Optional[Relation] = self.relations.get(oid)
+            if relation is None:
+                raise LogicalSlotParseError(
+                    f"Truncate for unknown relation oid: {oid}"
+                )
+            payloads.append(self._payload(TRUNCATE, relation))
+        return payloads
+
+
+def _string(data: bytes, pos: int) -> t.Tuple[str, int]:
+    """Read a null terminated string, returning it and the next offset."""
+    end: int = data.index(b"\x00", pos)
+    return data[pos:end].decode("utf-8"), end + 1
+
+
+def _tuple(
+    data: bytes,
+    pos: int,
+    relation: Relation,
+    keys_only: bool = False,
+) -> t.Tuple[t.Dict[str, t.Any], int]:
+    """Decode TupleData into a dict, returning it and the next offset.
+
+    Unchanged TOASTed values are omitted since their value is not sent.
+    With ``keys_only`` (old key tuples) only replica identity columns are
+    kept; the server sends nulls for every other column.
+    """
+    ncols: int = _INT16.unpack_from(data, pos)[0]
+    pos += 2
+    values: t.Dict[str, t.Any] = {}
+    columns: t.List[str] = relation.columns
+    converters: t.List[t.Callable[[str], t.Any]] = relation.converters
+    for i in range(ncols):
+        kind: int = data[pos]
+        pos += 1
+        if kind == TEXT_VALUE:
+            length: int = _INT32.unpack_from(data, pos)[0]
+            pos += 4
+            if not keys_only or columns[i] in relation.keys:
+                values[columns[i]] = converters[i](
+                    data[pos : pos + length].decode("utf-8")
+                )
+            pos += length
+        elif kind == NULL_VALUE:
+            if not keys_only or columns[i] in relation.keys:
+                values[columns[i]] = None
+        elif kind != UNCHANGED_TOAST:
+            raise LogicalSlotParseError(
+                f"Unsupported column value kind {chr(kind)!r} for "
+                f"{relation.schema}.{relation.table}"
+            )
+    return values, pos
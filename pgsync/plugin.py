@@ -1,25 +1,64 @@
 """PGSync Plugin."""
 
+import copy
 import logging
 import os
 import sys
+import threading
+import time
 import typing as t
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from importlib import import_module
 from inspect import getmembers, isclass
+from itertools import islice
 from pkgutil import iter_modules
 
 logger = logging.getLogger(__name__)
 
 
 class Plugin(ABC):
-    """Plugin base class."""
+    """
+    Plugin base class.
+
+    Plugins making network calls can set limits on how they are called:
+        concurrency: batches transformed at once
+        timeout: seconds to wait for a batch before retrying it
+        retries: times to retry a failed batch, waiting backoff seconds
+            and doubling the wait each time
+
+    A retried batch may be transformed more than once, so the transform
+    should give the same result when repeated.
+    """
+
+    concurrency: int = 1
+    timeout: t.Optional[float] = None
+    retries: int = 0
+    backoff: float = 1.0
 
     @abstractmethod
     def transform(self, doc: dict, **kwargs: t.Any) -> dict:
         """This must be implemented by all derived classes."""
         pass
 
+    def transform_batch(
+        self, docs: t.List[dict], **kwargs: t.Any
+    ) -> t.List[dict]:
+        """
+        Transform a batch of docs.
+
+        kwargs holds the _ids and _indices of the docs, in order. Override
+        this to handle the batch at once, e.g one model or API call for all
+        the docs. By default each doc is passed to transform.
+        """
+        return [
+            self.transform(doc, _id=_id, _index=_index)
+            for doc, _id, _index in zip(
+                docs, kwargs["_ids"], kwargs["_indices"]
+            )
+        ]
+
 
 class Plugins(object):
     """
@@ -37,6 +76,8 @@ class Plugins(object):
     def __init__(self, package: str, names: t.Optional[list] = None):
         self.package: str = package
         self.names: list = names or []
+        self._lock: threading.Lock = threading.Lock()
+        self._semaphores: t.Dict[Plugin, threading.BoundedSemaphore] = {}
         self.reload()
 
     def reload(self) -> None:
@@ -103,6 +144,139 @@ class Plugins(object):
                     yield
             yield doc
 
+    def transform_batch(
+        self, docs: t.Iterable[dict], chunk_size: int = 100
+    ) -> t.Generator:
+        """
+        Applies all plugins to chunks of docs, keeping their order.
+
+        Each plugin gets the whole chunk through Plugin.transform_batch.
+        A doc is dropped once a plugin returns an empty _source for it.
+
+        When a plugin allows a concurrency above 1, chunks are transformed
+        by a pool of threads, up to that many at once, so the latency of
+        its network calls overlaps across chunks instead of adding up.
+        """
+        docs = iter(docs)
+        workers: int = max(
+            [plugin.concurrency for plugin in self.plugins] or [1]
+        )
+        if workers <= 1:
+            while True:
+                chunk: t.List[dict] = list(islice(docs, chunk_size))
+                if not chunk:
+                    break
+                yield from self._transform_chunk(chunk)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="plugins"
+        ) as executor:
+            # chunks in flight, yielded in the order they came in
+            pending: t.Deque[Future] = deque()
+            while True:
+                chunk = list(islice(docs, chunk_size))
+                if chunk:
+                    pending.append(
+                        executor.submit(self._transform_chunk, chunk)
+                    )
+                if pending and (len(pending) >= workers or not chunk):
+                    yield from pending.popleft().result()
+                elif not chunk:
+                    break
+
+    def _transform_chunk(self, chunk: t.List[dict]) -> t.List[dict]:
+        """Apply all plugins to a chunk of docs."""
+        for plugin in self.plugins:
+            sources: t.List[dict] = self._call(
+                plugin,
+                [doc["_source"] for doc in chunk],
+                _ids=[doc["_id"] for doc in chunk],
+                _indices=[doc["_index"] for doc in chunk],
+            )
+            for doc, source in zip(chunk, sources):
+                doc["_source"] = source
+            chunk = [doc for doc in chunk if doc["_source"]]
+            if not chunk:
+                break
+        return chunk
+
+    def _slots(self, plugin: Plugin) -> threading.BoundedSemaphore:
+        """The concurrency slots of a plugin."""
+        with self._lock:
+            if plugin not in self._semaphores:
+                self._semaphores[plugin] = threading.BoundedSemaphore(
+                    max(plugin.concurrency, 1)
+                )
+            return self._semaphores[plugin]
+
+    def _call(
+        self,
+        plugin: Plugin,
+        docs: t.List[dict],
+        **kwargs: t.Any,
+    ) -> t.List[dict]:
+        """
+        Call Plugin.transform_batch within the limits of the plugin.
+
+        Each call holds one of the plugin's concurrency slots until it
+        returns, even once it timed out and is no longer waited for.
+        A call that may be retried gets a copy of the docs of its own,
+        so one left running can't change the docs of the one returned.
+        Calls with a timeout run on daemon threads, so a hung call does
+        not hold up the exit of the process.
+        """
+        slots: threading.BoundedSemaphore = self._slots(plugin)
+        for attempt in range(plugin.retries + 1):
+            try:
+                if not slots.acquire(timeout=plugin.timeout):
+                    raise TimeoutError(
+                        f"No free slot for plugin {plugin.name}"
+                    )
+                batch: t.List[dict] = (
+                    copy.deepcopy(docs)
+                    if plugin.timeout is not None or plugin.retries
+                    else docs
+                )
+                if plugin.timeout is None:
+                    try:
+                        return plugin.transform_batch(batch, **kwargs)
+                    finally:
+                        slots.release()
+                future: Future = Future()
+                future.add_done_callback(lambda _: slots.release())
+                try:
+                    threading.Thread(
+                        target=self._run,
+                        args=(future, plugin, batch),
+                        kwargs=kwargs,
+                        name=f"plugin-{plugin.name}",
+                        daemon=True,
+                    ).start()
+                except BaseException:
+                    slots.release()
+                    raise
+                return future.result(timeout=plugin.timeout)
+            except Exception as e:
+                if attempt == plugin.retries:
+                    raise
+                delay: float = plugin.backoff * 2**attempt
+                logger.warning(
+                    f"Plugin {plugin.name} failed: {e!r}, "
+                    f"retrying in {delay}s"
+                )
+                time.sleep(delay)
+
+    @staticmethod
+    def _run(
+        future: Future, plugin: Plugin, docs: t.List[dict], **kwargs: t.Any
+    ) -> None:
+        """Resolve a future with the result of Plugin.transform_batch."""
+        try:
+            future.set_result(plugin.transform_batch(docs, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
     def auth(self, key: str) -> t.Optional[str]:
         """Get an auth value from a key."""
         for plugin in self.plugins:
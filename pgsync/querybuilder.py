@@ -2,12 +2,21 @@
 
 import threading
 import typing as t
+import uuid
 from collections import defaultdict
 
 import sqlalchemy as sa
 
 from .base import compiled_query, TupleIdentifierType
-from .constants import OBJECT, ONE_TO_MANY, ONE_TO_ONE, SCALAR
+from .constants import (
+    CONCAT_TRANSFORM,
+    OBJECT,
+    ONE_TO_MANY,
+    ONE_TO_ONE,
+    RENAME_TRANSFORM,
+    REPLACE_TRANSFORM,
+    SCALAR,
+)
 from .exc import ForeignKeyError
 from .node import Node
 from .settings import IS_MYSQL_COMPAT
@@ -115,24 +124,208 @@ class QueryBuilder(threading.local):
                 {'id': 2},
             ],
         }
+        becomes
+            city.id IN (1, 2)
+            (book.id, book.uid) IN (
+                SELECT * FROM (VALUES (1, '001'), (2, '002'))
+            )
         """
         if filters is not None:
             if filters.get(node.table):
                 clause: t.List = []
-                for values in filters.get(node.table):
-                    where: t.List = []
-                    for column, value in values.items():
-                        where.append(
-                            self._eval_expression(
-                                node.model.c[column] == value
+                for columns in self._filter_columns(filters.get(node.table)):
+                    values: t.List[tuple] = [
+                        tuple(row[column] for column in columns)
+                        for row in filters.get(node.table)
+                        if tuple(sorted(row)) == columns
+                        and all(
+                            self._is_comparable(node, column, row[column])
+                            for column in columns
+                        )
+                    ]
+                    if not values:
+                        continue
+                    if len(columns) == 1:
+                        clause.append(
+                            node.model.c[columns[0]].in_(
+                                [value for value, in values]
                             )
                         )
-                    # and clause is applied for composite primary keys
-                    clause.append(sa.and_(*where))
+                    elif IS_MYSQL_COMPAT:
+                        clause.append(
+                            sa.tuple_(
+                                *[node.model.c[column] for column in columns]
+                            ).in_(values)
+                        )
+                    else:
+                        # Postgres expands a row IN list into OR branches,
+                        # so semi join against VALUES instead.
+                        rows = (
+                            sa.values(
+                                *[sa.column(column) for column in columns],
+                                name="filters",
+                            )
+                            .data(values)
+                            .alias("filters")
+                        )
+                        clause.append(
+                            sa.tuple_(
+                                *[node.model.c[column] for column in columns]
+                            ).in_(
+                                sa.select(
+                                    *[
+                                        sa.cast(
+                                            rows.c[column],
+                                            node.model.c[column].type,
+                                        )
+                                        for column in columns
+                                    ]
+                                )
+                            )
+                        )
+                if not clause:
+                    return sa.false()
+                return sa.or_(*clause)
+
+    def _is_comparable(self, node: Node, column: str, value: t.Any) -> bool:
+        """Whether the filter value can be compared with the column."""
+        if (
+            not IS_MYSQL_COMPAT
+            and isinstance(
+                node.model.c[column].type, sa.dialects.postgresql.UUID
+            )
+            and isinstance(value, str)
+        ):
+            # a bad value would fail the cast of the whole uuid[] array
+            try:
+                uuid.UUID(value)
+            except ValueError:
+                return False
+        return not isinstance(
+            self._eval_expression(node.model.c[column] == value), bool
+        )
+
+    @staticmethod
+    def _filter_columns(rows: t.List[dict]) -> t.List[t.Tuple[str, ...]]:
+        """Distinct column sets of the filter rows in a stable order."""
+        return sorted({tuple(sorted(row)) for row in rows})
+
+    @staticmethod
+    def _filter_param(table: str, index: int, column: str) -> str:
+        return f"{table}_{index}_{column}"
+
+    def filter_shape(
+        self, filters: t.Optional[t.Dict[str, t.List[dict]]]
+    ) -> tuple:
+        """
+        Hashable shape of the filters.
+
+        Two filters with the same shape produce the same bound query and
+        differ only in their parameter values.
+        """
+        if not filters:
+            return ()
+        return tuple(
+            sorted(
+                (table, tuple(self._filter_columns(rows)))
+                for table, rows in filters.items()
+                if rows
+            )
+        )
+
+    def filter_params(
+        self,
+        filters: t.Optional[t.Dict[str, t.List[dict]]],
+        nodes: t.Optional[t.Iterable[Node]] = None,
+    ) -> dict:
+        """
+        Bound array parameters for a query built with bind=True.
+
+        With the nodes of the query, rows with a value their column can't
+        be compared with are left out, as _build_filters does.
+
+        e.g
+        filters = {'book': [{'isbn': '001'}, {'isbn': '002'}]}
+        returns {'book_0_isbn': ['001', '002']}
+        """
+        tables: t.Dict[str, Node] = {}
+        for node in nodes or []:
+            tables.setdefault(node.table, node)
+        params: dict = {}
+        for table, rows in (filters or {}).items():
+            for i, columns in enumerate(self._filter_columns(rows)):
+                matches: t.List[dict] = [
+                    row
+                    for row in rows
+                    if tuple(sorted(row)) == columns
+                    and (
+                        table not in tables
+                        or all(
+                            self._is_comparable(
+                                tables[table], column, row[column]
+                            )
+                            for column in columns
+                        )
+                    )
+                ]
+                for column in columns:
+                    params[self._filter_param(table, i, column)] = [
+                        row[column] for row in matches
+                    ]
+        return params
+
+    def _bind_filters(
+        self, filters: t.Dict[str, t.List[dict]], node: Node
+    ) -> t.Optional[sa.sql.elements.ColumnElement]:
+        """
+        Build SQLAlchemy filters with bound array parameters.
+
+        Rows sharing a column set are matched with one array parameter
+        per column, so the statement depends on the shape of the filters
+        and not on their values:
+            book.isbn = ANY(:book_0_isbn)
+            (book.id, book.uid) IN (
+                SELECT id, uid FROM unnest(:book_0_id, :book_0_uid)
+                AS anon_1(id, uid)
+            )
+        """
+        if filters is not None:
+            if filters.get(node.table):
+                clause: t.List = []
+                for i, columns in enumerate(
+                    self._filter_columns(filters.get(node.table))
+                ):
+                    params: t.List = [
+                        sa.bindparam(
+                            self._filter_param(node.table, i, column),
+                            type_=sa.dialects.postgresql.ARRAY(
+                                node.model.c[column].type
+                            ),
+                        )
+                        for column in columns
+                    ]
+                    if len(columns) == 1:
+                        clause.append(
+                            node.model.c[columns[0]] == sa.any_(params[0])
+                        )
+                    else:
+                        values = (
+                            sa.func.unnest(*params)
+                            .table_valued(*columns)
+                            .render_derived(with_types=False)
+                        )
+                        clause.append(
+                            sa.tuple_(
+                                *[node.model.c[column] for column in columns]
+                            ).in_(sa.select(*values.c))
+                        )
                 return sa.or_(*clause)
 
     def _json_build_object(
-        self, columns: t.List, chunk_size: int = 100
+        self,
+        columns: t.List,
+        chunk_size: int = 100,
+        transform: t.Optional[dict] = None,
     ) -> sa.sql.elements.BinaryExpression:
         """
         Tries to get aroud the limitation of JSON_BUILD_OBJECT which
@@ -142,7 +335,12 @@ class QueryBuilder(threading.local):
 
         with the 100 arguments limit this implies we can only select 50 columns
         at a time.
+
+        The transforms pushed down into the query (see Node.pushdown) are
+        applied to the columns first.
         """
+        if transform:
+            columns = self._transform_columns(columns, transform)
         i: int = 0
         expression: t.Optional[sa.sql.elements.BinaryExpression] = None
         while i < len(columns):
@@ -157,6 +355,41 @@ class QueryBuilder(threading.local):
             raise RuntimeError("invalid expression")
         return expression
 
+    def _transform_columns(self, columns: t.List, transform: dict) -> t.List:
+        """
+        Apply the replace, rename and concat transforms to the key/value
+        pairs of a JSON object, in the order Transform.transform does.
+
+        e.g
+            "replace": {"code": {"-": "="}} -> REPLACE(code, '-', '=')
+            "rename": {"id": "book_id"} -> 'book_id', id
+            "concat": {"columns": ["a", "b"], "destination": "c"}
+                -> 'c', CONCAT_WS('', NULLIF(a, ''), NULLIF(b, ''))
+        """
+        replace: dict = transform.get(REPLACE_TRANSFORM, {})
+        rename: dict = transform.get(RENAME_TRANSFORM, {})
+        fields: dict = {}
+        for key, column in zip(columns[::2], columns[1::2]):
+            for search, value in replace.get(key, {}).items():
+                column = sa.func.REPLACE(column, search, value)
+            fields[rename.get(key, key)] = column
+
+        for rule in transform.get(CONCAT_TRANSFORM, []):
+            # empty values are skipped, as in Transform.concat
+            values: t.List = [
+                (
+                    sa.func.NULLIF(fields[column], "")
+                    if column in fields
+                    else sa.literal(column)
+                )
+                for column in rule["columns"]
+                if column in fields or column
+            ]
+            fields[rule["destination"]] = sa.func.CONCAT_WS(
+                rule.get("delimiter", ""), *values
+            )
+        return [item for field in fields.items() for item in field]
+
     # this is for handling non-through tables
     def get_foreign_keys(
         self, node_a: Node, node_b: Node
@@ -391,6 +624,7 @@ class QueryBuilder(threading.local):
         txmin: t.Optional[int] = None,
         txmax: t.Optional[int] = None,
         ctid: t.Optional[dict] = None,
+        pages: t.Optional[t.Tuple[int, t.Optional[int]]] = None,
     ) -> None:
         columns = [
             JSON_ARRAY(
@@ -403,7 +637,7 @@ class QueryBuilder(threading.local):
                     )
                 ]
             ),
-            self._json_build_object(node.columns),
+            self._json_build_object(node.columns, transform=node.pushdown),
             *node.primary_keys,
         ]
         node._subquery = sa.select(*columns)
@@ -443,6 +677,19 @@ class QueryBuilder(threading.local):
                     )
                 )
 
+        if pages is not None:
+            # a range of heap pages, open-ended when the end is None
+            start, end = pages
+            node._filters.append(
+                node.model.c.ctid
+                >= sa.cast(sa.literal(f"({start},0)"), TupleIdentifierType)
+            )
+            if end is not None:
+                node._filters.append(
+                    node.model.c.ctid
+                    < sa.cast(sa.literal(f"({end},0)"), TupleIdentifierType)
+                )
+
         if txmin:
             node._filters.append(
                 sa.cast(
@@ -631,11 +878,15 @@ class QueryBuilder(threading.local):
                     )
                 else:
                     columns.append(
-                        self._json_build_object(node.columns).label("anon")
+                        self._json_build_object(
+                            node.columns, transform=node.pushdown
+                        ).label("anon")
                     )
             elif node.relationship.type == ONE_TO_MANY:
                 columns.append(
-                    self._json_build_object(node.columns).label("anon")
+                    self._json_build_object(
+                        node.columns, transform=node.pushdown
+                    ).label("anon")
                 )
 
         columns.extend(
@@ -951,13 +1202,17 @@ class QueryBuilder(threading.local):
         elif node.relationship.variant == OBJECT:
             if node.relationship.type == ONE_TO_ONE:
                 columns.append(
-                    self._json_build_object(node.columns).label(node.label)
+                    self._json_build_object(
+                        node.columns, transform=node.pushdown
+                    ).label(node.label)
                 )
             elif node.relationship.type == ONE_TO_MANY:
                 columns.append(
-                    JSON_AGG(self._json_build_object(node.columns)).label(
-                        node.label
-                    )
+                    JSON_AGG(
+                        self._json_build_object(
+                            node.columns, transform=node.pushdown
+                        )
+                    ).label(node.label)
                 )
 
         for column in foreign_key_columns:
@@ -1003,10 +1258,15 @@ class QueryBuilder(threading.local):
         txmin: t.Optional[int] = None,
         txmax: t.Optional[int] = None,
         ctid: t.Optional[dict] = None,
+        bind: bool = False,
+        pages: t.Optional[t.Tuple[int, t.Optional[int]]] = None,
     ) -> None:
         """Build node query."""
         self.from_obj = None
-        _filters = self._build_filters(filters, node)
+        if bind:
+            _filters = self._bind_filters(filters, node)
+        else:
+            _filters = self._build_filters(filters, node)
         if _filters is not None:
             node._filters.append(_filters)
 
@@ -1014,7 +1274,7 @@ class QueryBuilder(threading.local):
         self._children(node)
 
         if node.is_root:
-            self._root(node, txmin=txmin, txmax=txmax, ctid=ctid)
+            self._root(node, txmin=txmin, txmax=txmax, ctid=ctid, pages=pages)
         else:
             # 2) subquery: these are for children creating their own columns
             if node.relationship.throughs:
@@ -1,6 +1,8 @@
 """PGSync SearchClient helper."""
 
 import logging
+import math
+import time
 import typing as t
 from collections import defaultdict
 
@@ -13,6 +15,7 @@ import opensearchpy
 from requests_aws4auth import AWS4Auth
 
 from . import settings
+from .batchsize import BatchSize
 from .constants import (
     ELASTICSEARCH_MAPPING_PARAMETERS,
     ELASTICSEARCH_TYPES,
@@ -80,6 +83,18 @@ class SearchClient(Sink):
             raise RuntimeError("Unknown search client")
 
         self.doc_count: int = 0
+        # bulk items rejected with a 429
+        self.rejected: int = 0
+        self.chunk_size: BatchSize = BatchSize(
+            "ELASTICSEARCH_CHUNK_SIZE",
+            settings.ADAPTIVE_BATCH_SIZE_REQUEST_LATENCY,
+        )
+        # the bulk helpers write a str _source into the body verbatim
+        self.raw_json: bool = True
+        # bulk update actions merge a partial doc into the stored one
+        self.partial_update: bool = True
+        # the bulk helpers yield the result of every action
+        self.acknowledges: bool = True
 
     def close(self) -> None:
         """Close transport connection."""
@@ -126,7 +141,9 @@ class SearchClient(Sink):
         ignore_status: t.Tuple[int] = None,
     ) -> None:
         """Pull sync data from generator to Elasticsearch/OpenSearch."""
-        chunk_size = chunk_size or settings.ELASTICSEARCH_CHUNK_SIZE
+        # only the default chunk size adapts to the bulk round-trip time
+        adaptive: bool = chunk_size is None and settings.ADAPTIVE_BATCH_SIZE
+        chunk_size = chunk_size or self.chunk_size.size
         max_chunk_bytes = (
             max_chunk_bytes or settings.ELASTICSEARCH_MAX_CHUNK_BYTES
         )
@@ -147,8 +164,11 @@ class SearchClient(Sink):
         )
         ignore_status = ignore_status or settings.ELASTICSEARCH_IGNORE_STATUS
 
+        rejected: int = self.rejected
+        started: float = time.time()
+        count: int = 0
         try:
-            self._bulk(
+            count = self._bulk(
                 index,
                 actions,
                 chunk_size=chunk_size,
@@ -164,9 +184,21 @@ class SearchClient(Sink):
                 ignore_status=ignore_status,
             )
         except Exception as e:
+            if _is_rejected(e):
+                self.rejected += 1
             logger.exception(f"Exception {e}")
             if raise_on_exception or raise_on_error:
                 raise
+        finally:
+            if adaptive and (count or self.rejected > rejected):
+                # approximate round-trip time of one chunk
+                rounds: int = math.ceil(count / chunk_size) or 1
+                if not settings.ELASTICSEARCH_STREAMING_BULK:
+                    rounds = math.ceil(rounds / max(thread_count, 1))
+                self.chunk_size.observe(
+                    (time.time() - started) / rounds,
+                    rejected=self.rejected > rejected,
+                )
 
     def _bulk(
         self,
@@ -183,45 +215,84 @@ class SearchClient(Sink):
         raise_on_exception: bool,
         raise_on_error: bool,
         ignore_status: t.Tuple[int],
-    ):
-        """Bulk index, update, delete docs to Elasticsearch/OpenSearch."""
-        if settings.ELASTICSEARCH_STREAMING_BULK:
-            for ok, info in self.streaming_bulk(
-                self.__client,
-                actions,
-                index=index,
-                chunk_size=chunk_size,
-                max_chunk_bytes=max_chunk_bytes,
-                max_retries=max_retries,
-                max_backoff=max_backoff,
-                initial_backoff=initial_backoff,
-                refresh=refresh,
-                raise_on_exception=raise_on_exception,
-                raise_on_error=raise_on_error,
-            ):
-                if ok:
-                    self.doc_count += 1
-                else:
-                    logger.error(f"Document failed to index: {info}")
-        else:
-            # parallel bulk consumes more memory and is also more likely
-            # to result in 429 errors.
-            for ok, info in self.parallel_bulk(
-                self.__client,
-                actions,
-                thread_count=thread_count,
-                chunk_size=chunk_size,
-                max_chunk_bytes=max_chunk_bytes,
-                queue_size=queue_size,
-                refresh=refresh,
-                raise_on_exception=raise_on_exception,
-                raise_on_error=raise_on_error,
-                ignore_status=ignore_status,
-            ):
-                if ok:
-                    self.doc_count += 1
-                else:
-                    logger.error(f"Document failed to index: {info}")
+    ) -> int:
+        """
+        Bulk index, update, delete docs to Elasticsearch/OpenSearch.
+
+        Returns the number of actions processed.
+        """
+        count: int = 0
+        # ids of the index actions to acknowledge
+        written: t.List[str] = []
+        failed: t.List[str] = []
+        try:
+            if settings.ELASTICSEARCH_STREAMING_BULK:
+                for ok, info in self.streaming_bulk(
+                    self.__client,
+                    actions,
+                    index=index,
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes,
+                    max_retries=max_retries,
+                    max_backoff=max_backoff,
+                    initial_backoff=initial_backoff,
+                    refresh=refresh,
+                    raise_on_exception=raise_on_exception,
+                    raise_on_error=raise_on_error,
+                ):
+                    count += 1
+                    if ok:
+                        self.doc_count += 1
+                    else:
+                        if _item_status(info) == 429:
+                            self.rejected += 1
+                        logger.error(f"Document failed to index: {info}")
+                    self._settle(ok, info, written, failed, chunk_size)
+            else:
+                # parallel bulk consumes more memory and is also more likely
+                # to result in 429 errors.
+                for ok, info in self.parallel_bulk(
+                    self.__client,
+                    actions,
+                    thread_count=thread_count,
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes,
+                    queue_size=queue_size,
+                    refresh=refresh,
+                    raise_on_exception=raise_on_exception,
+                    raise_on_error=raise_on_error,
+                    ignore_status=ignore_status,
+                ):
+                    count += 1
+                    if ok:
+                        self.doc_count += 1
+                    else:
+                        if _item_status(info) == 429:
+                            self.rejected += 1
+                        logger.error(f"Document failed to index: {info}")
+                    self._settle(ok, info, written, failed, chunk_size)
+        finally:
+            self._settle(True, None, written, failed, 0)
+
+        return count
+
+    def _settle(
+        self,
+        ok: bool,
+        info: t.Any,
+        written: t.List[str],
+        failed: t.List[str],
+        chunk_size: int,
+    ) -> None:
+        """Collect the result of an index action and acknowledge in chunks."""
+        if self.acknowledge is None:
+            return
+        if isinstance(info, dict) and isinstance(info.get("index"), dict):
+            (written if ok else failed).append(info["index"].get("_id"))
+        if (written or failed) and len(written) + len(failed) >= chunk_size:
+            self.acknowledge(written[:], failed[:])
+            written.clear()
+            failed.clear()
 
     def refresh(self, indices: t.List[str]) -> None:
         """Refresh the Elasticsearch/OpenSearch index."""
@@ -495,3 +566,22 @@ def get_search_client(
                 else {"pool_maxsize": pool_maxsize}
             ),
         )
+
+
+def _item_status(item: t.Any) -> t.Optional[int]:
+    """Return the status of a bulk response item e.g {'index': {...}}."""
+    if not isinstance(item, dict):
+        return None
+    result: t.Any = next(iter(item.values()), None)
+    if isinstance(result, dict):
+        return result.get("status")
+    return None
+
+
+def _is_rejected(error: Exception) -> bool:
+    """Return True if a bulk request or one of its items got a 429."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return any(
+        _item_status(item) == 429 for item in getattr(error, "errors", ())
+    )
@@ -38,6 +38,10 @@ REDIS_CHECKPOINT = env.bool("REDIS_CHECKPOINT", default=False)
 JOIN_QUERIES = env.bool("JOIN_QUERIES", default=False)
 # Batch size for logical slot changes (minimizes temp file disk usage)
 LOGICAL_SLOT_CHUNK_SIZE = env.int("LOGICAL_SLOT_CHUNK_SIZE", default=5000)
+# Count logical slot changes before catching up (decodes the whole backlog)
+LOGICAL_SLOT_COUNT_CHANGES = env.bool(
+    "LOGICAL_SLOT_COUNT_CHANGES", default=False
+)
 # Stdout log interval in seconds
 LOG_INTERVAL = env.float("LOG_INTERVAL", default=0.5)
 # Number of workers for handling events
@@ -52,6 +56,8 @@ QUERY_LITERAL_BINDS = env.bool("QUERY_LITERAL_BINDS", default=False)
 QUERY_CHUNK_SIZE = env.int("QUERY_CHUNK_SIZE", default=10000)
 # Records per filter chunk
 FILTER_CHUNK_SIZE = env.int("FILTER_CHUNK_SIZE", default=5000)
+# Docs handed to the plugins at a time
+PLUGIN_BATCH_SIZE = env.int("PLUGIN_BATCH_SIZE", default=100)
 # Replication slot cleanup interval in seconds
 REPLICATION_SLOT_CLEANUP_INTERVAL = env.float(
     "REPLICATION_SLOT_CLEANUP_INTERVAL",
@@ -73,8 +79,52 @@ POLL_INTERVAL = env.float("POLL_INTERVAL", default=0.1)
 FORMAT_WITH_COMMAS = env.bool("FORMAT_WITH_COMMAS", default=True)
 # Use polling mode instead of triggers
 POLLING = env.bool("POLLING", default=False)
+# Re-read window below each watermark for rows that commit late, re-read
+# once per that many seconds (seconds for date/time columns, column units
+# for numeric ones)
+WATERMARK_LAG = env.float("WATERMARK_LAG", default=60.0)
 # Use WAL streaming mode
 WAL = env.bool("WAL", default=False)
+# Output plugin for WAL streaming mode: test_decoding or pgoutput
+WAL_PLUGIN = env.str("WAL_PLUGIN", default="test_decoding")
+# Batches decoded ahead of indexing in WAL streaming mode (0 = flush inline)
+WAL_FLUSH_QUEUE_SIZE = env.int("WAL_FLUSH_QUEUE_SIZE", default=0)
+# Seconds between ACKs of the batches indexed in the background while the
+# WAL stream is idle (WAL_FLUSH_QUEUE_SIZE > 0)
+WAL_FEEDBACK_INTERVAL = env.float("WAL_FEEDBACK_INTERVAL", default=1.0)
+# Decode the WAL once per database and fan out to every index
+WAL_SHARED_READER = env.bool("WAL_SHARED_READER", default=True)
+# Grow/shrink the chunk sizes at runtime from the observed latency
+ADAPTIVE_BATCH_SIZE = env.bool("ADAPTIVE_BATCH_SIZE", default=False)
+# Bounds for adaptive chunk sizes as a ratio of the configured chunk size
+ADAPTIVE_BATCH_SIZE_MIN_RATIO = env.float(
+    "ADAPTIVE_BATCH_SIZE_MIN_RATIO", default=0.1
+)
+ADAPTIVE_BATCH_SIZE_MAX_RATIO = env.float(
+    "ADAPTIVE_BATCH_SIZE_MAX_RATIO", default=4.0
+)
+# Target seconds for one SQL query or bulk request
+ADAPTIVE_BATCH_SIZE_REQUEST_LATENCY = env.float(
+    "ADAPTIVE_BATCH_SIZE_REQUEST_LATENCY", default=1.0
+)
+# Target seconds to sync one logical slot page or Redis/Valkey batch
+ADAPTIVE_BATCH_SIZE_BATCH_LATENCY = env.float(
+    "ADAPTIVE_BATCH_SIZE_BATCH_LATENCY", default=10.0
+)
+# Index documents as the JSON text Postgres builds when the schema has no
+# transforms, plugins or routing
+JSON_PASSTHROUGH = env.bool("JSON_PASSTHROUGH", default=False)
+# Send a change to a child table as a partial update of the branch of the
+# document it belongs to rather than re-indexing the whole document
+PARTIAL_UPDATES = env.bool("PARTIAL_UPDATES", default=False)
+# Skip re-indexing docs whose _source hashes the same as when last indexed,
+# keeping the hashes in "memory" (an LRU per process) or "redis"
+FINGERPRINT_STORE = env.str("FINGERPRINT_STORE", default=None)
+# Number of docs the in-memory fingerprint store holds
+FINGERPRINT_CACHE_SIZE = env.int("FINGERPRINT_CACHE_SIZE", default=100000)
+# Apply the rename, concat and replace transforms in the sync queries where
+# Postgres gives the same result, leaving only the rest to Python
+TRANSFORM_PUSHDOWN = env.bool("TRANSFORM_PUSHDOWN", default=True)
 
 # =============================================================================
 # SQLAlchemy
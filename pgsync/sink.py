@@ -28,6 +28,12 @@ member               role
 ``close``            release the connection
 ``name``             human label for logging
 ``doc_count``        running count of successfully written docs
+``rejected``         running count of writes rejected with a 429
+``chunk_size``       adaptive bulk chunk size shown in the status, if any
+``raw_json``         whether ``_source`` may be passed as serialized JSON text
+``partial_update``   whether an ``update`` action with a partial ``doc`` applies
+``acknowledges``     whether the sink calls ``acknowledge`` with doc results
+``acknowledge``      set by ``Sync``: called with the ids written and failed
 ===================  =========================================================
 
 Only ``bulk`` and ``_create_setting`` are abstract; a non-search sink that has
@@ -44,6 +50,7 @@ import abc
 import typing as t
 
 if t.TYPE_CHECKING:  # avoid importing node/settings just for a type hint
+    from .batchsize import BatchSize
     from .node import Tree
 
 
@@ -57,6 +64,16 @@ class Sink(abc.ABC):
     # --- attributes Sync reads ----------------------------------------------
     name: str = "Sink"
     doc_count: int = 0
+    rejected: int = 0
+    chunk_size: t.Optional["BatchSize"] = None
+    raw_json: bool = False
+    partial_update: bool = False
+    acknowledges: bool = False
+    # a sink that reports per-doc results calls this with the ``_id`` of
+    # the index actions written and failed
+    acknowledge: t.Optional[t.Callable[[t.List[str], t.List[str]], None]] = (
+        None
+    )
 
     # --- required ------------------------------------------------------------
     @abc.abstractmethod
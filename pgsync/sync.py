@@ -5,6 +5,7 @@ import json
 import logging
 import os
 import pprint
+import queue
 import re
 import select
 import sys
@@ -12,7 +13,8 @@ import threading
 import time
 import typing as t
 from collections import defaultdict
-from itertools import groupby
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
 from pathlib import Path
 
 import click
@@ -35,6 +37,7 @@ from pgsync.settings import IS_MYSQL_COMPAT
 
 from . import __version__, settings
 from .base import Base, Payload
+from .batchsize import BatchSize
 from .constants import (
     DELETE,
     INSERT,
@@ -42,6 +45,8 @@ from .constants import (
     MATERIALIZED_VIEW,
     MATERIALIZED_VIEW_COLUMNS,
     META,
+    PGOUTPUT,
+    PLUGIN,
     PRIMARY_KEY_DELIMITER,
     TG_OPS,
     TRUNCATE,
@@ -55,7 +60,12 @@ from .exc import (
     RDSError,
     SchemaError,
 )
+from .explain import cost_per_docs, plan_issues
+from .fingerprint import Fingerprints, LRUFingerprints, RedisFingerprints
 from .node import Node, Tree
+from .pgoutput import COMMIT as PGOUTPUT_COMMIT
+from .pgoutput import MESSAGE as PGOUTPUT_MESSAGE
+from .pgoutput import PgOutputDecoder
 from .plugin import Plugins
 from .querybuilder import QueryBuilder
 from .redisqueue import RedisQueue
@@ -68,6 +78,8 @@ from .utils import (
     config_loader,
     exception,
     format_number,
+    int_to_lsn,
+    lsn_to_int,
     MutuallyExclusiveOption,
     remap_unknown,
     show_settings,
@@ -95,6 +107,9 @@ logger = logging.getLogger(__name__)
 class Sync(Base, metaclass=Singleton):
     """Main application class for Sync."""
 
+    # set lazily by the fingerprints property
+    _fingerprints: t.Optional[Fingerprints] = None
+
     def __init__(
         self,
         doc: dict,
@@ -127,13 +142,19 @@ class Sync(Base, metaclass=Singleton):
             "[^0-9a-zA-Z_]+", "", f"{self.database.lower()}_{self.index}"
         )
         self._checkpoint: t.Optional[t.Union[str, int]] = None
+        # WAL position reached at the last checkpoint
+        self._checkpoint_lsn: t.Optional[str] = None
         self._plugins: Plugins = None
         self._truncate: bool = False
         self.producer: bool = producer
         self.consumer: bool = consumer
         self.num_workers: int = num_workers
+        self.wal: bool = wal
         # Redis not required in wal or polling mode
         self._redis: t.Optional[RedisQueue] = None
+        self._fingerprints: t.Optional[Fingerprints] = None
+        # node name -> (time, watermark) of the last lag window re-read
+        self._settled: t.Dict[str, t.Tuple[float, t.Any]] = {}
         self.tree: Tree = Tree(
             self.models, nodes=self.nodes, database=doc["database"]
         )
@@ -149,6 +170,8 @@ class Sync(Base, metaclass=Singleton):
             self._plugins: Plugins = Plugins("plugins", self.plugins)
 
         self.query_builder: QueryBuilder = QueryBuilder(verbose=verbose)
+        # root queries built with bound filters, keyed by filter shape
+        self._queries: t.Dict[tuple, sa.sql.Subquery] = {}
         self.count: dict = dict(xlog=0, db=0, redis=0)
         self.tasks: t.List[asyncio.Task] = []
         self.lock: threading.Lock = threading.Lock()
@@ -159,12 +182,62 @@ class Sync(Base, metaclass=Singleton):
         # daemon lifecycle (workers run until the process is killed) is unchanged.
         self._stop_event: threading.Event = threading.Event()
         self._workers: t.List[threading.Thread] = []
+        # pgoutput relation cache, created per replication stream
+        self._decoder: t.Optional[PgOutputDecoder] = None
+        # batches handed from the WAL stream reader to the flush worker
+        self._flush_queue: t.Optional[queue.Queue] = None
+        # last LSN indexed by the flush worker and last LSN sent as feedback
+        self._acked_lsn: t.Optional[t.Union[str, int]] = None
+        self._feedback_lsn: t.Optional[t.Union[str, int]] = None
+        # chunk sizes adapted to the observed latency (ADAPTIVE_BATCH_SIZE)
+        self.batch_sizes: t.Dict[str, BatchSize] = {
+            "LOGICAL_SLOT_CHUNK_SIZE": BatchSize(
+                "LOGICAL_SLOT_CHUNK_SIZE",
+                settings.ADAPTIVE_BATCH_SIZE_BATCH_LATENCY,
+            ),
+            "FILTER_CHUNK_SIZE": BatchSize(
+                "FILTER_CHUNK_SIZE",
+                settings.ADAPTIVE_BATCH_SIZE_REQUEST_LATENCY,
+            ),
+            "REDIS_READ_CHUNK_SIZE": BatchSize(
+                "REDIS_READ_CHUNK_SIZE",
+                settings.ADAPTIVE_BATCH_SIZE_BATCH_LATENCY,
+            ),
+        }
 
     @property
     def slot_name(self) -> str:
         """Return the replication slot name."""
         return self.__name
 
+    @property
+    def plugin(self) -> str:
+        """Return the logical decoding output plugin for the slot.
+
+        pgoutput is only used for WAL streaming; every other mode peeks
+        the slot through the SQL interface and needs test_decoding.
+        """
+        if self.wal and settings.WAL_PLUGIN == PGOUTPUT:
+            return PGOUTPUT
+        return PLUGIN
+
+    @property
+    def publication_name(self) -> str:
+        """Return the publication name used by pgoutput."""
+        return self.__name
+
+    @property
+    def publication_tables(self) -> t.Set[t.Tuple[str, str]]:
+        """Return the (schema, table) pairs that feed this tree."""
+        tables: t.Set[t.Tuple[str, str]] = set()
+        for node in self.tree.traverse_breadth_first():
+            tables.add((node.schema, node.table))
+            for through in node.relationship.throughs:
+                tables.add((through.schema, through.table))
+            for table in node.base_tables:
+                tables.add((node.schema, table))
+        return tables
+
     @property
     def checkpoint_file(self) -> str:
         return os.path.join(settings.CHECKPOINT_PATH, f".{self.__name}")
@@ -179,6 +252,40 @@ class Sync(Base, metaclass=Singleton):
                 pass
         return self._redis
 
+    @property
+    def fingerprints(self) -> t.Optional[Fingerprints]:
+        """Return the store of indexed doc hashes if FINGERPRINT_STORE is set."""
+        if self._fingerprints is None:
+            if (
+                settings.FINGERPRINT_STORE
+                and not self.search_client.acknowledges
+            ):
+                raise ValueError(
+                    f"FINGERPRINT_STORE needs a sink that acknowledges "
+                    f"written docs: {self.search_client.name} does not"
+                )
+            if settings.FINGERPRINT_STORE == "memory":
+                self._fingerprints = LRUFingerprints(
+                    settings.FINGERPRINT_CACHE_SIZE
+                )
+            elif settings.FINGERPRINT_STORE == "redis":
+                self._fingerprints = RedisFingerprints(self.__name)
+            elif settings.FINGERPRINT_STORE:
+                raise ValueError(
+                    f"Unknown FINGERPRINT_STORE "
+                    f"{settings.FINGERPRINT_STORE}: expected memory or redis"
+                )
+            if self._fingerprints is not None:
+                # hashes are only stored once the sink wrote their doc
+                self.search_client.acknowledge = self._fingerprints.acknowledge
+        return self._fingerprints
+
+    def _unchanged(self, docs: t.Iterator, skip: bool = True) -> t.Iterator:
+        """Drop the docs that hash the same as when they were last indexed."""
+        if self.fingerprints is None:
+            return docs
+        return self.fingerprints.changed(docs, skip=skip)
+
     def validate(self, repl_slots: bool = True, polling: bool = False) -> None:
         """Perform all validation right away."""
 
@@ -193,6 +300,12 @@ class Sync(Base, metaclass=Singleton):
         if self.index is None:
             raise ValueError("Index is missing for doc")
 
+        if settings.WAL_PLUGIN not in (PLUGIN, PGOUTPUT):
+            raise ValueError(
+                f"Unsupported WAL_PLUGIN: {settings.WAL_PLUGIN}. "
+                f"Must be one of {PLUGIN} or {PGOUTPUT}"
+            )
+
         # replication slot not needed in polling or mysql
         if not self.is_mysql_compat and not polling:
             max_replication_slots: t.Optional[str] = self.pg_settings(
@@ -225,12 +338,17 @@ class Sync(Base, metaclass=Singleton):
                 raise RDSError("rds.logical_replication is not enabled")
 
             # ensure we have run bootstrap and the replication slot exists
-            if repl_slots and not self.replication_slots(self.__name):
+            if repl_slots and not self.replication_slots(
+                self.__name, plugin=self.plugin
+            ):
                 raise RuntimeError(
                     f'Replication slot "{self.__name}" does not exist.\n'
                     f'Make sure you have run the "bootstrap" command.'
                 )
 
+        if polling and not self.is_mysql_compat:
+            self._validate_watermarks()
+
         if settings.REDIS_CHECKPOINT:
             # ensure Redis is reachable
             try:
@@ -278,6 +396,13 @@ class Sync(Base, metaclass=Singleton):
                         f"No primary key(s) for base table: {table}"
                     )
 
+    def _foreign_keys(self, node: Node) -> dict:
+        """Get the foreign keys joining a node to its parent."""
+        if node.relationship.throughs:
+            through: Node = node.relationship.throughs[0]
+            return self.query_builder.get_foreign_keys(node, through)
+        return self.query_builder.get_foreign_keys(node.parent, node)
+
     def analyze(self) -> None:
         for node in self.tree.traverse_breadth_first():
             if node.is_root:
@@ -287,18 +412,7 @@ class Sync(Base, metaclass=Singleton):
                 str(primary_key.name) for primary_key in node.primary_keys
             ]
 
-            foreign_keys: dict
-            if node.relationship.throughs:
-                through: Node = node.relationship.throughs[0]
-                foreign_keys = self.query_builder.get_foreign_keys(
-                    node,
-                    through,
-                )
-            else:
-                foreign_keys = self.query_builder.get_foreign_keys(
-                    node.parent,
-                    node,
-                )
+            foreign_keys: dict = self._foreign_keys(node)
 
             columns: list
             for index in self.indices(node.table, node.schema):
@@ -328,6 +442,101 @@ class Sync(Base, metaclass=Singleton):
                 sys.stdout.write("\n")
                 sys.stdout.flush()
 
+    def _sample_filters(self, node: Node) -> t.Optional[dict]:
+        """Get the primary key of one row of a node to filter by."""
+        row: t.Optional[sa.engine.Row] = self.fetchone(
+            sa.select(*node.primary_keys).limit(1)
+        )
+        if row is None:
+            return None
+        return {node.table: [dict(row._mapping)]}
+
+    def explain(self) -> None:
+        """
+        Explain the sync queries and report the parts that won't scale.
+
+        The full and xmin queries are planned only. The queries filtered
+        by root or child keys run with EXPLAIN ANALYZE for one sample
+        key each, so their estimates can be checked too. Issues are
+        reported per node, along with the index that would avoid them.
+        """
+        root: Node = self.tree.root
+        queries: t.List[t.Tuple[str, t.Optional[dict], t.Optional[int]]] = [
+            ("full sync", None, None),
+            ("xmin sync", None, self.txid_current),
+        ]
+        root_filters: t.Optional[dict] = self._sample_filters(root)
+        if root_filters:
+            queries.append((f"sync by {root.name} keys", root_filters, None))
+            for node in self.tree.traverse_breadth_first():
+                if node.is_root:
+                    continue
+                filters: t.Optional[dict] = self._sample_filters(node)
+                if filters:
+                    queries.append(
+                        (
+                            f"sync by {node.name} keys",
+                            {**root_filters, **filters},
+                            None,
+                        )
+                    )
+        else:
+            sys.stdout.write(
+                f'Table "{root.table}" is empty: '
+                f"skipping the filtered queries\n"
+            )
+
+        # the node each relation in a plan belongs to
+        nodes: t.Dict[str, t.Tuple[Node, Node]] = {}
+        for node in self.tree.traverse_breadth_first():
+            nodes.setdefault(node.table, (node, node))
+            for through in node.relationship.throughs:
+                nodes.setdefault(through.table, (node, through))
+
+        suggested: t.Set[str] = set()
+        for label, filters, txmin in queries:
+            statement: sa.sql.Subquery = self._build_queries(
+                filters=filters, txmin=txmin, bind=filters is not None
+            )
+            plan: dict = self.explain_plan(
+                statement.select(),
+                params=self.query_builder.filter_params(
+                    filters, nodes=self.tree.traverse_breadth_first()
+                ),
+                analyze=filters is not None,
+            )["Plan"]
+            sys.stdout.write(
+                f"Query: {label}: estimated cost per 1,000 docs "
+                f"{cost_per_docs(plan):,.1f}\n"
+            )
+            # the full and xmin queries read the whole root table anyway
+            for relation, issue in plan_issues(
+                plan, seq_scans=filters is not None
+            ):
+                node, table = nodes.get(relation, (None, None))
+                sys.stdout.write(
+                    f"  {node.name if node else relation}: {issue}\n"
+                )
+                if node is None or node.is_root:
+                    continue
+                columns: list = self._foreign_keys(node).get(table.name, [])
+                if not columns:
+                    continue
+                query: str = sqlparse.format(
+                    f'CREATE INDEX idx_{table.table}_{"_".join(columns)} ON '
+                    f'{table.schema}.{table.table} ({", ".join(columns)})',
+                    reindent=True,
+                    keyword_case="upper",
+                )
+                if query not in suggested:
+                    suggested.add(query)
+                    sys.stdout.write(
+                        f'  Create one with: "\033[4m{query}\033[0m"\n'
+                    )
+            sys.stdout.write("-" * 80)
+            sys.stdout.write("\n")
+        sys.stdout.flush()
+
     def make_search_client(self) -> SearchClient:
         """Return the search-engine client.
 
@@ -464,10 +673,22 @@ class Sync(Base, metaclass=Singleton):
                             if_not_exists=if_not_exists,
                         )
 
+            if wal and self.plugin == PGOUTPUT:
+                if if_not_exists or not self.publication_exists(
+                    self.publication_name
+                ):
+                    self.create_publication(
+                        self.publication_name, self.publication_tables
+                    )
+
             if not polling:
-                if if_not_exists or not self.replication_slots(self.__name):
+                if if_not_exists or not self.replication_slots(
+                    self.__name, plugin=self.plugin
+                ):
 
-                    self.create_replication_slot(self.__name)
+                    self.create_replication_slot(
+                        self.__name, plugin=self.plugin
+                    )
 
     def teardown(
         self,
@@ -493,6 +714,9 @@ class Sync(Base, metaclass=Singleton):
                     f"Checkpoint file not found: {self.checkpoint_file}"
                 )
 
+            if self.fingerprints is not None:
+                self.fingerprints.clear()
+
             if not wal and not settings.REDIS_CHECKPOINT:
                 try:
                     if self.redis is None:
@@ -529,6 +753,9 @@ class Sync(Base, metaclass=Singleton):
                         self.drop_view(schema)
                         self.drop_function(schema)
 
+            if wal:
+                self.drop_publication(self.publication_name)
+
             if not polling:
                 self.drop_replication_slot(self.__name)
 
@@ -559,16 +786,54 @@ class Sync(Base, metaclass=Singleton):
         )
         sys.stdout.flush()
 
+    def log_lsn_progress(
+        self,
+        start_lsn: str,
+        lsn: str,
+        end_lsn: str,
+        changes: int,
+        elapsed: float,
+        total: t.Optional[int] = None,
+        bar_length: int = 30,
+    ) -> None:
+        """
+        Render a single-line, in-place catch-up progress update.
+
+        Progress and ETA are the share of WAL bytes from start_lsn to
+        end_lsn consumed so far, so no exact count of changes is needed.
+        """
+        size: int = max(lsn_to_int(end_lsn) - lsn_to_int(start_lsn), 0)
+        done: int = min(max(lsn_to_int(lsn) - lsn_to_int(start_lsn), 0), size)
+        percent: float = (done / size * 100) if size else 100.0
+        filled: int = int(bar_length * done // size) if size else bar_length
+        bar: str = "=" * filled + "-" * (bar_length - filled)
+        rate: int = int(changes / elapsed) if elapsed else 0
+        eta: str = "-:--:--"
+        if done and elapsed:
+            eta = str(timedelta(seconds=int((size - done) * elapsed / done)))
+        count: str = format_number(changes)
+        if total is not None:
+            count = f"{count}/{format_number(total)}"
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        sys.stdout.write(
+            f"\r{timestamp} WAL {self.database}:{self.index} "
+            f"[{bar}] {done / 1048576:,.1f}/{size / 1048576:,.1f} MB "
+            f"({percent:6.2f}%) {count} changes "
+            f"{format_number(rate)}/s ETA {eta}"
+        )
+        sys.stdout.flush()
+
     def logical_slot_changes(
         self,
         txmin: t.Optional[int] = None,
         txmax: t.Optional[int] = None,
         upto_lsn: t.Optional[str] = None,
         logical_slot_chunk_size: t.Optional[int] = None,
+        wal_lsn: t.Optional[str] = None,
     ) -> None:
         """
         Stream through the slot in pages of logical_slot_chunk_size,
-        grouping consecutive rows with the same (tg_op, table).
+        grouping rows with the same (tg_op, table).
 
         Here, we are grouping all rows of the same table and tg_op
         and processing them as a group in bulk.
@@ -583,37 +848,45 @@ class Sync(Base, metaclass=Singleton):
             {'tg_op': INSERT, 'table': A, ...},
         ]
 
-        We will have 3 groups being synced together in one execution
-        First 3 INSERT, Next 2 DELETE and then the next 2 INSERT.
-        Perhaps this could be improved but this is the best approach so far.
+        We will have 2 groups being synced together in one execution
+        All 5 INSERT and the 2 DELETE, unless the rows overlap in which
+        case the order is kept (see _regroup).
 
-        TODO: We can also process all INSERTS together and rearrange
-        them as done below
+        Each page is peeked from the start of the slot with upto_nchanges
+        so it ends on a transaction boundary. Once a page is indexed the
+        slot is advanced to the LSN of its last row. The next page starts
+        decoding after that LSN, so each WAL record is decoded only once
+        instead of re-decoding the slot from the start for every page.
+
+        txmax becomes the checkpoint, stored with wal_lsn when it was
+        read before txmax.
         """
-        offset: int = 0
-        limit: int = (
-            logical_slot_chunk_size or settings.LOGICAL_SLOT_CHUNK_SIZE
-        )
+        batch_size: BatchSize = self.batch_sizes["LOGICAL_SLOT_CHUNK_SIZE"]
         current: int = 0
-        total: int = self.logical_slot_count_changes(
-            self.__name,
-            txmin=txmin,
-            txmax=txmax,
-            upto_lsn=upto_lsn,
-        )
+        total: t.Optional[int] = None
+        if settings.LOGICAL_SLOT_COUNT_CHANGES:
+            # exact, but decodes the whole backlog one more time
+            total = self.logical_slot_count_changes(
+                self.__name,
+                txmin=txmin,
+                txmax=txmax,
+                upto_lsn=upto_lsn,
+            )
+            logger.info(f"Logical slot changes: {format_number(total)}")
+        # progress is measured from the slot position up to upto_lsn
+        start_lsn: t.Optional[str] = self.confirmed_flush_lsn(self.__name)
+        end_lsn: str = upto_lsn or self.current_wal_lsn
+        started: float = time.time()
         while True:
-            # peek one page of up to limit rows
+            limit: int = logical_slot_chunk_size or batch_size.size
+            # peek the next page of whole transactions of about limit rows
             raw: t.List[sa.engine.row.Row] = self.logical_slot_peek_changes(
                 slot_name=self.__name,
-                txmin=txmin,
-                txmax=txmax,
                 upto_lsn=upto_lsn,
-                limit=limit,
-                offset=offset,
+                upto_nchanges=limit,
             )
             if not raw:
                 break
-            offset += limit
 
             # parse and filter out BEGIN/COMMIT and unwanted schemas
             payloads: t.List[Payload] = []
@@ -622,6 +895,12 @@ class Sync(Base, metaclass=Singleton):
                     row.data
                 ):
                     continue
+                # rows outside [txmin, txmax) are paged past but not synced
+                xid: int = int(row.xid)
+                if (txmin is not None and xid < txmin) or (
+                    txmax is not None and xid >= txmax
+                ):
+                    continue
                 try:
                     payload: Payload = self.parse_logical_slot(row.data)
                 except Exception:
@@ -631,26 +910,36 @@ class Sync(Base, metaclass=Singleton):
                     payloads.append(payload)
 
             if payloads:
-                # bulk-index each consecutive run of (tg_op, table)
-                for (op, tbl), run in groupby(
-                    payloads,
-                    key=lambda payload: (payload.tg_op, payload.table),
-                ):
-                    batch: list = list(run)
-                    logger.debug(f"op: {op} tbl {tbl} - {len(batch)}")
-                    current += len(batch)
-                    self.log_xlog_progress(current, total, bar_length=30)
-                    self.search_client.bulk(self.index, self._payloads(batch))
-                    self.count["xlog"] += len(batch)
-
-        # mark those rows consumed
-        self.logical_slot_get_changes(
-            slot_name=self.__name,
-            txmin=txmin,
-            txmax=txmax,
-            upto_lsn=upto_lsn,
-        )
-        self.checkpoint = txmax or self.txid_current
+                current += len(payloads)
+                self.count["xlog"] += len(payloads)
+                with batch_size.measure(self.search_client):
+                    # bulk-index each (tg_op, table) group
+                    for batch in self._regroup(self._compact(payloads)):
+                        logger.debug(
+                            f"op: {batch[0].tg_op} tbl {batch[0].table} - "
+                            f"{len(batch)}"
+                        )
+                        self.search_client.bulk(
+                            self.index, self._payloads(batch)
+                        )
+
+            # mark this page consumed
+            self.replication_slot_advance(self.__name, raw[-1].lsn)
+            start_lsn = start_lsn or raw[0].lsn
+            self.log_lsn_progress(
+                start_lsn,
+                raw[-1].lsn,
+                end_lsn,
+                current,
+                time.time() - started,
+                total=total,
+            )
+
+        if txmax is None:
+            # read the position before the txid, see checkpoint_wal_lsn
+            wal_lsn = self.current_wal_lsn
+            txmax = self.txid_current
+        self._set_checkpoint(txmax, wal_lsn=wal_lsn)
 
     def _xlog_progress(self, current: int, total: t.Optional[int]) -> None:
         try:
@@ -1182,6 +1471,8 @@ class Sync(Base, metaclass=Singleton):
         unrouted_delete_ids: list,
     ) -> None:
         """Queue a routed delete or an id-only cross-shard fallback."""
+        if settings.FINGERPRINT_STORE and self.fingerprints is not None:
+            self.fingerprints.forget([doc["_id"]])
         if self.routing:
             # CDC normally includes only old primary-key values. When the old
             # routing value is unavailable, delete by id across all shards to
@@ -1344,6 +1635,8 @@ class Sync(Base, metaclass=Singleton):
                 docs.append(doc)
             if docs:
                 self.search_client.bulk(self.index, docs)
+            if settings.FINGERPRINT_STORE and self.fingerprints is not None:
+                self.fingerprints.clear()
 
         else:
             _filters: list = []
@@ -1364,6 +1657,234 @@ class Sync(Base, metaclass=Singleton):
 
         return filters
 
+    def _row_key(
+        self, payload: Payload, data: dict
+    ) -> t.Optional[t.Tuple[t.Any, ...]]:
+        """Identity of a source row as (schema, table, *primary_values)."""
+        if (
+            payload.table not in self.tree.tables
+            or payload.schema not in self.tree.schemas
+        ):
+            return None
+        try:
+            node: Node = self.tree.get_node(payload.table, payload.schema)
+        except RuntimeError:
+            return None
+        primary_keys: t.List[str] = node.model.primary_keys
+        if not primary_keys or not all(key in data for key in primary_keys):
+            return None
+        key: tuple = (payload.schema, payload.table) + tuple(
+            data[key] for key in primary_keys
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _compact(self, payloads: t.List[Payload]) -> t.List[Payload]:
+        """
+        Fold the changes to each source row into one net change.
+
+        Changes are matched by (schema, table, primary key) and follow a
+        row through primary key updates.
+
+        e.g
+            INSERT + UPDATE + UPDATE -> INSERT with the last new values
+            UPDATE + UPDATE          -> UPDATE from the first old values
+            UPDATE + DELETE          -> DELETE of the first old values
+            DELETE + INSERT          -> UPDATE
+            INSERT + DELETE          -> DELETE
+            INSERT + key UPDATE      -> DELETE of the first key + INSERT
+
+        A change is delivered at least once, so the doc of an INSERT may
+        be indexed already, e.g by a replayed batch paged differently or
+        by the sync pass in trigger mode. The keys an INSERT is followed
+        by a DELETE of, or moved away from, are always deleted.
+
+        The net change keeps the position of the first change to its row,
+        so a doc deleted by a primary key change is removed before another
+        row can take over that key. A TRUNCATE is kept in place and nothing
+        is folded across it.
+        """
+        compacted: t.List[Payload] = []
+        # row key -> position of the row's net change
+        live: t.Dict[tuple, int] = {}
+        # row key -> position of a net change whose row no longer exists
+        gone: t.Dict[tuple, int] = {}
+        for payload in payloads:
+            if payload.tg_op == TRUNCATE:
+                live.clear()
+                gone.clear()
+                compacted.append(payload)
+                continue
+
+            if payload.tg_op == INSERT:
+                after: t.Optional[tuple] = self._row_key(payload, payload.new)
+                i: t.Optional[int] = gone.pop(after, None)
+                if after is None or i is None or after in live:
+                    compacted.append(payload)
+                    if after is not None:
+                        live[after] = len(compacted) - 1
+                    continue
+                previous: Payload = compacted[i]
+                # DELETE + INSERT
+                compacted[i] = Payload(
+                    tg_op=UPDATE,
+                    table=payload.table,
+                    schema=payload.schema,
+                    old=previous.old,
+                    new=payload.new,
+                    xmin=previous.xmin,
+                    indices=previous.indices,
+                )
+                live[after] = i
+                continue
+
+            if payload.tg_op == UPDATE:
+                after = self._row_key(payload, payload.new)
+                before: t.Optional[tuple] = (
+                    self._row_key(payload, payload.old) or after
+                )
+            elif payload.tg_op == DELETE:
+                after = None
+                before = self._row_key(payload, payload.data)
+            else:
+                before = after = None
+
+            i = live.pop(before, None) if before is not None else None
+            if i is None:
+                compacted.append(payload)
+                i = len(compacted) - 1
+            else:
+                previous = compacted[i]
+                if previous.tg_op == INSERT and payload.tg_op == DELETE:
+                    # INSERT + DELETE
+                    compacted[i] = Payload(
+                        tg_op=DELETE,
+                        table=payload.table,
+                        schema=payload.schema,
+                        old={**previous.new, **payload.old},
+                        xmin=previous.xmin,
+                        indices=previous.indices,
+                    )
+                elif previous.tg_op == INSERT and after not in (None, before):
+                    # INSERT + primary key UPDATE
+                    compacted[i] = Payload(
+                        tg_op=DELETE,
+                        table=payload.table,
+                        schema=payload.schema,
+                        old=previous.new,
+                        xmin=previous.xmin,
+                        indices=previous.indices,
+                    )
+                    gone[before] = i
+                    compacted.append(
+                        Payload(
+                            tg_op=INSERT,
+                            table=payload.table,
+                            schema=payload.schema,
+                            new=payload.new,
+                            xmin=payload.xmin,
+                            indices=payload.indices,
+                        )
+                    )
+                    i = len(compacted) - 1
+                else:
+                    # INSERT + UPDATE, UPDATE + UPDATE or UPDATE + DELETE
+                    old: dict = previous.old
+                    if previous.tg_op == UPDATE:
+                        # the first old primary key is the indexed doc _id
+                        old = dict(payload.old)
+                        if self._row_key(previous, previous.old) is not None:
+                            old.update(previous.old)
+                    compacted[i] = Payload(
+                        tg_op=(
+                            INSERT
+                            if previous.tg_op == INSERT
+                            else payload.tg_op
+                        ),
+                        table=payload.table,
+                        schema=payload.schema,
+                        old=old,
+                        new=payload.new,
+                        xmin=previous.xmin,
+                        indices=previous.indices,
+                    )
+            if after is not None:
+                gone.pop(after, None)
+                live[after] = i
+            elif payload.tg_op == DELETE and before is not None:
+                gone[before] = i
+
+        return compacted
+
+    def _regroup(self, payloads: t.List[Payload]) -> t.List[t.List[Payload]]:
+        """
+        Group the payloads by (tg_op, schema, table) across the batch.
+
+        Every group ends in a re-query of the root docs, so changes to
+        different rows can be synced in any order. A payload joins the
+        last group with the same (tg_op, schema, table) unless a group
+        after it touches the same row key.
+        e.g [
+            {'tg_op': INSERT, 'table': A, ...},
+            {'tg_op': UPDATE, 'table': B, ...},
+            {'tg_op': INSERT, 'table': A, ...},
+            {'tg_op': UPDATE, 'table': B, ...},
+        ]
+        becomes 2 groups: 2 INSERT into A and 2 UPDATE of B.
+
+        A TRUNCATE or a payload without a primary key is never reordered
+        and nothing moves across it.
+        """
+        groups: t.List[t.List[Payload]] = []
+        # (tg_op, schema, table) -> index of the last such group
+        last: t.Dict[t.Tuple[str, str, str], int] = {}
+        # row key -> index of the last group touching it
+        touched: t.Dict[tuple, int] = {}
+        for payload in payloads:
+            group_key: t.Tuple[str, str, str] = (
+                payload.tg_op,
+                payload.schema,
+                payload.table,
+            )
+            keys: t.Set[tuple] = set()
+            if payload.tg_op != TRUNCATE:
+                keys = {
+                    key
+                    for key in (
+                        self._row_key(payload, payload.old),
+                        self._row_key(payload, payload.new),
+                    )
+                    if key is not None
+                }
+            if not keys:
+                # only consecutive runs are grouped across a barrier
+                tail: t.Optional[Payload] = groups[-1][-1] if groups else None
+                if tail is not None and group_key == (
+                    tail.tg_op,
+                    tail.schema,
+                    tail.table,
+                ):
+                    groups[-1].append(payload)
+                else:
+                    groups.append([payload])
+                last.clear()
+                touched.clear()
+                continue
+
+            i: t.Optional[int] = last.get(group_key)
+            if i is None or any(touched.get(key, -1) > i for key in keys):
+                groups.append([])
+                i = len(groups) - 1
+                last[group_key] = i
+            groups[i].append(payload)
+            for key in keys:
+                touched[key] = max(touched.get(key, -1), i)
+
+        return groups
+
     def _payloads(self, payloads: t.List[Payload]) -> t.Generator:
         """
         The "payloads" is a list of payload operations to process together.
@@ -1483,36 +2004,145 @@ class Sync(Base, metaclass=Singleton):
                 ]
             }
             """
-            for l1 in chunks(
-                filters.get(self.tree.root.table), settings.FILTER_CHUNK_SIZE
-            ):
-                if filters.get(node.table):
-                    for l2 in chunks(
-                        filters.get(node.table), settings.FILTER_CHUNK_SIZE
-                    ):
-                        if not node.is_root and filters.get(node.parent.table):
-                            for l3 in chunks(
-                                filters.get(node.parent.table),
-                                settings.FILTER_CHUNK_SIZE,
-                            ):
-                                yield from self.sync(
-                                    filters={
-                                        self.tree.root.table: l1,
-                                        node.table: l2,
-                                        node.parent.table: l3,
-                                    },
-                                )
-                        else:
-                            yield from self.sync(
-                                filters={
-                                    self.tree.root.table: l1,
-                                    node.table: l2,
-                                },
-                            )
-                else:
-                    yield from self.sync(
-                        filters={self.tree.root.table: l1},
+            subtree: t.Optional[Node] = self._subtree(node)
+            for _filters in self._plan_filters(node, filters):
+                yield from self.sync(filters=_filters, subtree=subtree)
+
+    def _subtree(self, node: Node) -> t.Optional[Node]:
+        """
+        Get the branch of the document a change to a node is confined to.
+
+        This is the child of the root that node belongs to. Its field is
+        sent as a partial update together with the root columns and the
+        _meta keys of its tables. Returns None when the whole document
+        has to be re-indexed.
+        """
+        if (
+            not settings.PARTIAL_UPDATES
+            or node.is_root
+            or not self.search_client.partial_update
+            or self._plugins
+            or self.pipeline
+        ):
+            return None
+
+        subtree: Node = node
+        while not subtree.parent.is_root:
+            subtree = subtree.parent
+
+        def tables(nodes: t.Iterable[Node]) -> t.Set[str]:
+            return {
+                table
+                for _node in nodes
+                for table in [
+                    _node.table,
+                    *[
+                        through.table
+                        for through in _node.relationship.throughs
+                    ],
+                ]
+            }
+
+        inside: t.List[Node] = list(subtree.traverse_breadth_first())
+        outside: t.List[Node] = [
+            _node
+            for _node in self.tree.traverse_breadth_first()
+            if all(_node is not other for other in inside)
+        ]
+        # the _meta keys of a table are replaced as a whole by the partial
+        # update, so its rows must not come from any other branch as well
+        if tables(inside) & tables(outside):
+            return None
+        return subtree
+
+    @staticmethod
+    def _unique_filters(rows: t.List[dict]) -> t.List[dict]:
+        """Drop duplicate filter rows and sort them by key value."""
+        unique: dict = {}
+        for row in rows:
+            unique.setdefault(
+                json.dumps(row, sort_keys=True, default=str), row
+            )
+        rows = list(unique.values())
+        try:
+            # neighbouring keys share index pages
+            rows.sort(key=lambda row: sorted(row.items()))
+        except TypeError:
+            # keys of mixed types have no order, keep arrival order
+            pass
+        return rows
+
+    def _plan_filters(self, node: Node, filters: dict) -> t.Iterator[dict]:
+        """
+        Plan the sync queries covering a set of filters.
+
+        Only the root filters select documents. The node and parent
+        filters narrow the tree query, so each batch of root keys is
+        queried once with the node and parent filters in full, rather
+        than once per combination of chunks:
+            root: [1..N] -> ceil(N / FILTER_CHUNK_SIZE) queries
+        """
+        tables: t.List[str] = [self.tree.root.table, node.table]
+        # parent filters only ever narrowed a filtered node
+        if not node.is_root and filters.get(node.table):
+            tables.append(node.parent.table)
+
+        plan: dict = {}
+        for table in tables:
+            if filters.get(table) and table not in plan:
+                plan[table] = self._unique_filters(filters[table])
+
+        roots: t.List[dict] = plan.pop(self.tree.root.table, [])
+        chunk_size: int = self.batch_sizes["FILTER_CHUNK_SIZE"].size
+        for batch in chunks(roots, chunk_size):
+            yield {self.tree.root.table: batch, **plan}
+
+    def _build_queries(
+        self,
+        filters: t.Optional[dict] = None,
+        txmin: t.Optional[int] = None,
+        txmax: t.Optional[int] = None,
+        ctid: t.Optional[dict] = None,
+        bind: bool = False,
+        pages: t.Optional[t.Tuple[int, t.Optional[int]]] = None,
+        subtree: t.Optional[Node] = None,
+    ) -> sa.sql.Subquery:
+        """
+        Build the query of every node and return the root query.
+
+        With a subtree, the root query only joins that branch.
+        """
+        self.query_builder.isouter = True
+        self.query_builder.from_obj = None
+
+        root: Node = self.tree.root
+        children: t.List[Node] = root.children
+        if subtree is not None:
+            root.children = [subtree]
+
+        try:
+            for node in root.traverse_post_order():
+                node._subquery = None
+                node._filters = []
+                node.setup()
+
+                try:
+                    self.query_builder.build_queries(
+                        node,
+                        filters=filters,
+                        txmin=txmin,
+                        txmax=txmax,
+                        ctid=ctid,
+                        bind=bind,
+                        pages=pages,
                     )
+                except Exception as e:
+                    logger.exception(f"Exception {e}")
+                    raise
+        finally:
+            root.children = children
+
+        return node._subquery
 
     def sync(
         self,
@@ -1520,6 +2150,7 @@ class Sync(Base, metaclass=Singleton):
         txmin: t.Optional[int] = None,
         txmax: t.Optional[int] = None,
         ctid: t.Optional[dict] = None,
+        subtree: t.Optional[Node] = None,
     ) -> t.Generator:
         """
         Synchronizes data from PostgreSQL/MySQL/MariaDB to Elasticsearch/OpenSearch.
@@ -1529,35 +2160,112 @@ class Sync(Base, metaclass=Singleton):
             txmin (Optional[int]): The minimum transaction ID to include in the synchronization.
             txmax (Optional[int]): The maximum transaction ID to include in the synchronization.
             ctid (Optional[dict]): A dictionary of ctid values to include in the synchronization.
+            subtree (Optional[Node]): A child of the root to send as a partial update.
 
         Yields:
             dict: A dictionary representing a doc to be indexed in Elasticsearch/OpenSearch.
         """
-        self.query_builder.isouter = True
-        self.query_builder.from_obj = None
-
-        for node in self.tree.traverse_post_order():
-            node._subquery = None
-            node._filters = []
-            node.setup()
-
-            try:
-                self.query_builder.build_queries(
-                    node, filters=filters, txmin=txmin, txmax=txmax, ctid=ctid
+        # a partial doc is merged as a dict by the update action
+        passthrough: bool = self.passthrough and subtree is None
+        params: t.Optional[dict] = None
+        if (
+            txmin is None
+            and txmax is None
+            and ctid is None
+            and not IS_MYSQL_COMPAT
+        ):
+            # the query only depends on the shape of the filters so build
+            # it once and bind the filter values as array parameters
+            shape: tuple = (
+                self.query_builder.filter_shape(filters),
+                passthrough,
+                subtree.name if subtree is not None else None,
+            )
+            if shape not in self._queries:
+                self._queries[shape] = self._build_queries(
+                    filters=filters, bind=True, subtree=subtree
                 )
-            except Exception as e:
-                logger.exception(f"Exception {e}")
-                raise
+                if passthrough:
+                    self._queries[shape] = self._as_text(self._queries[shape])
+            statement: sa.sql.Subquery = self._queries[shape]
+            params = self.query_builder.filter_params(
+                filters, nodes=self.tree.traverse_breadth_first()
+            )
+        else:
+            statement = self._build_queries(
+                filters=filters,
+                txmin=txmin,
+                txmax=txmax,
+                ctid=ctid,
+                subtree=subtree,
+            )
+            if passthrough:
+                statement = self._as_text(statement)
 
         if self.verbose:
-            compiled_query(node._subquery, "Query")
+            compiled_query(
+                statement.params(params) if params else statement, "Query"
+            )
+
+        # a full load may go into a new index, so every doc is sent
+        full: bool = filters is None and txmin is None and ctid is None
+        if full and self.fingerprints is not None:
+            self.fingerprints.clear()
+
+        yield from self._unchanged(
+            self._docs(
+                statement,
+                params=params,
+                filtered=bool(filters),
+                partial=subtree is not None,
+            ),
+            skip=not full,
+        )
+
+    def _docs(
+        self,
+        statement: sa.sql.Subquery,
+        params: t.Optional[dict] = None,
+        snapshot: t.Optional[str] = None,
+        filtered: bool = False,
+        partial: bool = False,
+    ) -> t.Iterator:
+        """Turn the rows of a root query into docs, then apply the plugins."""
+        docs: t.Iterator = self._row_docs(
+            statement,
+            params=params,
+            snapshot=snapshot,
+            filtered=filtered,
+            partial=partial,
+        )
+        if self._plugins:
+            # in batches, e.g to embed many docs with one model call
+            docs = self._plugins.transform_batch(
+                docs, chunk_size=settings.PLUGIN_BATCH_SIZE
+            )
+        return docs
 
+    def _row_docs(
+        self,
+        statement: sa.sql.Subquery,
+        params: t.Optional[dict] = None,
+        snapshot: t.Optional[str] = None,
+        filtered: bool = False,
+        partial: bool = False,
+    ) -> t.Generator:
+        """Turn the rows of a root query into docs."""
+        passthrough: bool = self.passthrough and not partial
+        node: Node = self.tree.root
+        started: float = time.time()
         for i, (keys, row, primary_keys) in enumerate(
-            self.fetchmany(node._subquery)
+            self.fetchmany(statement, params=params, snapshot=snapshot)
         ):
-            row: dict = Transform.transform(row, self.nodes)
-
-            row[META] = Transform.get_primary_keys(keys)
+            if i == 0 and filtered:
+                # time to the first row is the cost of the filtered query
+                self.batch_sizes["FILTER_CHUNK_SIZE"].observe(
+                    time.time() - started
+                )
+            meta: dict = Transform.get_primary_keys(keys)
 
             if node.is_root:
                 primary_key_values: t.List[str] = list(map(str, primary_keys))
@@ -1565,10 +2273,16 @@ class Sync(Base, metaclass=Singleton):
                     primary_key.name for primary_key in node.primary_keys
                 ]
                 # TODO: add support for composite pkeys
-                row[META][node.table] = {
+                meta[node.table] = {
                     primary_key_names[0]: [primary_key_values[0]],
                 }
 
+            if passthrough:
+                row: str = self._append_meta(row, meta)
+            else:
+                row: dict = self.tree.transform_plan.apply(row)
+                row[META] = meta
+
             if self.verbose:
                 print(f"{(i + 1)})")
                 print(f"pkeys: {primary_keys}")
@@ -1578,49 +2292,162 @@ class Sync(Base, metaclass=Singleton):
             doc: dict = {
                 "_id": self.get_doc_id(primary_keys, node.table),
                 "_index": self.index,
-                "_source": row,
             }
+            if partial:
+                # merged into the stored doc, the other branches are kept
+                doc["_op_type"] = "update"
+                doc["doc"] = row
+            else:
+                doc["_source"] = row
 
             if self.routing:
                 doc["_routing"] = row[self.routing]
 
             doc = self.search_client.prepare_action(doc)
 
-            if self._plugins:
-                doc = next(self._plugins.transform([doc]))
-                if not doc:
-                    continue
-
             if self.pipeline:
                 doc["pipeline"] = self.pipeline
 
             yield doc
 
-    @property
-    def checkpoint(self) -> t.Union[str, int]:
+    def parallel_sync(
+        self, parallel: int, txmin: t.Optional[int] = None
+    ) -> int:
         """
-        Gets the current checkpoint value from file or Redis/Valkey.
+        Sync the root table from parallel workers sharing one snapshot.
 
-        :return: The current checkpoint value.
-        :rtype: int or str
+        A coordinator transaction exports its snapshot and holds it open
+        while each worker reads a range of heap pages of the root table
+        with SET TRANSACTION SNAPSHOT. Every worker sees the same
+        consistent view, so no xmin bound is needed on the query.
+
+        Returns the xmin of the snapshot. Transactions from there on may
+        not be visible to the workers and are replayed from the slot.
         """
-        raw: t.Optional[str]
-        if settings.REDIS_CHECKPOINT:
-            raw = self.redis.get_meta(default={}).get("checkpoint")
-        else:
-            path: Path = Path(self.checkpoint_file)
-            raw = (
-                path.read_text(encoding="utf-8").split()[0]
-                if path.exists()
-                else None
+        root: Node = self.tree.root
+        workers: t.Optional[int] = parallel_workers()
+        if workers is not None and parallel > workers:
+            logger.warning(
+                f"Parallel sync: {parallel} workers need more connections "
+                f"than the pool holds, using {workers}"
             )
-
-        if raw is None:
-            return None
-
-        if self.is_mysql_compat:
-            parts: list[str] = [p.strip() for p in raw.split(",")]
-            if len(parts) != 2:
+            parallel = workers
+        pages: int = self.relation_pages(root.table, root.schema)
+        with self.engine.connect() as conn:
+            conn.execution_options(isolation_level="REPEATABLE READ")
+            snapshot, xmin = conn.execute(
+                sa.select(
+                    sa.func.PG_EXPORT_SNAPSHOT(),
+                    sa.func.TXID_SNAPSHOT_XMIN(
+                        sa.func.TXID_CURRENT_SNAPSHOT()
+                    ),
+                )
+            ).one()
+            # build every query up front as the tree is not thread safe
+            statements: t.List[sa.sql.Subquery] = []
+            for page_range in self._page_ranges(pages, parallel):
+                statement: sa.sql.Subquery = self._build_queries(
+                    txmin=txmin, pages=page_range
+                )
+                if self.passthrough:
+                    statement = self._as_text(statement)
+                statements.append(statement)
+            logger.info(
+                f"Parallel sync: {len(statements)} workers over "
+                f"{format_number(pages)} pages of {root.name} "
+                f"from snapshot {snapshot}"
+            )
+            if self.fingerprints is not None and txmin is None:
+                self.fingerprints.clear()
+            with ThreadPoolExecutor(max_workers=len(statements)) as executor:
+                futures: t.List[Future] = [
+                    executor.submit(
+                        self.search_client.bulk,
+                        self.index,
+                        self._unchanged(
+                            self._docs(statement, snapshot=snapshot),
+                            skip=txmin is not None,
+                        ),
+                    )
+                    for statement in statements
+                ]
+                for future in futures:
+                    future.result()
+        return xmin
+
+    @staticmethod
+    def _page_ranges(
+        pages: int, parallel: int
+    ) -> t.List[t.Tuple[int, t.Optional[int]]]:
+        """
+        Split the heap pages of a table into contiguous ranges.
+
+        The last range is open-ended so pages added since the table was
+        measured are still covered.
+        e.g. _page_ranges(10, 3) -> [(0, 3), (3, 6), (6, None)]
+        """
+        parallel = max(min(parallel, pages), 1)
+        size: int = pages // parallel
+        return [
+            (i * size, (i + 1) * size if i < parallel - 1 else None)
+            for i in range(parallel)
+        ]
+
+    @property
+    def passthrough(self) -> bool:
+        """
+        Whether docs can be indexed as the JSON text built by the database.
+
+        Transforms, plugins and routing all need the document as a dict.
+        """
+        return (
+            settings.JSON_PASSTHROUGH
+            and not IS_MYSQL_COMPAT
+            and self.search_client.raw_json
+            and not self._plugins
+            and not self.routing
+            and not self.tree.transform_plan
+        )
+
+    @staticmethod
+    def _as_text(statement: sa.sql.Subquery) -> sa.sql.Subquery:
+        """Return the root query with the document as JSON text."""
+        keys, row, *primary_keys = statement.c
+        return sa.select(keys, sa.cast(row, sa.Text), *primary_keys).subquery()
+
+    @staticmethod
+    def _append_meta(row: str, meta: dict) -> str:
+        """Append the _meta field to a document serialized as JSON text."""
+        row = row.rstrip()[:-1].rstrip()
+        if row != "{":
+            row += ", "
+        return f"{row}{json.dumps(META)}: {json.dumps(meta)}}}"
+
+    @property
+    def checkpoint(self) -> t.Union[str, int]:
+        """
+        Gets the current checkpoint value from file or Redis/Valkey.
+
+        :return: The current checkpoint value.
+        :rtype: int or str
+        """
+        raw: t.Optional[str]
+        if settings.REDIS_CHECKPOINT:
+            raw = self.redis.get_meta(default={}).get("checkpoint")
+        else:
+            path: Path = Path(self.checkpoint_file)
+            raw = (
+                path.read_text(encoding="utf-8").split()[0]
+                if path.exists()
+                else None
+            )
+
+        if raw is None:
+            return None
+
+        if self.is_mysql_compat:
+            parts: list[str] = [p.strip() for p in raw.split(",")]
+            if len(parts) != 2:
                 raise ValueError(
                     f"Corrupt checkpoint value (expected 'log_file,log_pos'): {raw!r}"
                 )
@@ -1660,19 +2487,94 @@ class Sync(Base, metaclass=Singleton):
         :type value: Optional[str]
         :raises TypeError: If the value is None.
         """
+        self._set_checkpoint(value)
+
+    def _set_checkpoint(
+        self, value: t.Union[str, int], wal_lsn: t.Optional[str] = None
+    ) -> None:
+        """
+        Sets the checkpoint value and the WAL position it was taken at.
+
+        See checkpoint_wal_lsn for when wal_lsn may be given.
+        """
         if value is None:
             raise TypeError("Cannot assign a None value to checkpoint")
 
         if settings.REDIS_CHECKPOINT:
-            self.redis.set_meta({"checkpoint": value})
+            self.redis.set_meta(
+                {"checkpoint": value, "checkpoint_wal_lsn": wal_lsn}
+            )
         else:
             Path(self.checkpoint_file).write_text(
-                f"{value}\n", encoding="utf-8"
+                f"{value} {wal_lsn}\n" if wal_lsn else f"{value}\n",
+                encoding="utf-8",
             )
 
         # Update in-memory cache last
         self._checkpoint = value
 
+    @property
+    def checkpoint_wal_lsn(self) -> t.Optional[str]:
+        """
+        Gets the WAL position read just before the checkpoint txid was.
+
+        Transactions at or after the checkpoint txid were assigned their
+        txid later, so they commit after this position. A slot that has
+        not been advanced past it still holds every change the checkpoint
+        may be missing.
+
+        A checkpoint written by on_publish is stored with the position
+        read before its batch was indexed. Changes committed before then
+        are either in that batch or still queued in Redis/Valkey.
+        """
+        if settings.REDIS_CHECKPOINT:
+            return self.redis.get_meta(default={}).get("checkpoint_wal_lsn")
+        path: Path = Path(self.checkpoint_file)
+        if not path.exists():
+            return None
+        parts: t.List[str] = path.read_text(encoding="utf-8").split()
+        return parts[1] if len(parts) > 1 else None
+
+    @property
+    def watermarks(self) -> dict:
+        """
+        Gets the watermark of each table from file or Redis/Valkey.
+
+        :return: The last watermark column value synced per table.
+        :rtype: dict
+        """
+        if settings.REDIS_CHECKPOINT:
+            return self.redis.get_meta(default={}).get("watermarks") or {}
+        path: Path = Path(f"{self.checkpoint_file}.watermarks")
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @watermarks.setter
+    def watermarks(self, value: dict) -> None:
+        """
+        Sets the watermark of each table.
+
+        :param value: The last watermark column value synced per table.
+        :type value: dict
+        """
+        if settings.REDIS_CHECKPOINT:
+            self.redis.set_meta({"watermarks": value})
+        else:
+            Path(f"{self.checkpoint_file}.watermarks").write_text(
+                json.dumps(value), encoding="utf-8"
+            )
+
+    def _slot_covers_checkpoint(self) -> bool:
+        """Whether the slot alone can replay everything since the checkpoint."""
+        wal_lsn: t.Optional[str] = self.checkpoint_wal_lsn
+        if wal_lsn is None:
+            return False
+        slot_lsn: t.Optional[str] = self.confirmed_flush_lsn(self.__name)
+        return slot_lsn is not None and lsn_to_int(slot_lsn) <= lsn_to_int(
+            wal_lsn
+        )
+
     @property
     def txid_current(self) -> int:
         """
@@ -1689,22 +2591,24 @@ class Sync(Base, metaclass=Singleton):
         NB: this is only called by consumer thread
         """
         payloads: list
+        batch_size: BatchSize = self.batch_sizes["REDIS_READ_CHUNK_SIZE"]
         if getattr(self._thread_local, "read_only", False):
             # pg_visible_in_snapshot() to get the closure
             payloads = self.redis.pop_visible_in_snapshot(
-                self.pg_visible_in_snapshot
+                self.pg_visible_in_snapshot, chunk_size=batch_size.size
             )
         else:
-            payloads = self.redis.pop()
+            payloads = self.redis.pop(chunk_size=batch_size.size)
 
         if payloads:
             logger.debug(f"_poll_redis: {payloads}")
             with self.lock:
                 self.count["redis"] += len(payloads)
-            self.refresh_views()
-            self.on_publish(
-                list(map(lambda payload: Payload(**payload), payloads))
-            )
+            with batch_size.measure(self.search_client):
+                self.refresh_views()
+                self.on_publish(
+                    list(map(lambda payload: Payload(**payload), payloads))
+                )
         time.sleep(settings.REDIS_POLL_INTERVAL)
 
     @threaded
@@ -1719,14 +2623,16 @@ class Sync(Base, metaclass=Singleton):
             self._poll_redis()
 
     async def _async_poll_redis(self) -> None:
-        payloads: list = self.redis.pop()
+        batch_size: BatchSize = self.batch_sizes["REDIS_READ_CHUNK_SIZE"]
+        payloads: list = self.redis.pop(chunk_size=batch_size.size)
         if payloads:
             logger.debug(f"_async_poll_redis: {payloads}")
             self.count["redis"] += len(payloads)
-            await self.async_refresh_views()
-            await self.async_on_publish(
-                list(map(lambda payload: Payload(**payload), payloads))
-            )
+            with batch_size.measure(self.search_client):
+                await self.async_refresh_views()
+                await self.async_on_publish(
+                    list(map(lambda payload: Payload(**payload), payloads))
+                )
         await asyncio.sleep(settings.REDIS_POLL_INTERVAL)
 
     @exception
@@ -1882,51 +2788,184 @@ class Sync(Base, metaclass=Singleton):
                 payloads[i].table = base_table_to_node[payload.table].table
 
         logger.debug(f"on_publish len {len(payloads)}")
-        # Safe inserts are insert operations that can be performed in any order
-        # Optimize the safe INSERTS
-        # TODO repeat this for the other place too
-        # if all payload operations are INSERTS
-        if set(map(lambda x: x.tg_op, payloads)) == set([INSERT]):
-            _payloads: dict = defaultdict(list)
+        # everything committed before this point is part of this batch
+        lsn: t.Optional[str] = (
+            None if self.is_mysql_compat else self.current_wal_lsn
+        )
+        txids: t.Set = set(map(lambda x: x.xmin, payloads))
+        for batch in self._regroup(self._compact(payloads)):
+            self.search_client.bulk(self.index, self._payloads(batch))
 
-            for payload in payloads:
-                _payloads[payload.table].append(payload)
+        # for truncate, tg_op txids is None so skip setting the checkpoint
+        if txids != set([None]):
+            self._set_checkpoint(
+                min(min(txids), self.txid_current) - 1, wal_lsn=lsn
+            )
+            self._checkpoint_lsn = lsn
+
+    @staticmethod
+    def _watermark_value(value: t.Any) -> t.Any:
+        """Return a watermark column value in a JSON safe form."""
+        if value is None or isinstance(value, (int, float, str)):
+            return value
+        # dates, timestamps and decimals round-trip through their text form
+        return str(value)
+
+    @staticmethod
+    def _watermark_floor(column: sa.Column, value: t.Any) -> t.Any:
+        """Lower bound to re-read a watermark column from."""
+        lag: float = settings.WATERMARK_LAG
+        if not lag:
+            return value
+        if isinstance(column.type, (sa.Date, sa.DateTime)):
+            return sa.cast(value, column.type) - timedelta(seconds=lag)
+        if isinstance(column.type, (sa.Integer, sa.Numeric)):
+            return sa.cast(value, column.type) - lag
+        # text and other watermarks have no distance to step back by
+        return value
+
+    def _validate_watermarks(self) -> None:
+        """
+        Ensure every table has a watermark if the root has one.
 
-            for _payload in _payloads.values():
-                self.search_client.bulk(self.index, self._payloads(_payload))
+        Watermark polling only reads the tables with a watermark, so the
+        changes to any other table would never be synced.
+        """
+        if not self.tree.root.watermark:
+            return
+        missing: t.List[str] = []
+        for node in self.tree.traverse_breadth_first():
+            if not node.watermark:
+                missing.append(node.name)
+            # through tables can't have a watermark of their own
+            missing.extend(
+                through.name for through in node.relationship.throughs
+            )
+        if missing:
+            raise SchemaError(
+                f"Watermark polling needs a watermark on every table: "
+                f"{', '.join(missing)} have none"
+            )
 
-        else:
-            _payloads: t.List[Payload] = []
-            for i, payload in enumerate(payloads):
-                _payloads.append(payload)
-                j: int = i + 1
-                if j < len(payloads):
-                    payload2 = payloads[j]
-                    if (
-                        payload.tg_op != payload2.tg_op
-                        or payload.table != payload2.table
-                    ):
-                        self.search_client.bulk(
-                            self.index,
-                            self._payloads(_payloads),
+    def _max_watermark(self, node: Node) -> t.Any:
+        """Get the current watermark of a table."""
+        return self._watermark_value(
+            self.fetchone(
+                sa.select(sa.func.MAX(node.model.c[node.watermark])),
+                label="max_watermark",
+            )[0]
+        )
+
+    def watermark_changes(self) -> None:
+        """
+        Sync the rows changed since the last watermark of each table.
+
+        Tables with a watermark column in the schema, e.g. updated_at or
+        a monotonic id, are read from their last watermark on and every
+        row found is synced as an UPDATE. Child rows are resolved to
+        their root docs just like changes from the slot.
+
+        The first pass syncs everything and starts each watermark from
+        the maximum read before the sync. Later passes read from the
+        watermark inclusive. A row can also commit after a higher value
+        was already read, e.g. updated_at = now() is set when its
+        transaction starts, so once every WATERMARK_LAG seconds a pass
+        re-reads from WATERMARK_LAG below the watermark of the previous
+        re-read. Re-indexing those rows is idempotent. A row committing
+        later than the lag is still missed, so the lag must cover the
+        longest write transaction. Deletes leave no row behind and are
+        not seen.
+        """
+        watermarks: dict = self.watermarks
+        if not watermarks:
+            watermarks = {
+                node.name: self._max_watermark(node)
+                for node in self.tree.traverse_breadth_first()
+                if node.watermark
+            }
+            self.search_client.bulk(self.index, self.sync())
+            self.watermarks = watermarks
+            return
+
+        for node in self.tree.traverse_breadth_first():
+            if not node.watermark:
+                continue
+            if node.name not in watermarks:
+                # a watermark added to the schema starts from now
+                watermarks[node.name] = self._max_watermark(node)
+                self.watermarks = watermarks
+                continue
+
+            column: sa.Column = node.model.c[node.watermark]
+            statement: sa.sql.Select = sa.select(
+                *[
+                    node.model.c[name]
+                    for name in node.table_columns
+                    if name not in ("ctid", "oid", "xmin")
+                ]
+            ).order_by(column)
+            high: t.Any = watermarks[node.name]
+            if high is not None:
+                now: float = time.time()
+                settled: t.Optional[t.Tuple[float, t.Any]] = self._settled.get(
+                    node.name
+                )
+                if (
+                    settled is None
+                    or now - settled[0] >= settings.WATERMARK_LAG
+                ):
+                    # the rows that committed late since the last re-read
+                    statement = statement.where(
+                        column
+                        >= self._watermark_floor(
+                            column, high if settled is None else settled[1]
                         )
-                        _payloads = []
-                elif j == len(payloads):
-                    self.search_client.bulk(
-                        self.index, self._payloads(_payloads)
                     )
-                    _payloads: list = []
+                    self._settled[node.name] = (now, high)
+                else:
+                    statement = statement.where(column >= high)
 
-        txids: t.Set = set(map(lambda x: x.xmin, payloads))
-        # for truncate, tg_op txids is None so skip setting the checkpoint
-        if txids != set([None]):
-            self.checkpoint: int = min(min(txids), self.txid_current) - 1
+            with self.engine.connect() as conn:
+                result = conn.execution_options(stream_results=True).execute(
+                    statement
+                )
+                for rows in result.mappings().partitions(
+                    settings.QUERY_CHUNK_SIZE
+                ):
+                    payloads: t.List[Payload] = [
+                        Payload(
+                            tg_op=UPDATE,
+                            table=node.table,
+                            schema=node.schema,
+                            old={},
+                            new=dict(row),
+                        )
+                        for row in rows
+                    ]
+                    self.count["db"] += len(payloads)
+                    self.search_client.bulk(
+                        self.index, self._payloads(payloads)
+                    )
+                    value: t.Any = rows[-1][node.watermark]
+                    if value is not None:
+                        watermarks[node.name] = self._watermark_value(value)
+                        self.watermarks = watermarks
 
-    def pull(self, polling: bool = False) -> None:
+    def pull(self, polling: bool = False, parallel: int = 1) -> None:
         """Pull data from db."""
+        if polling and not self.is_mysql_compat and self.tree.root.watermark:
+            # incremental polling without an xmin scan or a slot
+            self.watermark_changes()
+            return
+
         txmin: t.Optional[int] = None
         txmax: t.Optional[int] = None
-        chunk_size: int = settings.LOGICAL_SLOT_CHUNK_SIZE
+        # an adaptive chunk size is resolved per logical slot page
+        chunk_size: t.Optional[int] = (
+            None
+            if settings.ADAPTIVE_BATCH_SIZE
+            else settings.LOGICAL_SLOT_CHUNK_SIZE
+        )
 
         if self.is_mysql_compat:
             start_log: t.Optional[str] = None
@@ -1940,13 +2979,32 @@ class Sync(Base, metaclass=Singleton):
             )
         else:
             txmin = self.checkpoint
+            # read the position before the txid, see checkpoint_wal_lsn
+            wal_lsn: t.Optional[str] = self.current_wal_lsn
             txmax = self.txid_current
             logger.debug(f"pull txmin: {txmin} - txmax: {txmax}")
 
-        # forward pass sync
-        self.search_client.bulk(
-            self.index, self.sync(txmin=txmin, txmax=txmax)
-        )
+        if (
+            not self.is_mysql_compat
+            and txmin is not None
+            and self._slot_covers_checkpoint()
+        ):
+            # the slot still holds every change since the checkpoint, so
+            # replay it alone instead of scanning the root table by xmin
+            logger.info(
+                f"Catching up from slot {self.__name} since txid {txmin}"
+            )
+            txmax = wal_lsn = None
+        elif parallel > 1 and not self.is_mysql_compat:
+            # the snapshot bounds the forward pass instead of txmax and the
+            # slot replays everything the snapshot could not see
+            txmin, txmax = self.parallel_sync(parallel, txmin=txmin), None
+            wal_lsn = None
+        else:
+            # forward pass sync
+            self.search_client.bulk(
+                self.index, self.sync(txmin=txmin, txmax=txmax)
+            )
 
         if self.is_mysql_compat:
             self.binlog_changes(
@@ -1964,7 +3022,9 @@ class Sync(Base, metaclass=Singleton):
                     txmax=txmax,
                     logical_slot_chunk_size=chunk_size,
                     upto_lsn=upto_lsn,
+                    wal_lsn=wal_lsn,
                 )
+                self._checkpoint_lsn = upto_lsn
             except Exception:
                 # if we are polling, we can just continue
                 if polling:
@@ -1980,24 +3040,13 @@ class Sync(Base, metaclass=Singleton):
         flush_lsn: t.Optional[str] = None,
         force_ack: bool = False,
     ) -> None:
+        if self._flush_queue is not None:
+            self._handoff_buffer(cursor, flush_lsn=flush_lsn)
+            return
+
         # If we have buffered docs, send them
         if self._buffer:
-            logger.info(f"flushing buffer with {len(self._buffer)} docs")
-            docs: list = []
-            for (op, tbl), run in groupby(
-                self._buffer,
-                key=lambda payload: (payload.tg_op, payload.table),
-            ):
-                batch: list = list(run)
-                logger.info(f"bulk group op={op} tbl={tbl} size={len(batch)}")
-                docs.extend(self._payloads(batch))
-
-            if docs:
-                processed: int = len(self._buffer)
-                logger.info(f"sending bulk of {len(docs)} docs")
-                self.search_client.bulk(self.index, docs)
-                self.count["xlog"] += processed
-                logger.info(f"sent bulk of {len(docs)} docs")
+            self._bulk_payloads(self._buffer)
 
             # if caller didn't provide a flush_lsn, then fall back to last buffered row
             if flush_lsn is None:
@@ -2012,10 +3061,79 @@ class Sync(Base, metaclass=Singleton):
             cursor.send_feedback(flush_lsn=flush_lsn, force=True)
             logger.info(f"sent feedback flush_lsn=P{flush_lsn}")
 
+    def _bulk_payloads(self, payloads: t.List[Payload]) -> None:
+        logger.info(f"flushing buffer with {len(payloads)} docs")
+        with self.batch_sizes["LOGICAL_SLOT_CHUNK_SIZE"].measure(
+            self.search_client
+        ):
+            docs: list = []
+            for batch in self._regroup(self._compact(payloads)):
+                logger.info(
+                    f"bulk group op={batch[0].tg_op} tbl={batch[0].table} "
+                    f"size={len(batch)}"
+                )
+                docs.extend(self._payloads(batch))
+
+            if docs:
+                logger.info(f"sending bulk of {len(docs)} docs")
+                self.search_client.bulk(self.index, docs)
+                self.count["xlog"] += len(payloads)
+                logger.info(f"sent bulk of {len(docs)} docs")
+
+    def _handoff_buffer(
+        self, cursor: t.Any, flush_lsn: t.Optional[str] = None
+    ) -> None:
+        """
+        Queue the buffered payloads for the flush worker.
+
+        Blocks while the queue is full so decoding never runs more than
+        WAL_FLUSH_QUEUE_SIZE batches ahead of indexing. An empty batch
+        still carries its LSN so it is only ACKed in order.
+        """
+        if flush_lsn is None:
+            flush_lsn = self._buffer_last_lsn
+        if self._buffer or flush_lsn is not None:
+            self._flush_queue.put((self._buffer, flush_lsn))
+            # the flush worker owns the queued list now
+            self._buffer = []
+            self._buffer_last_lsn = None
+        self._send_acked_feedback(cursor)
+
+    def _send_acked_feedback(self, cursor: t.Any) -> None:
+        """
+        ACK the last LSN indexed by the flush worker.
+
+        The replication cursor is not thread safe, so feedback is always
+        sent from the stream reader.
+        """
+        flush_lsn: t.Optional[t.Union[str, int]] = self._acked_lsn
+        if flush_lsn is not None and flush_lsn != self._feedback_lsn:
+            cursor.send_feedback(flush_lsn=flush_lsn, force=True)
+            self._feedback_lsn = flush_lsn
+            logger.info(f"sent feedback flush_lsn=P{flush_lsn}")
+
+    @threaded
+    @exception
+    def flush_worker(self) -> None:
+        """
+        Index the batches handed off by the WAL stream reader in order.
+
+        A batch's LSN is marked as acked only once it and every batch
+        before it have been indexed. Runs until a None batch is queued.
+        """
+        while True:
+            item: t.Optional[tuple] = self._flush_queue.get()
+            if item is None:
+                break
+            payloads, flush_lsn = item
+            if payloads:
+                self._bulk_payloads(payloads)
+            if flush_lsn is not None:
+                self._acked_lsn = flush_lsn
+
     def consume(self, message: t.Any) -> None:
         raw: t.Any = message.payload
         lsn: t.Optional[str] = message.data_start
-        chunk_size: int = settings.LOGICAL_SLOT_CHUNK_SIZE
 
         logger.debug(f"[LSN {lsn}] {raw}")
 
@@ -2046,17 +3164,11 @@ class Sync(Base, metaclass=Singleton):
             # but only when nothing is buffered, to avoid confirming past
             # un-flushed rows. This keeps confirmed_flush_lsn advancing during
             # heartbeat-only periods so the slot does not replay them.
-            if (
-                lsn
-                and logical_msg.group("transactional") == "0"
-                and not self._buffer
-            ):
-                message.cursor.send_feedback(flush_lsn=lsn, force=True)
-                logger.debug(
-                    f"[LSN {lsn}] ACKed non-transactional logical message"
-                )
-            else:
-                logger.debug(f"[LSN {lsn}] Logical message, skipping")
+            self._ack_logical_message(
+                message.cursor,
+                lsn,
+                logical_msg.group("transactional") == "1",
+            )
             return
 
         # Not BEGIN/COMMIT -> row change
@@ -2066,6 +3178,22 @@ class Sync(Base, metaclass=Singleton):
             logger.exception(f"Error parsing row: {raw}")
             raise
 
+        self._buffer_payload(message.cursor, payload, lsn)
+
+    def _ack_logical_message(
+        self, cursor: t.Any, lsn: t.Optional[t.Any], transactional: bool
+    ) -> None:
+        if lsn and not transactional and not self._buffer:
+            self._flush_buffer(cursor, flush_lsn=lsn, force_ack=True)
+            logger.debug(
+                f"[LSN {lsn}] ACKed non-transactional logical message"
+            )
+        else:
+            logger.debug(f"[LSN {lsn}] Logical message, skipping")
+
+    def _buffer_payload(
+        self, cursor: t.Any, payload: Payload, lsn: t.Optional[str]
+    ) -> None:
         # Filter by schema
         if payload.schema not in self.tree.schemas:
             # we still saw this LSN; it will be ACKed at COMMIT
@@ -2076,13 +3204,96 @@ class Sync(Base, metaclass=Singleton):
         self._buffer_last_lsn = lsn
 
         # Flush when big enough
-        if len(self._buffer) >= chunk_size:
-            self._flush_buffer(message.cursor)
+        if (
+            len(self._buffer)
+            >= self.batch_sizes["LOGICAL_SLOT_CHUNK_SIZE"].size
+        ):
+            self._flush_buffer(cursor)
+
+    def consume_pgoutput(self, message: t.Any) -> None:
+        """Consume a binary pgoutput message.
+
+        The publication already limits the stream to the tables in the
+        tree, so no text parsing or per-row filtering by table is needed.
+        """
+        raw: bytes = message.payload
+        lsn: t.Optional[int] = message.data_start
+
+        if not raw:
+            logger.debug(f"[LSN {lsn}] Empty payload, skipping")
+            return
+
+        try:
+            kind, payloads = self._decoder.decode(raw)
+        except Exception:
+            logger.exception(f"Error decoding pgoutput message: {raw!r}")
+            raise
+
+        if kind == PGOUTPUT_COMMIT:
+            # Flush any buffered docs, and ACK this COMMIT LSN
+            self._flush_buffer(
+                cursor=message.cursor,
+                flush_lsn=lsn,
+                force_ack=True,  # ACK even if buffer empty
+            )
+            return
+
+        if kind == PGOUTPUT_MESSAGE:
+            # See consume(): standalone messages have no COMMIT to ACK them
+            self._ack_logical_message(
+                message.cursor,
+                lsn,
+                self._decoder.is_transactional_message(raw),
+            )
+            return
+
+        for payload in payloads:
+            self._buffer_payload(message.cursor, payload, lsn)
 
     def wal_consumer(self) -> None:
         # open a replication‐mode connection
         conn = pg_logical_repl_conn(database=self.database)
         cursor = conn.cursor()
+        worker: t.Optional[threading.Thread] = self._start_flush_worker()
+        try:
+            self._start_replication(cursor)
+        finally:
+            self._stop_flush_worker(worker)
+
+    def _start_flush_worker(self) -> t.Optional[threading.Thread]:
+        if settings.WAL_FLUSH_QUEUE_SIZE <= 0:
+            return None
+        # index in the background while the stream keeps decoding
+        self._flush_queue = queue.Queue(maxsize=settings.WAL_FLUSH_QUEUE_SIZE)
+        return self.flush_worker()
+
+    def _stop_flush_worker(self, worker: t.Optional[threading.Thread]) -> None:
+        if worker is None:
+            return
+        # index whatever was decoded so far and stop the worker
+        self._flush_queue.put(None)
+        worker.join()
+        self._flush_queue = None
+
+    def _start_replication(self, cursor: t.Any) -> None:
+        if self.plugin == PGOUTPUT:
+            options: dict = {
+                "proto_version": "1",
+                "publication_names": self.publication_name,
+            }
+            # logical decoding messages are only sent on request (PG14+)
+            if self.engine.dialect.server_version_info >= (14,):
+                options["messages"] = "true"
+            # relation metadata is resent at the start of every stream
+            self._decoder = PgOutputDecoder()
+            cursor.start_replication(
+                slot_name=self.__name,
+                options=options,
+                decode=False,  # binary protocol
+            )
+            logger.info("Starting logical replication stream (pgoutput)...")
+            consume_stream(cursor, self.consume_pgoutput, idle=self._idle)
+            return
         # start streaming; include XIDs so you see BEGIN/COMMIT markers
         cursor.start_replication(
             slot_name=self.__name,
@@ -2090,7 +3301,12 @@ class Sync(Base, metaclass=Singleton):
             decode=True,  # gets you str instead of bytes
         )
         logger.info("Starting logical replication stream (test_decoding)...")
-        cursor.consume_stream(self.consume)
+        consume_stream(cursor, self.consume, idle=self._idle)
+
+    def _idle(self, cursor: t.Any) -> None:
+        """ACK the batches the flush worker indexed while no WAL arrived."""
+        if self._flush_queue is not None:
+            self._send_acked_feedback(cursor)
 
     @threaded
     @exception
@@ -2108,9 +3324,27 @@ class Sync(Base, metaclass=Singleton):
             await asyncio.sleep(settings.REPLICATION_SLOT_CLEANUP_INTERVAL)
 
     def _truncate_slots(self) -> None:
-        if self._truncate:
-            logger.debug(f"Truncating replication slot: {self.__name}")
-            self.logical_slot_get_changes(self.__name, upto_nchanges=None)
+        """Advance the replication slot to the last checkpoint.
+
+        The slot is moved with pg_replication_slot_advance so the pending
+        changes are discarded without being decoded and returned.
+
+        A producer only process never writes a checkpoint. It advances to
+        the WAL position seen on the previous run instead, since every
+        notification committed before then has been pushed to Redis/Valkey.
+        """
+        if not self._truncate:
+            return
+        lsn: t.Optional[str] = self._checkpoint_lsn
+        if self.producer and not self.consumer:
+            self._checkpoint_lsn = self.current_wal_lsn
+        if lsn is None:
+            return
+        slot_lsn: t.Optional[str] = self.confirmed_flush_lsn(self.__name)
+        if slot_lsn is not None and lsn_to_int(lsn) <= lsn_to_int(slot_lsn):
+            return
+        logger.debug(f"Truncating replication slot: {self.__name} to {lsn}")
+        self.replication_slot_advance(self.__name, lsn)
 
     @threaded
     @exception
@@ -2140,6 +3374,18 @@ class Sync(Base, metaclass=Singleton):
             f"{self.search_client.name}: [{format_number(self.search_client.doc_count)}]"
             f"...\n"
         )
+        if settings.ADAPTIVE_BATCH_SIZE:
+            batch_sizes: t.List[BatchSize] = list(self.batch_sizes.values())
+            if self.search_client.chunk_size is not None:
+                batch_sizes.append(self.search_client.chunk_size)
+            sys.stdout.write(
+                f"{label} {self.database}:{self.index} Batch: "
+                + " ".join(
+                    f"{batch_size.name}=[{format_number(batch_size.size)}]"
+                    for batch_size in batch_sizes
+                )
+                + "\n"
+            )
         sys.stdout.flush()
 
     def receive(self) -> None:
@@ -2199,6 +3445,264 @@ class Sync(Base, metaclass=Singleton):
         self._workers = []
 
 
+def consume_stream(
+    cursor: t.Any,
+    consume: t.Callable,
+    idle: t.Optional[t.Callable] = None,
+) -> None:
+    """
+    Pass each replication message to consume, like cursor.consume_stream.
+
+    When WAL_FLUSH_QUEUE_SIZE is set, the flush worker indexes batches
+    in the background and their ACKs are sent from the stream reader.
+    The stream is then read message by message so idle(cursor) can send
+    them every WAL_FEEDBACK_INTERVAL seconds while no WAL arrives.
+    """
+    if idle is None or settings.WAL_FLUSH_QUEUE_SIZE <= 0:
+        cursor.consume_stream(consume)
+        return
+    while True:
+        message: t.Any = cursor.read_message()
+        if message is not None:
+            consume(message)
+            continue
+        idle(cursor)
+        select.select([cursor], [], [], settings.WAL_FEEDBACK_INTERVAL)
+
+
+class _SubscriberCursor(object):
+    """Replication cursor stand-in handed to each WALReader subscriber."""
+
+    def __init__(self, reader: "WALReader", slot_name: str) -> None:
+        self._reader: "WALReader" = reader
+        self._slot_name: str = slot_name
+
+    def send_feedback(
+        self, flush_lsn: t.Optional[int] = None, **kwargs
+    ) -> None:
+        if flush_lsn is not None:
+            self._reader.confirm(self._slot_name, flush_lsn)
+
+
+class WALReader(object):
+    """
+    Shared logical replication stream for every Sync on one database.
+
+    Each WAL change is decoded once and buffered by every Sync whose
+    tables it touches. Each Sync flushes and ACKs on its own, and the
+    server is only sent the minimum LSN confirmed by all of them.
+
+    The stream reads from the slot furthest behind so no Sync misses a
+    change. The other slots are advanced along with it every
+    REPLICATION_SLOT_CLEANUP_INTERVAL seconds so they do not retain WAL.
+    """
+
+    def __init__(self, syncs: t.List[Sync]) -> None:
+        self.syncs: t.List[Sync] = syncs
+        positions: t.Dict[str, int] = {}
+        for sync in syncs:
+            lsn: t.Optional[str] = sync.confirmed_flush_lsn(sync.slot_name)
+            positions[sync.slot_name] = lsn_to_int(lsn) if lsn else 0
+        self.leader: Sync = min(
+            syncs, key=lambda sync: positions[sync.slot_name]
+        )
+        self._cursors: t.Dict[str, _SubscriberCursor] = {
+            sync.slot_name: _SubscriberCursor(self, sync.slot_name)
+            for sync in syncs
+        }
+        # (schema, table) -> the syncs that index it
+        self._subscribers: t.Dict[t.Tuple[str, str], t.List[Sync]] = (
+            defaultdict(list)
+        )
+        for sync in syncs:
+            for table in sync.publication_tables:
+                self._subscribers[table].append(sync)
+        # last LSN confirmed per slot
+        self._confirmed: t.Dict[str, t.Optional[int]] = {
+            sync.slot_name: None for sync in syncs
+        }
+        self._cursor: t.Any = None
+        self._decoder: t.Optional[PgOutputDecoder] = None
+        self._feedback_lsn: t.Optional[int] = None
+        self._advanced_at: float = time.time()
+
+    def confirm(self, slot_name: str, flush_lsn: int) -> None:
+        """Record a Sync's ACK and send the minimum across all of them."""
+        self._confirmed[slot_name] = flush_lsn
+        if None in self._confirmed.values():
+            return
+        lsn: int = min(self._confirmed.values())
+        if lsn == self._feedback_lsn:
+            return
+        self._cursor.send_feedback(flush_lsn=lsn, force=True)
+        self._feedback_lsn = lsn
+        logger.info(f"sent shared feedback flush_lsn=P{lsn}")
+        if (
+            time.time() - self._advanced_at
+            >= settings.REPLICATION_SLOT_CLEANUP_INTERVAL
+        ):
+            self._advance_slots(lsn)
+
+    def _advance_slots(self, lsn: int) -> None:
+        """Advance the slots not being streamed to the shared position."""
+        self._advanced_at = time.time()
+        for sync in self.syncs:
+            if sync is self.leader:
+                continue
+            slot_lsn: t.Optional[str] = sync.confirmed_flush_lsn(
+                sync.slot_name
+            )
+            if slot_lsn is not None and lsn <= lsn_to_int(slot_lsn):
+                continue
+            logger.debug(
+                f"Advancing replication slot: {sync.slot_name} to "
+                f"{int_to_lsn(lsn)}"
+            )
+            sync.replication_slot_advance(sync.slot_name, int_to_lsn(lsn))
+
+    def _commit(self, lsn: t.Optional[int]) -> None:
+        for sync in self.syncs:
+            sync._flush_buffer(
+                cursor=self._cursors[sync.slot_name],
+                flush_lsn=lsn,
+                force_ack=True,  # ACK even if buffer empty
+            )
+
+    def _message(self, lsn: t.Optional[int], transactional: bool) -> None:
+        for sync in self.syncs:
+            sync._ack_logical_message(
+                self._cursors[sync.slot_name], lsn, transactional
+            )
+
+    def _dispatch(self, payload: Payload, lsn: t.Optional[int]) -> None:
+        for sync in self._subscribers.get((payload.schema, payload.table), []):
+            sync._buffer_payload(self._cursors[sync.slot_name], payload, lsn)
+
+    def consume(self, message: t.Any) -> None:
+        """Fan out a test_decoding message. See Sync.consume."""
+        raw: t.Any = message.payload
+        lsn: t.Optional[int] = message.data_start
+
+        if not raw or not raw.strip():
+            return
+
+        match = TX_BOUNDARY_RE.match(raw)
+        if match:
+            if match.group(1).upper() == "COMMIT":
+                self._commit(lsn)
+            return
+
+        logical_msg: t.Optional[re.Match] = LOGICAL_MSG_RE.match(raw)
+        if logical_msg:
+            self._message(lsn, logical_msg.group("transactional") == "1")
+            return
+
+        try:
+            payload: Payload = self.leader.parse_logical_slot(raw)
+        except Exception:
+            logger.exception(f"Error parsing row: {raw}")
+            raise
+
+        self._dispatch(payload, lsn)
+
+    def consume_pgoutput(self, message: t.Any) -> None:
+        """Fan out a pgoutput message. See Sync.consume_pgoutput."""
+        raw: bytes = message.payload
+        lsn: t.Optional[int] = message.data_start
+
+        if not raw:
+            return
+
+        try:
+            kind, payloads = self._decoder.decode(raw)
+        except Exception:
+            logger.exception(f"Error decoding pgoutput message: {raw!r}")
+            raise
+
+        if kind == PGOUTPUT_COMMIT:
+            self._commit(lsn)
+            return
+
+        if kind == PGOUTPUT_MESSAGE:
+            self._message(lsn, self._decoder.is_transactional_message(raw))
+            return
+
+        for payload in payloads:
+            self._dispatch(payload, lsn)
+
+    def run(self) -> None:
+        """Stream the leader slot until interrupted."""
+        conn = pg_logical_repl_conn(database=self.leader.database)
+        self._cursor = conn.cursor()
+        workers: t.List[t.Optional[threading.Thread]] = [
+            sync._start_flush_worker() for sync in self.syncs
+        ]
+        try:
+            self._start_replication()
+        finally:
+            for sync, worker in zip(self.syncs, workers):
+                sync._stop_flush_worker(worker)
+
+    def _start_replication(self) -> None:
+        slot_name: str = self.leader.slot_name
+        if self.leader.plugin == PGOUTPUT:
+            options: dict = {
+                "proto_version": "1",
+                "publication_names": ",".join(
+                    sync.publication_name for sync in self.syncs
+                ),
+            }
+            if self.leader.engine.dialect.server_version_info >= (14,):
+                options["messages"] = "true"
+            self._decoder = PgOutputDecoder()
+            self._cursor.start_replication(
+                slot_name=slot_name,
+                options=options,
+                decode=False,
+            )
+            logger.info(
+                f"Starting shared logical replication stream (pgoutput) "
+                f"from {slot_name} for {len(self.syncs)} indexes..."
+            )
+            consume_stream(
+                self._cursor, self.consume_pgoutput, idle=self._idle
+            )
+            return
+        self._cursor.start_replication(
+            slot_name=slot_name,
+            options={"include-xids": "1", "skip-empty-xacts": "1"},
+            decode=True,
+        )
+        logger.info(
+            f"Starting shared logical replication stream (test_decoding) "
+            f"from {slot_name} for {len(self.syncs)} indexes..."
+        )
+        consume_stream(self._cursor, self.consume, idle=self._idle)
+
+    def _idle(self, cursor: t.Any) -> None:
+        """ACK the batches each flush worker indexed while no WAL arrived."""
+        for sync in self.syncs:
+            sync._idle(self._cursors[sync.slot_name])
+
+
+def parallel_workers() -> t.Optional[int]:
+    """
+    Most parallel sync workers the connection pool can serve.
+
+    Each worker reads on its own connection while the coordinator holds
+    one more for the snapshot. None when the pool is unbounded.
+    """
+    if (
+        settings.SQLALCHEMY_USE_NULLPOOL
+        or settings.SQLALCHEMY_MAX_OVERFLOW < 0
+    ):
+        return None
+    return max(
+        settings.SQLALCHEMY_POOL_SIZE + settings.SQLALCHEMY_MAX_OVERFLOW - 1,
+        1,
+    )
+
+
 @click.command()
 @click.option(
     "--config",
@@ -2314,7 +3818,7 @@ class Sync(Base, metaclass=Singleton):
     "-a",
     is_flag=True,
     default=False,
-    help="Analyse database",
+    help="Analyse database indices and the sync query plans",
     cls=MutuallyExclusiveOption,
     mutually_exclusive=["daemon", "polling"],
 )
@@ -2332,6 +3836,12 @@ class Sync(Base, metaclass=Singleton):
     default=False,
     help="Bootstrap the database",
 )
+@click.option(
+    "--parallel",
+    help="Number of workers for the initial load from a shared snapshot",
+    type=click.IntRange(min=1),
+    default=1,
+)
 def main(
     config: str,
     schema_url: str,
@@ -2352,6 +3862,7 @@ def main(
     consumer: bool,
     bootstrap: bool,
     wal: bool,
+    parallel: int,
 ) -> None:
     """Main application syncer."""
     if version:
@@ -2368,6 +3879,16 @@ def main(
             "Set only one of them to true."
         )
 
+    workers: t.Optional[int] = parallel_workers()
+    if workers is not None and parallel > workers:
+        raise click.BadParameter(
+            f"{parallel} workers need {parallel + 1} database connections "
+            f"but the pool holds at most {workers + 1}. "
+            f"Lower --parallel or raise SQLALCHEMY_POOL_SIZE or "
+            f"SQLALCHEMY_MAX_OVERFLOW.",
+            param_hint="--parallel",
+        )
+
     kwargs: dict = {
         "user": user,
         "host": host,
@@ -2420,6 +3941,8 @@ def main(
             ):
                 sync: Sync = Sync(doc, verbose=verbose, **kwargs)
                 sync.analyze()
+                if not IS_MYSQL_COMPAT:
+                    sync.explain()
 
         elif polling:
             # In polling mode, the app can run without replication slots or triggers.
@@ -2452,15 +3975,29 @@ def main(
                 )
                 syncs.append(sync)
 
-            # Start additional schema consumers in daemon threads
+            # Each Sync instance has its own replication slot.
+            # With WAL_SHARED_READER, the schema entries for the same
+            # database share a single stream and connection instead.
+            consumers: t.List[t.Callable] = []
+            if settings.WAL_SHARED_READER:
+                databases: t.Dict[str, t.List[Sync]] = defaultdict(list)
+                for sync in syncs:
+                    databases[sync.database].append(sync)
+                for group in databases.values():
+                    if len(group) > 1:
+                        consumers.append(WALReader(group).run)
+                    else:
+                        consumers.append(group[0].wal_consumer)
+            else:
+                consumers = [sync.wal_consumer for sync in syncs]
+
+            # Start additional consumers in daemon threads
             # so all entries in the schema config are processed
             # concurrently.
-            # Each Sync instance has its own
-            # replication slot and database connection.
             threads: t.List[threading.Thread] = []
-            for sync in syncs[1:]:
+            for run in consumers[1:]:
                 thread = threading.Thread(
-                    target=sync.wal_consumer,
+                    target=run,
                     daemon=True,
                 )
                 thread.start()
@@ -2468,8 +4005,8 @@ def main(
 
             # Run the first consumer on the main thread so that
             # KeyboardInterrupt is handled naturally.
-            if syncs:
-                syncs[0].wal_consumer()
+            if consumers:
+                consumers[0]()
         else:
             tasks: t.List[asyncio.Task] = []
             for doc in config_loader(
@@ -2486,7 +4023,7 @@ def main(
                     bootstrap=bootstrap,
                     **kwargs,
                 )
-                sync.pull()
+                sync.pull(parallel=parallel)
                 if daemon:
                     sync.receive()
                     tasks.extend(sync.tasks)
@@ -210,10 +210,142 @@ class Transform(object):
 
     @classmethod
     def transform(cls, data: dict, nodes: dict):
-        data = cls.replace(data, nodes)
-        data = cls.rename(data, nodes)
-        data = cls.concat(data, nodes)
-        return data
+        """Replace, then rename, then concat the fields of a document."""
+        return cls.compile(nodes).apply(data)
+
+    @classmethod
+    def compile(cls, nodes: dict) -> "TransformPlan":
+        """Compile the transforms of a schema into a reusable plan."""
+        return TransformPlan(nodes)
+
+    @classmethod
+    def pushdown(
+        cls,
+        transform: dict,
+        fields: t.List[str],
+        text_fields: t.Set[str],
+        fixed: t.Optional[t.Set[str]] = None,
+    ) -> t.Tuple[dict, dict]:
+        """
+        Split the transforms of a node into the ones its query can apply
+        and the ones left for Python.
+
+        Only the rules the query gives the same result for are pushed down:
+        - replace: the search->replace rules of a text field, unless a
+          search string is empty
+        - rename: the str rules of a field, unless the new name clashes with
+          another field or a rule left in Python still refers to the field
+        - concat: the rules joining text fields and literals, in order,
+          until the first rule that can't be pushed down
+
+        Args:
+            transform (dict): The transform block of the node.
+            fields (list): The fields of the node's object, children included.
+            text_fields (set): The fields that are text columns.
+            fixed (set, optional): The fields that must keep their name, e.g
+                children with transforms of their own left in Python.
+
+        Returns:
+            tuple: The (pushed down, left in Python) transform blocks.
+        """
+        transform = transform or {}
+        replace: dict = transform.get(REPLACE_TRANSFORM) or {}
+        rename: dict = transform.get(RENAME_TRANSFORM) or {}
+        concat: t.Union[dict, list] = transform.get(CONCAT_TRANSFORM) or []
+
+        pushed: dict = {}
+        residual: dict = {
+            key: value
+            for key, value in transform.items()
+            if key
+            not in (REPLACE_TRANSFORM, RENAME_TRANSFORM, CONCAT_TRANSFORM)
+        }
+
+        pushed_replace: dict = {
+            key: rules
+            for key, rules in replace.items()
+            if key in text_fields
+            and isinstance(rules, dict)
+            and all(isinstance(value, str) for value in rules.values())
+            # REPLACE() leaves the text as is for an empty search string
+            and all(rules)
+        }
+        residual_replace: dict = {
+            key: rules
+            for key, rules in replace.items()
+            if key not in pushed_replace
+        }
+
+        # fields whose names the rules left in Python refer to
+        keep: t.Set[str] = (
+            set(fixed or ())
+            | set(residual_replace)
+            | {key for key, value in rename.items() if isinstance(value, dict)}
+        )
+        targets: t.List[str] = [
+            value
+            for key, value in rename.items()
+            if isinstance(value, str) and key in fields and key not in keep
+        ]
+        pushed_rename: dict = {
+            key: value
+            for key, value in rename.items()
+            if isinstance(value, str)
+            and key in fields
+            and key not in keep
+            and (value == key or value not in set(fields) | set(rename))
+            and value not in keep
+            and targets.count(value) == 1
+        }
+        residual_rename: dict = {
+            key: value
+            for key, value in rename.items()
+            if key not in pushed_rename
+        }
+
+        names: t.Set[str] = {pushed_rename.get(key, key) for key in fields}
+        text_names: t.Set[str] = {
+            pushed_rename.get(key, key) for key in text_fields
+        }
+        # names the rules left in Python read or write
+        residual_names: t.Set[str] = (
+            set(residual_replace)
+            | set(residual_rename)
+            | {
+                value
+                for value in residual_rename.values()
+                if isinstance(value, str)
+            }
+        )
+        pushed_concat: t.List[dict] = []
+        residual_concat: t.List[dict] = []
+        for rule in concat if isinstance(concat, list) else [concat]:
+            if (
+                not residual_concat
+                and "columns" in rule
+                and rule["destination"] not in names | residual_names
+                and all(
+                    column not in residual_names
+                    and (column in text_names or column not in names)
+                    for column in rule["columns"]
+                )
+            ):
+                pushed_concat.append(rule)
+                names.add(rule["destination"])
+                text_names.add(rule["destination"])
+            else:
+                residual_concat.append(rule)
+
+        for type_, push, rest in (
+            (REPLACE_TRANSFORM, pushed_replace, residual_replace),
+            (RENAME_TRANSFORM, pushed_rename, residual_rename),
+            (CONCAT_TRANSFORM, pushed_concat, residual_concat),
+        ):
+            if push:
+                pushed[type_] = push
+            if rest:
+                residual[type_] = rest
+        return pushed, residual
 
     @classmethod
     def get(cls, nodes: dict, type_: str) -> dict:
@@ -221,6 +353,9 @@ class Transform(object):
         if "transform" in nodes.keys():
             if type_ in nodes["transform"]:
                 transform_node = nodes["transform"][type_]
+                if isinstance(transform_node, dict):
+                    # merge the children into a copy, not the schema
+                    transform_node = dict(transform_node)
         for child in nodes.get("children", {}):
             node: dict = cls.get(child, type_)
             if node:
@@ -228,61 +363,183 @@ class Transform(object):
         return transform_node
 
     @classmethod
-    def get_primary_keys(cls, primary_keys: dict) -> dict:
-        """Get private keys entry from a nested dict."""
-
-        def squash_list(values, _values=None):
-            if not _values:
-                _values = []
-            if isinstance(values, dict):
-                if len(values) == 1:
-                    _values.append(values)
+    def get_primary_keys(cls, primary_keys: t.Any) -> dict:
+        """
+        Get the primary keys of each table from the _keys of a row.
+
+        The _keys are nested lists of {table: keys} entries, where keys is
+        a dict of column values or a list of them. The values of each
+        column are gathered in one pass and deduplicated with a set.
+
+        e.g
+        [{"author": [{"id": [4]}]}, [{"author": [{"id": [5]}]}]]
+        returns {"author": {"id": [4, 5]}}
+        """
+        tables: t.Dict[str, t.Dict[str, list]] = {}
+
+        def add(table: str, keys: dict) -> None:
+            columns: t.Dict[str, list] = tables.setdefault(table, {})
+            for column, value in keys.items():
+                if isinstance(value, list):
+                    columns.setdefault(column, []).extend(value)
                 else:
-                    for key, value in values.items():
-                        _values.extend(squash_list({key: value}))
-            elif isinstance(values, list):
+                    columns.setdefault(column, []).append(value)
+
+        def walk(values: t.Any) -> None:
+            if isinstance(values, list):
                 for value in values:
-                    _values.extend(squash_list(value))
-            return _values
-
-        target = []
-        for values in squash_list(primary_keys):
-            if len(values) > 1:
-                for key, value in values.items():
-                    target.append({key: value})
-                continue
-            target.append(values)
-
-        target3 = []
-        for values in target:
-            for key, value in values.items():
-                if isinstance(value, dict):
-                    target3.append({key: value})
+                    walk(value)
+            elif isinstance(values, dict):
+                for table, keys in values.items():
+                    if isinstance(keys, dict):
+                        add(table, keys)
+                    elif isinstance(keys, list):
+                        tables.setdefault(table, {})
+                        for _keys in keys:
+                            add(table, _keys)
+
+        walk(primary_keys)
+        for columns in tables.values():
+            for column, values in columns.items():
+                try:
+                    columns[column] = sorted(set(values))
+                except TypeError:
+                    # unhashable values are deduplicated by equality
+                    unique: list = []
+                    for value in values:
+                        if value not in unique:
+                            unique.append(value)
+                    columns[column] = sorted(unique)
+        return tables
+
+
+class TransformPlan(object):
+    """
+    The transforms of a schema compiled into a plan.
+
+    Each plan holds the rules of one node by field, plus the plans of the
+    child nodes that have rules of their own. Applying it only visits the
+    fields with rules, in a single pass over each level it reaches.
+
+    e.g
+        plan = Transform.compile(nodes)
+        for row in rows:
+            row = plan.apply(row)
+    """
+
+    def __init__(self, nodes: dict) -> None:
+        transform: dict = nodes.get("transform") or {}
+        self.replace: dict = dict(transform.get(REPLACE_TRANSFORM) or {})
+        # replacements of a field, rather than of the fields of a JSON object
+        self.replacements: t.Set[str] = {
+            key
+            for key, rules in self.replace.items()
+            if isinstance(rules, dict)
+            and all(isinstance(value, str) for value in rules.values())
+        }
+        rename: dict = transform.get(RENAME_TRANSFORM) or {}
+        self.rename: dict = {
+            key: value if isinstance(value, str) else str(value)
+            for key, value in rename.items()
+            if isinstance(value, str)
+            or (value and not isinstance(value, dict))
+        }
+        # a rule that isn't a name only renames a scalar, e.g 42 -> "42"
+        self.scalar_rename: t.Set[str] = {
+            key for key in self.rename if not isinstance(rename[key], str)
+        }
+        # renames of the fields of a JSON object
+        self.nested_rename: dict = {
+            key: value
+            for key, value in rename.items()
+            if isinstance(value, dict)
+        }
+        concat: t.Union[dict, list] = transform.get(CONCAT_TRANSFORM) or []
+        self.concat: t.List[dict] = [
+            rule
+            for rule in (concat if isinstance(concat, list) else [concat])
+            if "columns" in rule
+        ]
+        self.children: t.Dict[str, TransformPlan] = {}
+        for child in nodes.get("children", []):
+            plan: TransformPlan = TransformPlan(child)
+            if plan:
+                self.children[child.get("label", child["table"])] = plan
+        # the fields to visit before renaming
+        self.fields: t.Set[str] = (
+            set(self.replace) | set(self.nested_rename) | set(self.children)
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.fields or self.rename or self.concat)
+
+    def apply(self, data: t.Any) -> t.Any:
+        """Transform a document, or a nested document, in place."""
+        if not isinstance(data, dict):
+            return data
+
+        for key in self.fields:
+            if key in data:
+                data[key] = self._field(key, data[key])
+
+        if self.rename and not self.rename.keys().isdisjoint(data):
+            data = {
+                self._rename(key, value): value for key, value in data.items()
+            }
+
+        for rule in self.concat:
+            values: list = [data.get(key, key) for key in rule["columns"]]
+            data[rule["destination"]] = rule.get("delimiter", "").join(
+                map(str, filter(None, values))
+            )
+        return data
+
+    def _rename(self, key: str, value: t.Any) -> str:
+        if key not in self.rename or (
+            key in self.scalar_rename
+            and not isinstance(value, (str, int, float))
+        ):
+            return key
+        return self.rename[key]
+
+    def _field(self, key: str, value: t.Any) -> t.Any:
+        if key in self.replace:
+            rules: dict = self.replace[key]
+            if key in self.replacements:
+                if isinstance(value, str):
+                    value = Transform._apply_replacements(value, rules)
                 elif isinstance(value, list):
-                    _value: t.Dict[t.Any, t.Any] = {}
-                    for v in value:
-                        for _k, _v in v.items():
-                            _value.setdefault(_k, [])
-                            if isinstance(_v, list):
-                                _value[_k].extend(_v)
-                            else:
-                                _value[_k].append(_v)
-                    target3.append({key: _value})
-
-        target4 = {}
-        for values in target3:
-            for key, value in values.items():
-                if key not in target4:
-                    target4[key] = {}
-                for k, v in value.items():
-                    if k not in target4[key]:
-                        target4[key][k] = []
-                    if isinstance(v, list):
-                        for _v in v:
-                            if _v not in target4[key][k]:
-                                target4[key][k].append(_v)
-                    else:
-                        if v not in target4[key][k]:
-                            target4[key][k].append(v)
-                    target4[key][k] = sorted(target4[key][k])
-        return target4
+                    value = [
+                        Transform._apply_replacements(item, rules)
+                        for item in value
+                    ]
+            elif isinstance(value, dict):
+                value = Transform._replace(value, rules)
+            elif isinstance(value, list):
+                value = [
+                    Transform._replace(item, rules)
+                    for item in value
+                    if isinstance(item, dict)
+                ]
+
+        if key in self.children:
+            plan: TransformPlan = self.children[key]
+            if isinstance(value, list):
+                value = [plan.apply(item) for item in value]
+            else:
+                value = plan.apply(value)
+
+        if key in self.nested_rename:
+            rules = self.nested_rename[key]
+            if isinstance(value, dict):
+                value = Transform._rename(value, rules)
+            elif isinstance(value, list):
+                value = [
+                    (
+                        Transform._rename(item, rules)
+                        if isinstance(item, dict)
+                        else item
+                    )
+                    for item in value
+                ]
+        return value
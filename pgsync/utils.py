@@ -106,6 +106,19 @@ def format_number(n: int) -> str:
     return f"{n:,}" if settings.FORMAT_WITH_COMMAS else f"{n}"
 
 
+def lsn_to_int(lsn: str) -> int:
+    """
+    Convert a textual LSN e.g 16/B374D848 to its 64 bit position."""
+    high, _, low = lsn.partition("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def int_to_lsn(value: int) -> str:
+    """
+    Convert a 64 bit WAL position to its textual LSN e.g 16/B374D848."""
+    return f"{value >> 32:X}/{value & 0xFFFFFFFF:X}"
+
+
 def get_redacted_url(url: str) -> str:
     """
     Returns a redacted version of the input URL, with the password replaced by asterisks.
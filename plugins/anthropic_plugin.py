@@ -25,6 +25,11 @@ class AnthropicPlugin(plugin.Plugin):
     MODEL: str = "voyage-3"
     VECTOR_DIMS: int = 1024
 
+    # one request per doc, so overlap the docs of several batches
+    concurrency: int = 4
+    timeout: float = 30.0
+    retries: int = 3
+
     def __init__(self) -> None:
         super().__init__()
         import voyageai
@@ -4,6 +4,7 @@ import typing as t
 from functools import lru_cache
 
 from pgsync import plugin
+from pgsync.utils import chunks
 
 
 class CoherePlugin(plugin.Plugin):
@@ -24,6 +25,12 @@ class CoherePlugin(plugin.Plugin):
     # embed-english-v3.0 produces 1024-dimensional vectors
     MODEL: str = "embed-english-v3.0"
     VECTOR_DIMS: int = 1024
+    # texts per embed request
+    MAX_TEXTS: int = 96
+
+    concurrency: int = 4
+    timeout: float = 30.0
+    retries: int = 3
 
     def __init__(self) -> None:
         super().__init__()
@@ -42,13 +49,43 @@ class CoherePlugin(plugin.Plugin):
         )
         return tuple(response.embeddings[0])
 
+    def get_embeddings(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        """Generate the embeddings of many texts, MAX_TEXTS per request."""
+        embeddings: t.List[t.List[float]] = []
+        for chunk in chunks(texts, self.MAX_TEXTS):
+            response = self.client.embed(
+                texts=[text.replace("\n", " ") for text in chunk],
+                model=self.MODEL,
+                input_type="search_document",
+            )
+            embeddings.extend(response.embeddings)
+        return embeddings
+
+    def get_text(self, doc: dict) -> str:
+        """The text to embed."""
+        # Customize this to use your document's text field(s)
+        return doc.get("title", "") or doc.get("description", "")
+
     def transform(self, doc: dict, **kwargs) -> dict:
         """Add Cohere embedding to document."""
-        # Customize this to use your document's text field(s)
-        text = doc.get("title", "") or doc.get("description", "")
+        text = self.get_text(doc)
         if not text:
             return doc
 
         embedding = self.get_embedding(text)
         doc["embedding"] = list(embedding)
         return doc
+
+    def transform_batch(self, docs: t.List[dict], **kwargs) -> t.List[dict]:
+        """Add Cohere embeddings to a batch of documents."""
+        texts: t.List[str] = [self.get_text(doc) for doc in docs]
+        # each distinct text is embedded once
+        unique: t.List[str] = list(
+            dict.fromkeys(text for text in texts if text)
+        )
+        if unique:
+            embeddings: dict = dict(zip(unique, self.get_embeddings(unique)))
+            for doc, text in zip(docs, texts):
+                if text:
+                    doc["embedding"] = list(embeddings[text])
+        return docs
@@ -23,6 +23,11 @@ class OpenAIPlugin(plugin.Plugin):
     MODEL: str = "text-embedding-3-small"
     VECTOR_DIMS: int = 1536
 
+    # embedding requests in flight at once
+    concurrency: int = 4
+    timeout: float = 30.0
+    retries: int = 3
+
     def __init__(self) -> None:
         super().__init__()
         from openai import OpenAI
@@ -39,13 +44,42 @@ class OpenAIPlugin(plugin.Plugin):
         )
         return tuple(response.data[0].embedding)
 
+    def get_embeddings(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        """Generate the embeddings of many texts in one request."""
+        response = self.client.embeddings.create(
+            input=[text.replace("\n", " ") for text in texts],
+            model=self.MODEL,
+        )
+        return [
+            item.embedding
+            for item in sorted(response.data, key=lambda item: item.index)
+        ]
+
+    def get_text(self, doc: dict) -> str:
+        """The text to embed."""
+        # Customize this to use your document's text field(s)
+        return doc.get("title", "") or doc.get("description", "")
+
     def transform(self, doc: dict, **kwargs) -> dict:
         """Add OpenAI embedding to document."""
-        # Customize this to use your document's text field(s)
-        text = doc.get("title", "") or doc.get("description", "")
+        text = self.get_text(doc)
         if not text:
             return doc
 
         embedding = self.get_embedding(text)
         doc["embedding"] = list(embedding)
         return doc
+
+    def transform_batch(self, docs: t.List[dict], **kwargs) -> t.List[dict]:
+        """Add OpenAI embeddings to a batch of documents in one request."""
+        texts: t.List[str] = [self.get_text(doc) for doc in docs]
+        # each distinct text is embedded once
+        unique: t.List[str] = list(
+            dict.fromkeys(text for text in texts if text)
+        )
+        if unique:
+            embeddings: dict = dict(zip(unique, self.get_embeddings(unique)))
+            for doc, text in zip(docs, texts):
+                if text:
+                    doc["embedding"] = list(embeddings[text])
+        return docs
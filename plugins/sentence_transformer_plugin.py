@@ -34,13 +34,34 @@ class SentenceTransformersPlugin(plugin.Plugin):
         text = text.replace("\n", " ")
         return self.model.encode(text).tolist()
 
+    def get_embeddings(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        """Generate the embeddings of many texts in one encode call."""
+        texts = [text.replace("\n", " ") for text in texts]
+        return self.model.encode(texts).tolist()
+
+    def get_text(self, doc: dict) -> str:
+        """The text to embed."""
+        # Customize this to use your document's text field(s)
+        return doc.get("title", "") or doc.get("description", "")
+
     def transform(self, doc: dict, **kwargs) -> dict:
         """Add Sentence Transformer embedding to document."""
-        # Customize this to use your document's text field(s)
-        text = doc.get("title", "") or doc.get("description", "")
+        text = self.get_text(doc)
         if not text:
             return doc
 
         embedding = self.get_embedding(text)
         doc["embedding"] = embedding
         return doc
+
+    def transform_batch(self, docs: t.List[dict], **kwargs) -> t.List[dict]:
+        """Add Sentence Transformer embeddings to a batch of documents."""
+        texts: t.List[str] = [self.get_text(doc) for doc in docs]
+        embedded: t.List[dict] = [
+            doc for doc, text in zip(docs, texts) if text
+        ]
+        if embedded:
+            embeddings = self.get_embeddings([text for text in texts if text])
+            for doc, embedding in zip(embedded, embeddings):
+                doc["embedding"] = embedding
+        return docs
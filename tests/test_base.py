@@ -15,6 +15,7 @@ from pgsync.base import (
     create_schema,
     drop_database,
     drop_extension,
+    LogicalSlotParser,
     Payload,
     pg_execute,
 )
@@ -25,6 +26,7 @@ from pgsync.exc import (
     TableNotFoundError,
 )
 from pgsync.settings import IS_MYSQL_COMPAT
+from pgsync.utils import lsn_to_int
 from pgsync.view import CreateView, DropView
 
 
@@ -672,8 +674,9 @@ class TestBase(object):
             excinfo.value
         )
 
-        value = pg_base.parse_value("boolean", "foo")
-        assert value is True
+        assert pg_base.parse_value("boolean", "true") is True
+        assert pg_base.parse_value("boolean", "false") is False
+        assert pg_base.parse_value("text", "'it''s'") == "it's"
 
         with pytest.raises(ValueError) as excinfo:
             pg_base.parse_value("float4", "foo")
@@ -989,6 +992,115 @@ class TestPayload:
         assert payload.schema == "public"
 
 
+class TestLogicalSlotParser:
+    """Tests for the single pass test_decoding parser."""
+
+    def setup_method(self):
+        self.parser = LogicalSlotParser(
+            Base.INT_TYPES, Base.FLOAT_TYPES, Base.CHAR_TYPES
+        )
+
+    def test_parse_insert(self):
+        payload = self.parser.parse(
+            "table public.book: INSERT: id[integer]:1 "
+            "title[character varying]:'it''s a ''quoted'' title' "
+            'tags[jsonb]:\'["a", "b"]\' active[boolean]:false '
+            "price[double precision]:1.5 rating[numeric]:9.99 "
+            "publish_date[timestamp without time zone]:null"
+        )
+        assert payload.tg_op == "INSERT"
+        assert payload.schema == "public"
+        assert payload.table == "book"
+        assert payload.old == {}
+        assert payload.new == {
+            "id": 1,
+            "title": "it's a 'quoted' title",
+            "tags": '\'["a", "b"]\'',
+            "active": False,
+            "price": 1.5,
+            "rating": "9.99",
+            "publish_date": None,
+        }
+
+    def test_parse_quoted_identifiers(self):
+        payload = self.parser.parse(
+            'table "my schema"."My ""Table""": INSERT: '
+            '"Weird ""Key"""[text]:\'a b\' "tags"[text[]]:\'{x,y}\''
+        )
+        assert payload.schema == "my schema"
+        assert payload.table == 'My "Table"'
+        assert payload.new == {'Weird "Key"': "a b", "tags": "'{x,y}'"}
+
+    def test_parse_update_with_old_key(self):
+        payload = self.parser.parse(
+            "table public.book: UPDATE: old-key: id[integer]:1 "
+            "new-tuple: id[integer]:2 title[text]:'a'"
+        )
+        assert payload.old == {"id": 1}
+        assert payload.new == {"id": 2, "title": "a"}
+        # old-key rows are not compiled into a row plan
+        assert self.parser._plans == {}
+
+    def test_parse_unchanged_toast(self):
+        payload = self.parser.parse(
+            "table public.book: UPDATE: id[integer]:1 "
+            "description[text]:unchanged-toast-datum title[text]:'a'"
+        )
+        assert payload.new == {"id": 1, "title": "a"}
+        assert self.parser._plans == {}
+
+    def test_parse_delete(self):
+        payload = self.parser.parse("table public.book: DELETE: id[integer]:5")
+        assert payload.tg_op == "DELETE"
+        assert payload.new == {"id": 5}
+        assert payload.data == {"id": 5}
+
+    def test_parse_truncate(self):
+        payload = self.parser.parse("table public.book: TRUNCATE: (no-flags)")
+        assert payload.tg_op == "TRUNCATE"
+        assert payload.table == "book"
+        assert payload.new == {}
+
+    def test_parse_reuses_row_plan(self):
+        row = "table public.book: INSERT: id[integer]:{} title[text]:{}"
+        payload = self.parser.parse(row.format(1, "null"))
+        assert payload.new == {"id": 1, "title": None}
+        assert list(self.parser._plans) == ["table public.book: INSERT:"]
+        plan = self.parser._plans["table public.book: INSERT:"]
+        payload = self.parser.parse(row.format(2, "'x y'"))
+        assert payload.new == {"id": 2, "title": "x y"}
+        assert self.parser._plans["table public.book: INSERT:"] is plan
+        # a new column layout falls back to the tokenizer and is recompiled
+        payload = self.parser.parse(
+            "table public.book: INSERT: id[integer]:3 title[text]:'z' "
+            "rating[integer]:4"
+        )
+        assert payload.new == {"id": 3, "title": "z", "rating": 4}
+        assert self.parser._plans["table public.book: INSERT:"] is not plan
+
+    def test_parse_errors(self):
+        with pytest.raises(LogicalSlotParseError) as excinfo:
+            self.parser.parse("")
+        assert "No match for row:" in str(excinfo.value)
+        with pytest.raises(LogicalSlotParseError) as excinfo:
+            self.parser.parse("table public.book: UNKNOWN: id[integer]:1")
+        assert "Unknown UNKNOWN operation for row:" in str(excinfo.value)
+        with pytest.raises(LogicalSlotParseError) as excinfo:
+            self.parser.parse("table public.book: INSERT: id[integer]:abc")
+        assert "for row:" in str(excinfo.value)
+
+    def test_converter_is_cached(self):
+        assert self.parser.converter("integer") is int
+        assert self.parser.converter("double precision") is float
+        assert self.parser.converter("text", quoted=True) is (
+            self.parser.converter("text", quoted=True)
+        )
+        assert self.parser._converters.keys() == {
+            "integer",
+            "double precision",
+        }
+
+
 class TestBaseAdditional:
     """Additional tests for Base class."""
 
@@ -1411,6 +1523,45 @@ class TestLogicalSlotChanges:
         # Cleanup
         pg_base.drop_replication_slot(slot_name)
 
+    def test_replication_slot_advance(self, connection):
+        """Test paging through a slot by advancing it to the last LSN."""
+        pg_base = Base(connection.engine.url.database)
+        slot_name = "test_slot_advance"
+        pg_base.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS slot_advance (id INTEGER PRIMARY KEY)"
+            )
+        )
+        pg_base.create_replication_slot(slot_name)
+        try:
+            start_lsn = pg_base.confirmed_flush_lsn(slot_name)
+            for i in range(3):
+                pg_base.execute(
+                    sa.text(f"INSERT INTO slot_advance VALUES ({i})")
+                )
+            pages: list = []
+            while True:
+                changes = pg_base.logical_slot_peek_changes(
+                    slot_name, upto_nchanges=1
+                )
+                if not changes:
+                    break
+                # each page ends on a transaction boundary
+                assert changes[-1].data.startswith("COMMIT")
+                pages.append([change.data for change in changes[1:-1]])
+                pg_base.replication_slot_advance(slot_name, changes[-1].lsn)
+                last_lsn = changes[-1].lsn
+            assert pages == [
+                ["table public.slot_advance: INSERT: id[integer]:0"],
+                ["table public.slot_advance: INSERT: id[integer]:1"],
+                ["table public.slot_advance: INSERT: id[integer]:2"],
+            ]
+            assert pg_base.confirmed_flush_lsn(slot_name) == last_lsn
+            assert lsn_to_int(last_lsn) > lsn_to_int(start_lsn)
+        finally:
+            pg_base.drop_replication_slot(slot_name)
+            pg_base.execute(sa.text("DROP TABLE slot_advance"))
+
 
 @pytest.mark.usefixtures("table_creator")
 class TestPayloadExtended:
@@ -0,0 +1,49 @@
+"""BatchSize tests."""
+
+from unittest.mock import Mock, patch
+
+from pgsync import settings
+from pgsync.batchsize import BatchSize
+
+
+@patch.object(settings, "ADAPTIVE_BATCH_SIZE_MAX_RATIO", 2.0)
+@patch.object(settings, "ADAPTIVE_BATCH_SIZE_MIN_RATIO", 0.25)
+@patch.object(settings, "FILTER_CHUNK_SIZE", 100)
+class TestBatchSize(object):
+    """BatchSize tests."""
+
+    def test_disabled_returns_setting(self):
+        batch_size = BatchSize("FILTER_CHUNK_SIZE", latency=1.0)
+        with patch.object(settings, "ADAPTIVE_BATCH_SIZE", False):
+            assert batch_size.observe(5.0) == 100
+            assert batch_size.size == 100
+            with batch_size.measure(Mock()):
+                pass
+            assert batch_size.size == 100
+
+    @patch.object(settings, "ADAPTIVE_BATCH_SIZE", True)
+    def test_additive_increase_up_to_maximum(self):
+        batch_size = BatchSize("FILTER_CHUNK_SIZE", latency=1.0)
+        assert batch_size.size == 100
+        assert batch_size.observe(0.5) == 110
+        for _ in range(20):
+            batch_size.observe(0.5)
+        assert batch_size.size == 200
+
+    @patch.object(settings, "ADAPTIVE_BATCH_SIZE", True)
+    def test_multiplicative_decrease_down_to_minimum(self):
+        batch_size = BatchSize("FILTER_CHUNK_SIZE", latency=1.0)
+        assert batch_size.observe(1.5) == 50
+        assert batch_size.observe(0.1, rejected=True) == 25
+        assert batch_size.observe(1.5) == 25
+
+    @patch.object(settings, "ADAPTIVE_BATCH_SIZE", True)
+    def test_measure_detects_rejections(self):
+        batch_size = BatchSize("FILTER_CHUNK_SIZE", latency=1.0)
+        sink = Mock(rejected=0)
+        with batch_size.measure(sink):
+            pass
+        assert batch_size.size == 110
+        with batch_size.measure(sink):
+            sink.rejected += 1
+        assert batch_size.size == 55
@@ -0,0 +1,68 @@
+"""Explain tests."""
+
+from pgsync.explain import cost_per_docs, plan_issues, plan_nodes
+
+
+def _scan(relation: str, rows: int, **kwargs) -> dict:
+    return {
+        "Node Type": "Seq Scan",
+        "Relation Name": relation,
+        "Plan Rows": rows,
+        **kwargs,
+    }
+
+
+class TestExplain(object):
+    """Explain tests."""
+
+    def test_plan_nodes(self):
+        plan: dict = {
+            "Node Type": "Hash Join",
+            "Plans": [_scan("book", 10), _scan("publisher", 5)],
+        }
+        assert [node["Node Type"] for node in plan_nodes(plan)] == [
+            "Hash Join",
+            "Seq Scan",
+            "Seq Scan",
+        ]
+
+    def test_cost_per_docs(self):
+        assert cost_per_docs({"Total Cost": 50.0, "Plan Rows": 100}) == 500.0
+        assert cost_per_docs({"Total Cost": 5.0, "Plan Rows": 0}) == 5000.0
+        assert (
+            cost_per_docs(
+                {"Total Cost": 5.0, "Plan Rows": 100, "Actual Rows": 10}
+            )
+            == 500.0
+        )
+
+    def test_plan_issues(self):
+        plan: dict = {
+            "Node Type": "Nested Loop",
+            "Plan Rows": 2000,
+            "Plans": [
+                {
+                    "Node Type": "Index Scan",
+                    "Relation Name": "book",
+                    "Plan Rows": 2000,
+                },
+                _scan("publisher", 1),
+            ],
+        }
+        assert plan_issues(plan) == [
+            (
+                "publisher",
+                "Nested loop repeats a sequential scan on publisher for "
+                "~2000 rows",
+            ),
+            ("publisher", "Sequential scan on publisher (~1 rows)"),
+        ]
+        assert plan_issues(plan, seq_scans=False, loop_rows=5000) == []
+
+    def test_plan_issues_misestimate(self):
+        plan: dict = _scan("book", 5, **{"Actual Rows": 500})
+        assert plan_issues(plan, seq_scans=False) == [
+            ("book", "Seq Scan estimated 5 rows but returned 500"),
+        ]
+        plan["Actual Rows"] = 20
+        assert plan_issues(plan, seq_scans=False) == []
@@ -0,0 +1,105 @@
+"""Fingerprints tests."""
+
+from unittest.mock import patch
+
+import pytest
+
+from pgsync.fingerprint import (
+    fingerprint,
+    Fingerprints,
+    LRUFingerprints,
+    RedisFingerprints,
+)
+
+
+def _doc(id: str, source: dict, op_type: str = "index") -> dict:
+    return {
+        "_id": id,
+        "_index": "testdb",
+        "_op_type": op_type,
+        **({"_source": source} if op_type == "index" else {}),
+    }
+
+
+class TestFingerprints(object):
+    """Fingerprints tests."""
+
+    def test_fingerprint(self):
+        assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+        assert fingerprint('{"a": 1}') == fingerprint('{"a": 1}')
+
+    def test_abstract(self):
+        with pytest.raises(TypeError):
+            Fingerprints()
+
+    def test_changed(self):
+        store = LRUFingerprints(maxsize=10, chunk_size=2)
+        docs = [_doc("1", {"a": 1}), _doc("2", {"a": 2})]
+        assert list(store.changed(docs)) == docs
+        store.acknowledge(["1", "2"], [])
+        # unchanged docs are dropped, changed ones pass through
+        docs = [_doc("1", {"a": 1}), _doc("2", {"a": 3}), _doc("3", {})]
+        assert [doc["_id"] for doc in store.changed(docs)] == ["2", "3"]
+        store.acknowledge(["2", "3"], [])
+        assert list(store.changed([_doc("2", {"a": 3})])) == []
+
+    def test_changed_until_acknowledged(self):
+        store = LRUFingerprints(maxsize=10)
+        docs = [_doc("1", {"a": 1}), _doc("2", {"a": 2})]
+        list(store.changed(docs))
+        # nothing is stored before the sink confirms the write
+        assert store.get(["1", "2"]) == [None, None]
+        assert list(store.changed(docs)) == docs
+        store.acknowledge(["1", "1"], ["2"])
+        assert store.get(["1", "2"]) == [fingerprint({"a": 1}), None]
+        assert list(store.changed(docs)) == docs[1:]
+        # a failure drops the hash stored before
+        store.acknowledge([], ["1", "2", "2"])
+        assert store.get(["1"]) == [None]
+        assert not store._pending
+
+    def test_changed_deletes_forget(self):
+        store = LRUFingerprints(maxsize=10)
+        list(store.changed([_doc("1", {"a": 1})]))
+        store.acknowledge(["1"], [])
+        delete = _doc("1", None, op_type="delete")
+        assert list(store.changed([delete])) == [delete]
+        assert store.get(["1"]) == [None]
+        # a doc indexed again after a delete is sent
+        assert len(list(store.changed([_doc("1", {"a": 1})]))) == 1
+
+    def test_changed_without_skip(self):
+        store = LRUFingerprints(maxsize=10)
+        docs = [_doc("1", {"a": 1})]
+        list(store.changed(docs))
+        store.acknowledge(["1"], [])
+        assert list(store.changed(docs, skip=False)) == docs
+        store.acknowledge(["1"], [])
+        assert store.get(["1"]) == [fingerprint({"a": 1})]
+
+    def test_lru_eviction(self):
+        store = LRUFingerprints(maxsize=2)
+        store.set({"1": "a", "2": "b"})
+        store.get(["1"])
+        store.set({"3": "c"})
+        assert store.get(["1", "2", "3"]) == ["a", None, "c"]
+        store.forget(["1"])
+        assert store.get(["1"]) == [None]
+        store.clear()
+        assert store.get(["3"]) == [None]
+
+    @patch("pgsync.fingerprint.Redis")
+    def test_redis(self, mock_redis):
+        db = mock_redis.from_url.return_value
+        db.hmget.return_value = [b"a", None]
+        store = RedisFingerprints("testdb_testdb")
+        assert store.key == "fingerprint:testdb_testdb"
+        assert store.get(["1", "2"]) == ["a", None]
+        db.hmget.assert_called_once_with(store.key, ["1", "2"])
+        store.set({"1": "b"})
+        db.hset.assert_called_once_with(store.key, mapping={"1": "b"})
+        store.forget(["1"])
+        db.hdel.assert_called_once_with(store.key, "1")
+        store.clear()
+        db.delete.assert_called_once_with(store.key)
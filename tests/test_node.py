@@ -1,6 +1,7 @@
 """Node tests."""
 
 import pytest
+import sqlalchemy as sa
 
 from pgsync.base import Base
 from pgsync.exc import (
@@ -679,6 +680,49 @@ class TestTreeEdgeCases:
         assert tree.root is not None
         assert len(tree.root.children) == 2
 
+    def test_tree_transform_pushdown(self, connection):
+        """Test Tree pushes the transforms the query can apply down."""
+        pg_base = Base(connection.engine.url.database)
+
+        nodes = {
+            "table": "book",
+            "columns": ["isbn", "title"],
+            "transform": {
+                "rename": {"isbn": "book_isbn", "publisher": "pub"},
+                "concat": {"columns": ["title", "pub"], "destination": "key"},
+            },
+            "children": [
+                {
+                    "table": "publisher",
+                    "columns": ["id", "name"],
+                    "transform": {
+                        "replace": {"name": {"-": " "}},
+                        "rename": {"id": 42},
+                    },
+                    "relationship": {
+                        "type": "one_to_one",
+                        "variant": "object",
+                    },
+                },
+            ],
+        }
+        tree = Tree(
+            pg_base.models,
+            nodes=nodes,
+            database=connection.engine.url.database,
+        )
+        publisher = tree.root.children[0]
+        assert publisher.pushdown == {"replace": {"name": {"-": " "}}}
+        assert publisher.residual_transform == {"rename": {"id": 42}}
+        # publisher has rules left in Python so it keeps its label
+        assert tree.root.pushdown == {"rename": {"isbn": "book_isbn"}}
+        assert tree.root.residual_transform == {
+            "rename": {"publisher": "pub"},
+            "concat": [{"columns": ["title", "pub"], "destination": "key"}],
+        }
+        assert tree.transform_plan.rename == {"publisher": "pub"}
+        assert list(tree.transform_plan.children) == ["publisher"]
+
     def test_tree_traverse_all_nodes(self, connection):
         """Test Tree.traverse visits all nodes."""
         pg_base = Base(connection.engine.url.database)
@@ -715,3 +759,29 @@ class TestTreeEdgeCases:
 
         # Should include root and children
         assert len(nodes) >= 2
+
+
+class TestNodeSplitTransform(object):
+    """Node split_transform tests without a database."""
+
+    def test_split_transform_char(self):
+        """Test CHAR columns keep their rules in Python."""
+        table = sa.Table(
+            "book",
+            sa.MetaData(),
+            sa.Column("isbn", sa.String, primary_key=True),
+            sa.Column("code", sa.CHAR(8)),
+            schema="public",
+        )
+        table.primary_keys = ["isbn"]
+        node = Node(
+            models=lambda *args: table,
+            table="book",
+            schema="public",
+            columns=["isbn", "code"],
+            transform={"replace": {"isbn": {"-": "="}, "code": {"-": "="}}},
+        )
+        node.split_transform()
+        # REPLACE() would strip the padding JSON_BUILD_OBJECT keeps
+        assert node.pushdown == {"replace": {"isbn": {"-": "="}}}
+        assert node.residual_transform == {"replace": {"code": {"-": "="}}}
@@ -0,0 +1,281 @@
+"""pgoutput decoder tests."""
+
+import struct
+
+import pytest
+import sqlalchemy as sa
+
+from pgsync.base import Base
+from pgsync.constants import DELETE, INSERT, PGOUTPUT, TRUNCATE, UPDATE
+from pgsync.exc import LogicalSlotParseError
+from pgsync.pgoutput import (
+    BEGIN,
+    COMMIT,
+    MESSAGE,
+    PgOutputDecoder,
+    RELATION,
+)
+from pgsync.settings import IS_MYSQL_COMPAT
+
+INT4 = 23
+TEXT = 25
+BOOL = 16
+FLOAT8 = 701
+NUMERIC = 1700
+
+
+def _str(value: str) -> bytes:
+    return value.encode() + b"\x00"
+
+
+def relation(oid: int, schema: str, table: str, columns: list) -> bytes:
+    data: bytes = (
+        b"R"
+        + struct.pack("!I", oid)
+        + _str(schema)
+        + _str(table)
+        + b"d"
+        + struct.pack("!h", len(columns))
+    )
+    for flags, name, type_oid in columns:
+        data += struct.pack("!b", flags) + _str(name)
+        data += struct.pack("!Ii", type_oid, -1)
+    return data
+
+
+def tuple_data(*values) -> bytes:
+    data: bytes = struct.pack("!h", len(values))
+    for value in values:
+        if value is None:
+            data += b"n"
+        elif value is Ellipsis:
+            data += b"u"
+        else:
+            encoded: bytes = value.encode()
+            data += b"t" + struct.pack("!i", len(encoded)) + encoded
+    return data
+
+
+BOOK = relation(
+    16384,
+    "public",
+    "book",
+    [
+        (1, "id", INT4),
+        (0, "title", TEXT),
+        (0, "active", BOOL),
+        (0, "price", FLOAT8),
+        (0, "rating", NUMERIC),
+    ],
+)
+
+
+class TestPgOutputDecoder(object):
+    """pgoutput decoder tests."""
+
+    def setup_method(self):
+        self.decoder = PgOutputDecoder()
+        kind, payloads = self.decoder.decode(BOOK)
+        assert kind == RELATION
+        assert payloads == []
+
+    def test_relation_is_cached(self):
+        relation = self.decoder.relations[16384]
+        assert relation.schema == "public"
+        assert relation.table == "book"
+        assert relation.columns == ["id", "title", "active", "price", "rating"]
+        assert relation.keys == {"id"}
+
+    def test_begin_commit(self):
+        kind, payloads = self.decoder.decode(
+            b"B" + struct.pack("!qqI", 100, 0, 777)
+        )
+        assert kind == BEGIN
+        assert payloads == []
+        assert self.decoder.xid == 777
+        kind, payloads = self.decoder.decode(
+            b"C" + struct.pack("!bqqq", 0, 100, 200, 0)
+        )
+        assert kind == COMMIT
+        assert self.decoder.xid is None
+
+    def test_insert(self):
+        self.decoder.xid = 42
+        kind, payloads = self.decoder.decode(
+            b"I"
+            + struct.pack("!I", 16384)
+            + b"N"
+            + tuple_data("1", 'it\'s "quoted"', "f", "1.5", "9.99")
+        )
+        assert kind == b"I"
+        assert len(payloads) == 1
+        payload = payloads[0]
+        assert payload.tg_op == INSERT
+        assert payload.schema == "public"
+        assert payload.table == "book"
+        assert payload.xmin == 42
+        assert payload.old == {}
+        assert payload.new == {
+            "id": 1,
+            "title": 'it\'s "quoted"',
+            "active": False,
+            "price": 1.5,
+            "rating": "9.99",
+        }
+
+    def test_update(self):
+        kind, payloads = self.decoder.decode(
+            b"U"
+            + struct.pack("!I", 16384)
+            + b"N"
+            + tuple_data("1", None, "t", "2", ...)
+        )
+        payload = payloads[0]
+        assert payload.tg_op == UPDATE
+        assert payload.old == {}
+        # unchanged TOAST values are not sent
+        assert payload.new == {
+            "id": 1,
+            "title": None,
+            "active": True,
+            "price": 2.0,
+        }
+
+    def test_update_with_old_key(self):
+        kind, payloads = self.decoder.decode(
+            b"U"
+            + struct.pack("!I", 16384)
+            + b"K"
+            + tuple_data("1", None, None, None, None)
+            + b"N"
+            + tuple_data("2", "a", "t", "1", "1")
+        )
+        payload = payloads[0]
+        assert payload.old == {"id": 1}
+        assert payload.new["id"] == 2
+        assert payload.data == {
+            "id": 2,
+            "title": "a",
+            "active": True,
+            "price": 1.0,
+            "rating": "1",
+        }
+
+    def test_update_with_old_tuple(self):
+        kind, payloads = self.decoder.decode(
+            b"U"
+            + struct.pack("!I", 16384)
+            + b"O"
+            + tuple_data("1", "a", "t", "1", "1")
+            + b"N"
+            + tuple_data("1", "b", "t", "1", "1")
+        )
+        payload = payloads[0]
+        assert payload.old["title"] == "a"
+        assert payload.new["title"] == "b"
+
+    def test_delete(self):
+        kind, payloads = self.decoder.decode(
+            b"D"
+            + struct.pack("!I", 16384)
+            + b"K"
+            + tuple_data("5", None, None, None, None)
+        )
+        payload = payloads[0]
+        assert payload.tg_op == DELETE
+        assert payload.new == {"id": 5}
+        assert payload.data == {"id": 5}
+
+    def test_truncate(self):
+        self.decoder.decode(relation(16385, "public", "author", []))
+        kind, payloads = self.decoder.decode(
+            b"T" + struct.pack("!ib", 2, 0) + struct.pack("!II", 16384, 16385)
+        )
+        assert [(p.tg_op, p.table) for p in payloads] == [
+            (TRUNCATE, "book"),
+            (TRUNCATE, "author"),
+        ]
+
+    def test_message(self):
+        data: bytes = (
+            b"M"
+            + struct.pack("!bq", 0, 100)
+            + _str("heartbeat")
+            + struct.pack("!i", 2)
+            + b"{}"
+        )
+        kind, payloads = self.decoder.decode(data)
+        assert kind == MESSAGE
+        assert payloads == []
+        assert self.decoder.is_transactional_message(data) is False
+        assert (
+            self.decoder.is_transactional_message(
+                b"M" + struct.pack("!bq", 1, 100)
+            )
+            is True
+        )
+
+    def test_unknown_relation(self):
+        with pytest.raises(LogicalSlotParseError):
+            self.decoder.decode(
+                b"I" + struct.pack("!I", 1) + b"N" + tuple_data("1")
+            )
+
+    def test_unknown_message(self):
+        with pytest.raises(LogicalSlotParseError):
+            self.decoder.decode(b"Z")
+
+    @pytest.mark.skipif(
+        IS_MYSQL_COMPAT,
+        reason="Skipped because IS_MYSQL_COMPAT env var is set",
+    )
+    def test_decode_server_stream(self, connection):
+        pg_base = Base(connection.engine.url.database)
+        pg_base.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS pgoutput_test "
+                "(id INTEGER PRIMARY KEY, name TEXT)"
+            )
+        )
+        pg_base.create_publication(
+            "pgoutput_test", [("public", "pgoutput_test")]
+        )
+        pg_base.create_replication_slot("pgoutput_test", plugin=PGOUTPUT)
+        try:
+            assert pg_base.publication_exists("pgoutput_test") is True
+            assert pg_base.replication_slots("pgoutput_test") == []
+            assert (
+                len(pg_base.replication_slots("pgoutput_test", plugin=None))
+                == 1
+            )
+            pg_base.execute(
+                sa.text(
+                    "INSERT INTO pgoutput_test VALUES (1, 'it''s'), (2, NULL)"
+                )
+            )
+            pg_base.execute(
+                sa.text("UPDATE pgoutput_test SET id = 3 WHERE id = 2")
+            )
+            pg_base.execute(sa.text("DELETE FROM pgoutput_test WHERE id = 1"))
+            rows = pg_base.fetchall(
+                sa.text(
+                    "SELECT data FROM PG_LOGICAL_SLOT_PEEK_BINARY_CHANGES("
+                    "'pgoutput_test', NULL, NULL, 'proto_version', '1', "
+                    "'publication_names', 'pgoutput_test')"
+                )
+            )
+            payloads: list = []
+            for row in rows:
+                payloads.extend(self.decoder.decode(bytes(row[0]))[1])
+            assert [(p.tg_op, p.table, p.old, p.new) for p in payloads] == [
+                (INSERT, "pgoutput_test", {}, {"id": 1, "name": "it's"}),
+                (INSERT, "pgoutput_test", {}, {"id": 2, "name": None}),
+                (UPDATE, "pgoutput_test", {"id": 2}, {"id": 3, "name": None}),
+                (DELETE, "pgoutput_test", {}, {"id": 1}),
+            ]
+            assert all(p.xmin for p in payloads)
+        finally:
+            pg_base.drop_replication_slot("pgoutput_test")
+            pg_base.drop_publication("pgoutput_test")
+            assert pg_base.publication_exists("pgoutput_test") is False
+            pg_base.execute(sa.text("DROP TABLE pgoutput_test"))
@@ -1,7 +1,10 @@
 """Plugin tests."""
 
+import threading
+import time
 import typing as t
-from unittest.mock import MagicMock, patch
+from concurrent import futures
+from unittest.mock import call, MagicMock, patch
 
 import pytest
 
@@ -205,6 +208,179 @@ class TestPlugins:
         assert received_kwargs["_id"] == "doc-123"
         assert received_kwargs["_index"] == "my-index"
 
+    def test_plugin_transform_batch_falls_back_to_transform(self):
+        """Test the default transform_batch calls transform per doc."""
+
+        class RecordPlugin(Plugin):
+            name = "record_plugin"
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                doc["kwargs"] = kwargs
+                return doc
+
+        result = RecordPlugin().transform_batch(
+            [{"a": 1}, {"a": 2}], _ids=["1", "2"], _indices=["x", "y"]
+        )
+        assert result == [
+            {"a": 1, "kwargs": {"_id": "1", "_index": "x"}},
+            {"a": 2, "kwargs": {"_id": "2", "_index": "y"}},
+        ]
+
+    def test_plugins_transform_batch(self):
+        """Test transform_batch hands each plugin chunks of docs."""
+        batches: list = []
+
+        class BatchPlugin(Plugin):
+            name = "batch_plugin"
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                raise AssertionError("called per doc")
+
+            def transform_batch(
+                self, docs: t.List[dict], **kwargs: t.Any
+            ) -> t.List[dict]:
+                batches.append(kwargs["_ids"])
+                return [{**doc, "batched": True} for doc in docs]
+
+        class DropPlugin(Plugin):
+            name = "drop_plugin"
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                return {} if kwargs["_id"] == "2" else doc
+
+        plugins = Plugins(
+            "fake_package", names=["batch_plugin", "drop_plugin"]
+        )
+        plugins.plugins = [BatchPlugin(), DropPlugin()]
+
+        docs = (
+            {"_id": str(i), "_index": "test", "_source": {"i": i}}
+            for i in range(5)
+        )
+        result = list(plugins.transform_batch(docs, chunk_size=2))
+        assert batches == [["0", "1"], ["2", "3"], ["4"]]
+        # in order, without the dropped doc
+        assert [doc["_id"] for doc in result] == ["0", "1", "3", "4"]
+        assert all(doc["_source"]["batched"] for doc in result)
+
+    def test_plugins_transform_batch_concurrent(self):
+        """Test chunks overlap up to the limit of each plugin, in order."""
+        active: dict = {"slow_plugin": 0, "serial_plugin": 0}
+        peak: dict = {"slow_plugin": 0, "serial_plugin": 0}
+        lock = threading.Lock()
+
+        def record(name: str, delay: float) -> None:
+            with lock:
+                active[name] += 1
+                peak[name] = max(peak[name], active[name])
+            time.sleep(delay)
+            with lock:
+                active[name] -= 1
+
+        class SlowPlugin(Plugin):
+            name = "slow_plugin"
+            concurrency = 3
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                return doc
+
+            def transform_batch(
+                self, docs: t.List[dict], **kwargs: t.Any
+            ) -> t.List[dict]:
+                # later chunks finish first
+                record(self.name, 0.2 / (1 + docs[0]["i"]))
+                return docs
+
+        class SerialPlugin(Plugin):
+            name = "serial_plugin"
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                record(self.name, 0.005)
+                return doc
+
+        plugins = Plugins(
+            "fake_package", names=["slow_plugin", "serial_plugin"]
+        )
+        plugins.plugins = [SlowPlugin(), SerialPlugin()]
+
+        docs = (
+            {"_id": str(i), "_index": "test", "_source": {"i": i}}
+            for i in range(12)
+        )
+        result = list(plugins.transform_batch(docs, chunk_size=2))
+        assert [doc["_id"] for doc in result] == [str(i) for i in range(12)]
+        assert peak == {"slow_plugin": 3, "serial_plugin": 1}
+
+    @patch("pgsync.plugin.time.sleep")
+    def test_plugins_transform_batch_retries(self, mock_sleep):
+        """Test a failed or slow batch is retried with backoff."""
+        attempts: list = []
+
+        class FlakyPlugin(Plugin):
+            name = "flaky_plugin"
+            # a slot for the retry while the slow call still holds one
+            concurrency = 2
+            timeout = 0.05
+            retries = 2
+            backoff = 0.5
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                attempts.append(kwargs["_id"])
+                if len(attempts) == 1:
+                    raise ConnectionError("reset")
+                if len(attempts) == 2:
+                    threading.Event().wait(0.2)
+                    doc["late"] = True
+                    return doc
+                doc["ok"] = True
+                return doc
+
+        plugins = Plugins("fake_package", names=["flaky_plugin"])
+        plugins.plugins = [FlakyPlugin()]
+
+        docs = [{"_id": "1", "_index": "test", "_source": {}}]
+        result = list(plugins.transform_batch(docs))
+        assert result[0]["_source"]["ok"] is True
+        assert attempts == ["1", "1", "1"]
+        assert mock_sleep.call_args_list == [call(0.5), call(1.0)]
+        # the call that timed out runs on a copy of its own
+        threading.Event().wait(0.3)
+        assert result[0]["_source"] == {"ok": True}
+        assert docs[0]["_source"] == {"ok": True}
+
+        attempts.clear()
+        plugins.plugins[0].retries = 0
+        with pytest.raises(ConnectionError):
+            list(plugins.transform_batch(docs))
+
+    def test_plugins_transform_batch_timeout_daemon(self):
+        """Test a hung call does not hold up the exit of the process."""
+        release = threading.Event()
+
+        class HungPlugin(Plugin):
+            name = "hung_plugin"
+            timeout = 0.05
+
+            def transform(self, doc: dict, **kwargs: t.Any) -> dict:
+                release.wait(5)
+                return doc
+
+        plugins = Plugins("fake_package", names=["hung_plugin"])
+        plugins.plugins = [HungPlugin()]
+
+        docs = [{"_id": "1", "_index": "test", "_source": {}}]
+        try:
+            with pytest.raises(futures.TimeoutError):
+                list(plugins.transform_batch(docs))
+            threads = [
+                thread
+                for thread in threading.enumerate()
+                if thread.name == "plugin-hung_plugin"
+            ]
+            assert threads and all(thread.daemon for thread in threads)
+        finally:
+            release.set()
+
     def test_plugins_auth_with_no_plugins(self):
         """Test auth returns None when no plugins."""
         plugins = Plugins("fake_package", names=[])
@@ -444,6 +444,31 @@ class TestQueryBuilder(object):
         result = query_builder._build_filters(filters, node)
         assert result is not None
 
+    def test__build_filters_set_based(self, connection):
+        """Test _build_filters matches keys as a set instead of OR branches."""
+        pg_base = Base(connection.engine.url.database)
+        query_builder = QueryBuilder()
+
+        node = Node(
+            models=pg_base.models,
+            table="book",
+            schema=self.schema,
+        )
+        filters = {"book": [{"isbn": "001"}, {"isbn": "002"}]}
+        result = query_builder._build_filters(filters, node)
+        assert " OR " not in str(result)
+        assert str(result).startswith("book_1.isbn IN ")
+
+        filters = {
+            "book": [
+                {"isbn": "001", "title": "A"},
+                {"isbn": "002", "title": "B"},
+            ]
+        }
+        result = query_builder._build_filters(filters, node)
+        assert " OR " not in str(result)
+        assert str(result).startswith("(book_1.isbn, book_1.title) IN ")
+
     def test__build_filters_returns_none_for_empty(self, connection):
         """Test _build_filters returns None for empty/missing filters."""
         pg_base = Base(connection.engine.url.database)
@@ -463,6 +488,90 @@ class TestQueryBuilder(object):
         result = query_builder._build_filters({"other_table": []}, node)
         assert result is None
 
+    def test_filter_params(self):
+        """Test filter_params groups values into one array per column."""
+        query_builder = QueryBuilder()
+        filters = {
+            "book": [
+                {"isbn": "001"},
+                {"id": 1, "uid": "a"},
+                {"uid": "b", "id": 2},
+            ],
+            "city": [],
+        }
+        assert query_builder.filter_shape(filters) == (
+            ("book", (("id", "uid"), ("isbn",))),
+        )
+        assert query_builder.filter_shape(None) == ()
+        assert query_builder.filter_params(filters) == {
+            "book_0_id": [1, 2],
+            "book_0_uid": ["a", "b"],
+            "book_1_isbn": ["001"],
+        }
+
+    @pytest.mark.skipif(
+        IS_MYSQL_COMPAT,
+        reason="Skipped because IS_MYSQL_COMPAT env var is set",
+    )
+    def test__bind_filters(self, connection):
+        """Test _bind_filters uses bound array parameters."""
+        pg_base = Base(connection.engine.url.database)
+        query_builder = QueryBuilder()
+
+        node = Node(
+            models=pg_base.models,
+            table="book",
+            schema=self.schema,
+        )
+        assert query_builder._bind_filters(None, node) is None
+
+        result = query_builder._bind_filters(
+            {"book": [{"isbn": "001"}, {"isbn": "002"}]}, node
+        )
+        assert str(result) == "book_1.isbn = ANY (:book_0_isbn)"
+
+    @pytest.mark.skipif(
+        IS_MYSQL_COMPAT,
+        reason="Skipped because IS_MYSQL_COMPAT env var is set",
+    )
+    def test__bind_filters_composite(self, connection, session, book_cls):
+        """Test the bound composite key filter runs on the database."""
+        pg_base = Base(connection.engine.url.database)
+        query_builder = QueryBuilder()
+
+        node = Node(
+            models=pg_base.models,
+            table="book",
+            schema=self.schema,
+        )
+        session.add_all(
+            [
+                book_cls(isbn="bind-001", title="A"),
+                book_cls(isbn="bind-002", title="B"),
+            ]
+        )
+        session.commit()
+        try:
+            filters = {
+                "book": [
+                    {"isbn": "bind-001", "title": "A"},
+                    {"isbn": "bind-002", "title": "X"},
+                ]
+            }
+            statement = sa.select(node.model.c.isbn).where(
+                query_builder._bind_filters(filters, node)
+            )
+            rows = session.execute(
+                statement,
+                query_builder.filter_params(filters, nodes=[node]),
+            ).fetchall()
+            assert [row.isbn for row in rows] == ["bind-001"]
+        finally:
+            session.query(book_cls).filter(
+                book_cls.isbn.in_(["bind-001", "bind-002"])
+            ).delete()
+            session.commit()
+
     @pytest.mark.skipif(
         IS_MYSQL_COMPAT,
         reason="Skipped because IS_MYSQL_COMPAT env var is set",
@@ -2561,3 +2670,89 @@ class TestQueryBuilderAdvanced:
         query_builder._non_through(child)
 
         assert child._subquery is not None
+
+
+class TestTransformColumns(object):
+    """Transforms pushed down into the query tests."""
+
+    def test__transform_columns(self):
+        book = sa.table(
+            "book",
+            sa.column("isbn", sa.String),
+            sa.column("code", sa.String),
+            sa.column("price", sa.Integer),
+        )
+        columns: list = [
+            item for column in book.c for item in (column.name, column)
+        ]
+        transform: dict = {
+            "replace": {"code": {"-": "=", "_": " "}},
+            "rename": {"isbn": "id", "price": "cost"},
+            "concat": [
+                {
+                    "columns": ["id", "code", "x", ""],
+                    "destination": "key",
+                    "delimiter": "-",
+                }
+            ],
+        }
+        columns = QueryBuilder()._transform_columns(columns, transform)
+        assert columns[::2] == ["id", "code", "cost", "key"]
+        compiled: list = [
+            str(
+                column.compile(
+                    dialect=sa.dialects.postgresql.dialect(),
+                    compile_kwargs={"literal_binds": True},
+                )
+            )
+            for column in columns[1::2]
+        ]
+        assert compiled == [
+            "book.isbn",
+            "REPLACE(REPLACE(book.code, '-', '='), '_', ' ')",
+            "book.price",
+            "CONCAT_WS('-', NULLIF(book.isbn, ''), "
+            "NULLIF(REPLACE(REPLACE(book.code, '-', '='), '_', ' '), ''), "
+            "'x')",
+        ]
+
+    @pytest.mark.skipif(
+        IS_MYSQL_COMPAT,
+        reason="Skipped because IS_MYSQL_COMPAT env var is set",
+    )
+    def test__json_build_object_transform(self):
+        book = sa.table("book", sa.column("isbn", sa.String))
+        expression = QueryBuilder()._json_build_object(
+            ["isbn", book.c.isbn], transform={"rename": {"isbn": "id"}}
+        )
+        assert expression.compile(
+            dialect=sa.dialects.postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        ).string == ("CAST(JSON_BUILD_OBJECT('id', book.isbn) AS JSONB)")
+
+
+class TestFilterParams(object):
+    """Bound filter parameters tests."""
+
+    def test_filter_params_skips_incomparable(self):
+        """Test filter_params leaves out values the column can't match."""
+        book = sa.Table(
+            "book",
+            sa.MetaData(),
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("uid", sa.dialects.postgresql.UUID, primary_key=True),
+        )
+        node = MagicMock(table="book", model=book)
+        uid: str = "5b5d1f9e-0a8a-4b8e-9a8e-0a8a4b8e9a8e"
+        filters = {
+            "book": [
+                {"id": 1, "uid": uid},
+                {"id": 2, "uid": "not-a-uuid"},
+                {"id": 3, "uid": 7},
+            ]
+        }
+        params: dict = QueryBuilder().filter_params(filters, nodes=[node])
+        if IS_MYSQL_COMPAT:
+            assert params["book_0_id"] == [1, 2, 3]
+        else:
+            assert params == {"book_0_id": [1], "book_0_uid": [uid]}
@@ -222,6 +222,40 @@ class TestSearchClient(object):
 
                     assert client.doc_count == 1
 
+    def test_bulk_acknowledge(self):
+        """Test SearchClient bulk reports the index results."""
+        with override_env_var(
+            ELASTICSEARCH="False",
+            OPENSEARCH="True",
+            ELASTICSEARCH_STREAMING_BULK="True",
+        ):
+            importlib.reload(settings)
+            with mock.patch(
+                "pgsync.search_client.get_search_url",
+                return_value="http://localhost:9200",
+            ):
+                with mock.patch(
+                    "pgsync.search_client.get_search_client",
+                    return_value=MagicMock(),
+                ):
+                    client = SearchClient()
+                    client.acknowledge = MagicMock()
+                    client.streaming_bulk = MagicMock(
+                        return_value=[
+                            (True, {"index": {"_id": "1", "status": 201}}),
+                            (False, {"index": {"_id": "2", "status": 400}}),
+                            (True, {"delete": {"_id": "3", "status": 200}}),
+                            (True, {"index": {"_id": "4", "status": 200}}),
+                        ]
+                    )
+
+                    client.bulk("test_index", [], chunk_size=2)
+
+                    assert client.acknowledge.call_args_list == [
+                        mock.call(["1"], ["2"]),
+                        mock.call(["4"], []),
+                    ]
+
     def test_bulk_parallel(self):
         """Test SearchClient bulk with parallel_bulk."""
         with override_env_var(
@@ -279,6 +313,51 @@ class TestSearchClient(object):
                     mock_logger.error.assert_called_once()
                     assert client.doc_count == 0
 
+    @mock.patch("pgsync.search_client.logger")
+    def test_bulk_rejections_shrink_adaptive_chunk_size(self, mock_logger):
+        """Test 429 rejections are counted and halve the chunk size."""
+        with override_env_var(
+            ELASTICSEARCH="False",
+            OPENSEARCH="True",
+            ELASTICSEARCH_STREAMING_BULK="True",
+        ):
+            importlib.reload(settings)
+            with (
+                mock.patch(
+                    "pgsync.search_client.get_search_url",
+                    return_value="http://localhost:9200",
+                ),
+                mock.patch.object(settings, "ELASTICSEARCH_CHUNK_SIZE", 100),
+                mock.patch.object(settings, "ADAPTIVE_BATCH_SIZE", True),
+            ):
+                with mock.patch(
+                    "pgsync.search_client.get_search_client",
+                    return_value=MagicMock(),
+                ):
+                    client = SearchClient()
+                    client.streaming_bulk = MagicMock(
+                        return_value=[
+                            (True, {}),
+                            (False, {"index": {"_id": "2", "status": 429}}),
+                        ]
+                    )
+                    client.bulk("test_index", [{"_id": "1"}, {"_id": "2"}])
+                    assert client.rejected == 1
+                    assert client.chunk_size.size == 50
+                    assert (
+                        client.streaming_bulk.call_args.kwargs["chunk_size"]
+                        == 100
+                    )
+
+                    client.streaming_bulk.return_value = [(True, {})]
+                    client.bulk("test_index", [{"_id": "1"}])
+                    assert client.rejected == 1
+                    assert client.chunk_size.size == 60
+                    assert (
+                        client.streaming_bulk.call_args.kwargs["chunk_size"]
+                        == 50
+                    )
+
     def test_refresh(self):
         """Test SearchClient refresh method."""
         with override_env_var(ELASTICSEARCH="False", OPENSEARCH="True"):
@@ -47,6 +47,8 @@ def test_sink_safe_defaults():
     assert list(sink._search("index", "book")) == []
     assert sink.refresh(["index"]) is None
     assert sink.close() is None
+    assert sink.acknowledges is False
+    assert sink.acknowledge is None
 
     with pytest.raises(NotImplementedError):
         sink.delete_by_query("index", ["1"])
@@ -1,16 +1,21 @@
 """Sync tests."""
 
 import importlib
+import json
 import os
+import queue
 import subprocess
 import sys
 import typing as t
 from collections import namedtuple
+from datetime import datetime, timedelta
 from types import SimpleNamespace
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock
 
 import pytest
-from mock import ANY, call, patch
+import sqlalchemy as sa
+from mock import ANY, call, patch, PropertyMock
+from sqlalchemy.dialects import postgresql
 
 from pgsync.base import Base, Payload
 from pgsync.exc import (
@@ -23,11 +28,11 @@ from pgsync.exc import (
 from pgsync.node import Node
 from pgsync.settings import IS_MYSQL_COMPAT
 from pgsync.singleton import Singleton
-from pgsync.sync import settings, Sync
+from pgsync.sync import parallel_workers, settings, Sync
 
 from .testing_utils import override_env_var
 
-ROW = namedtuple("Row", ["data", "xid"])
+ROW = namedtuple("Row", ["data", "xid", "lsn"], defaults=["0/1"])
 
 
 def make_root_sync(routing: str):
@@ -130,6 +135,153 @@ def test_delete_op_deletes_document_without_old_routing():
     sync.search_client.delete_by_query.assert_called_once_with("book", ["1"])
 
 
+def test_watermark_changes_rereads_lag_once_per_window():
+    """The lag window is re-read once per WATERMARK_LAG, not every pass."""
+    node = SimpleNamespace(
+        name="public.book",
+        table="book",
+        schema="public",
+        watermark="seq",
+        table_columns=["seq"],
+        model=sa.Table("book", sa.MetaData(), sa.Column("seq", sa.Integer)),
+    )
+    sync = object.__new__(Sync)
+    sync.index = "book"
+    sync.count = {"db": 0}
+    sync.tree = Mock()
+    sync.tree.traverse_breadth_first.return_value = [node]
+    sync.search_client = Mock()
+    sync._payloads = Mock(return_value=[])
+    sync._settled = {}
+    engine = MagicMock()
+    conn = engine.connect.return_value.__enter__.return_value
+    execute = conn.execution_options.return_value.execute
+    # each pass reads one new row above the watermark
+    execute.side_effect = lambda statement: Mock(
+        **{
+            "mappings.return_value.partitions.return_value": [
+                [{"seq": 100 + execute.call_count}]
+            ]
+        }
+    )
+    saved: dict = {"public.book": 100}
+
+    def bounds():
+        statement = execute.call_args.args[0]
+        return statement.whereclause.compile(
+            dialect=postgresql.dialect()
+        ).params
+
+    with (
+        patch.object(
+            Sync, "engine", new_callable=PropertyMock, return_value=engine
+        ),
+        patch.object(
+            Sync, "watermarks", new_callable=PropertyMock
+        ) as mock_watermarks,
+    ):
+        mock_watermarks.side_effect = lambda *args: (
+            saved.update(args[0]) if args else dict(saved)
+        )
+        with patch.object(settings, "WATERMARK_LAG", 60.0):
+            with patch("pgsync.sync.time.time", return_value=1000.0):
+                sync.watermark_changes()
+                # the first pass re-reads the window below the watermark
+                assert sorted(bounds().values()) == [60.0, 100]
+            for now in (1000.1, 1030.0, 1059.9):
+                with patch("pgsync.sync.time.time", return_value=now):
+                    high: int = saved["public.book"]
+                    sync.watermark_changes()
+                    assert list(bounds().values()) == [high]
+            with patch("pgsync.sync.time.time", return_value=1060.0):
+                sync.watermark_changes()
+                # from the watermark of the previous re-read
+                assert sorted(bounds().values()) == [60.0, 100]
+    assert saved == {"public.book": 105}
+
+
+def test_validate_watermarks_needs_every_table():
+    """Tables without a watermark are never read by watermark polling."""
+
+    def node(name, watermark=None, throughs=()):
+        return SimpleNamespace(
+            name=name,
+            watermark=watermark,
+            relationship=SimpleNamespace(throughs=list(throughs)),
+        )
+
+    root = node("public.book", "updated_at")
+    sync = object.__new__(Sync)
+    sync.tree = Mock(root=root)
+    sync.tree.traverse_breadth_first.return_value = [
+        root,
+        node("public.publisher", "updated_at"),
+    ]
+    sync._validate_watermarks()
+
+    sync.tree.traverse_breadth_first.return_value = [
+        root,
+        node("public.author", throughs=[node("public.book_author")]),
+    ]
+    with pytest.raises(SchemaError) as excinfo:
+        sync._validate_watermarks()
+    assert "public.author, public.book_author" in str(excinfo.value)
+
+    root.watermark = None
+    sync._validate_watermarks()
+
+
+def test_on_publish_checkpoint_keeps_wal_lsn(tmp_path):
+    """A trigger mode checkpoint can be caught up from the slot."""
+    sync = object.__new__(Sync)
+    sync._Sync__name = "testdb_book"
+    sync.index = "book"
+    sync.tree = Mock(tables={"book"}, schemas={"public"})
+    sync.tree.traverse_breadth_first.return_value = []
+    sync.tree.get_node.return_value.model.primary_keys = ["id"]
+    sync.search_client = Mock()
+    sync._regroup = Mock(return_value=[])
+    payloads: t.List[Payload] = [
+        Payload(
+            tg_op="INSERT",
+            table="book",
+            schema="public",
+            new={"id": 1},
+            xmin=1234,
+        )
+    ]
+    with (
+        patch.object(settings, "REDIS_CHECKPOINT", False),
+        patch.object(settings, "CHECKPOINT_PATH", str(tmp_path)),
+        patch.object(
+            Sync, "is_mysql_compat", new_callable=PropertyMock
+        ) as mock_mysql,
+        patch.object(
+            Sync, "current_wal_lsn", new_callable=PropertyMock
+        ) as mock_lsn,
+        patch.object(
+            Sync, "txid_current", new_callable=PropertyMock
+        ) as mock_txid,
+    ):
+        mock_mysql.return_value = False
+        mock_lsn.return_value = "0/16B3748"
+        mock_txid.return_value = 1240
+        sync._on_publish(payloads)
+        assert sync.checkpoint == 1233
+        assert sync.checkpoint_wal_lsn == "0/16B3748"
+        assert sync._checkpoint_lsn == "0/16B3748"
+
+        with patch.object(
+            sync, "confirmed_flush_lsn", return_value="0/16B3740"
+        ):
+            assert sync._slot_covers_checkpoint() is True
+        # the slot was truncated past the checkpoint
+        with patch.object(
+            sync, "confirmed_flush_lsn", return_value="0/16B3750"
+        ):
+            assert sync._slot_covers_checkpoint() is False
+
+
 def test_delete_op_deletes_document_with_old_routing():
     """A root delete uses a direct routed delete when routing is available."""
     sync, node = make_root_sync("id")
@@ -194,8 +346,9 @@ def sync():
 class TestSync(object):
     """Sync tests."""
 
+    @patch("pgsync.sync.Sync.replication_slot_advance")
     @patch("pgsync.sync.logger")
-    def test_logical_slot_changes(self, mock_logger, sync):
+    def test_logical_slot_changes(self, mock_logger, mock_advance, sync):
         with patch("pgsync.sync.Sync.logical_slot_peek_changes") as mock_peek:
             mock_peek.side_effect = [
                 [ROW("BEGIN 72736", 1234)],
@@ -206,19 +359,13 @@ class TestSync(object):
                 assert mock_peek.call_args_list == [
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=0,
+                        upto_nchanges=5000,
                     ),
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=5000,
+                        upto_nchanges=5000,
                     ),
                 ]
                 mock_sync.assert_not_called()
@@ -233,19 +380,13 @@ class TestSync(object):
                 assert mock_peek.call_args_list == [
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=0,
+                        upto_nchanges=5000,
                     ),
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=5000,
+                        upto_nchanges=5000,
                     ),
                 ]
                 mock_sync.assert_not_called()
@@ -272,22 +413,17 @@ class TestSync(object):
                     assert mock_peek.call_args_list == [
                         call(
                             slot_name="testdb_testdb",
-                            txmin=None,
-                            txmax=None,
                             upto_lsn=None,
-                            limit=5000,
-                            offset=0,
+                            upto_nchanges=5000,
                         ),
                         call(
                             slot_name="testdb_testdb",
-                            txmin=None,
-                            txmax=None,
                             upto_lsn=None,
-                            limit=5000,
-                            offset=5000,
+                            upto_nchanges=5000,
                         ),
                     ]
-                    mock_get.assert_called_once()
+                    mock_get.assert_not_called()
+                    mock_advance.assert_called_with("testdb_testdb", "0/1")
                     mock_sync.assert_called_once()
                     assert mock_logger.debug.call_args_list == [
                         call("op: INSERT tbl book - 1"),
@@ -322,8 +458,11 @@ class TestSync(object):
                             sync.logical_slot_changes()
             assert "Error parsing row" in str(excinfo.value)
 
+    @patch("pgsync.sync.Sync.replication_slot_advance")
     @patch("pgsync.sync.logger")
-    def test_logical_slot_changes_skips_heartbeat(self, mock_logger, sync):
+    def test_logical_slot_changes_skips_heartbeat(
+        self, mock_logger, mock_advance, sync
+    ):
         """Regression: CDC heartbeat rows must not reach parse_logical_slot.
 
         Reproduces the reported SQL peek/pull path (logical_slot_changes),
@@ -367,10 +506,11 @@ class TestSync(object):
         assert heartbeat not in parsed_rows
         assert insert in parsed_rows
 
+    @patch("pgsync.sync.Sync.replication_slot_advance")
     @patch("pgsync.sync.SearchClient.bulk")
     @patch("pgsync.sync.logger")
     def test_logical_slot_changes_groups(
-        self, mock_logger, mock_search_client, sync
+        self, mock_logger, mock_search_client, mock_advance, sync
     ):
         with patch(
             "pgsync.sync.Sync.logical_slot_peek_changes"
@@ -427,19 +567,13 @@ class TestSync(object):
                 assert mock_logical_slot_peek_changes.call_args_list == [
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=0,
+                        upto_nchanges=5000,
                     ),
                     call(
                         slot_name="testdb_testdb",
-                        txmin=None,
-                        txmax=None,
                         upto_lsn=None,
-                        limit=5000,
-                        offset=5000,
+                        upto_nchanges=5000,
                     ),
                 ]
                 assert mock_logger.debug.call_args_list == [
@@ -448,6 +582,7 @@ class TestSync(object):
                     call("op: INSERT tbl book - 2"),
                 ]
                 assert mock_search_client.call_count == 3
+                mock_advance.assert_called_once_with("testdb_testdb", "0/1")
 
     @patch("pgsync.sync.SearchClient")
     def test_sync_validate(self, mock_search_client):
@@ -619,17 +754,18 @@ class TestSync(object):
 
     @patch("pgsync.sync.logger")
     def test_truncate_slots(self, mock_logger, sync):
-        with patch(
-            "pgsync.sync.Sync.logical_slot_get_changes"
-        ) as mock_logical_slot_changes:
+        with (
+            patch("pgsync.sync.Sync.replication_slot_advance") as mock_advance,
+            patch("pgsync.sync.Sync.confirmed_flush_lsn", return_value="0/8"),
+        ):
             sync._truncate = True
+            sync._checkpoint_lsn = "0/10"
             sync._truncate_slots()
-            mock_logical_slot_changes.assert_called_once_with(
-                "testdb_testdb", upto_nchanges=None
-            )
+            mock_advance.assert_called_once_with("testdb_testdb", "0/10")
             mock_logger.debug.assert_called_once_with(
-                "Truncating replication slot: testdb_testdb"
+                "Truncating replication slot: testdb_testdb to 0/10"
             )
+            sync._checkpoint_lsn = None
 
     @patch("pgsync.sync.SearchClient.bulk")
     @patch("pgsync.sync.logger")
@@ -646,14 +782,112 @@ class TestSync(object):
                 txmax=txmax,
                 logical_slot_chunk_size=settings.LOGICAL_SLOT_CHUNK_SIZE,
                 upto_lsn=ANY,
+                wal_lsn=ANY,
             )
             mock_logger.debug.assert_called_once_with(
                 f"pull txmin: {txmin} - txmax: {txmax}"
             )
             # assert sync.checkpoint == txmax
             assert sync._truncate is True
+            assert sync._checkpoint_lsn is not None
             mock_es.assert_called_once_with("testdb", ANY)
 
+    @patch("pgsync.sync.SearchClient.bulk")
+    def test_pull_parallel(self, mock_es, sync):
+        with patch(
+            "pgsync.sync.Sync.logical_slot_changes"
+        ) as mock_logical_slot_changes:
+            with patch.object(
+                sync, "parallel_sync", return_value=42
+            ) as mock_parallel_sync:
+                sync.checkpoint = 1
+                sync.pull(parallel=4)
+            mock_parallel_sync.assert_called_once_with(4, txmin=1)
+            # the slot replays everything from the snapshot xmin on
+            mock_logical_slot_changes.assert_called_once_with(
+                txmin=42,
+                txmax=None,
+                logical_slot_chunk_size=settings.LOGICAL_SLOT_CHUNK_SIZE,
+                upto_lsn=ANY,
+                wal_lsn=None,
+            )
+            mock_es.assert_not_called()
+
+    @patch("pgsync.sync.SearchClient.bulk")
+    def test_pull_catches_up_from_slot(self, mock_es, sync):
+        with patch(
+            "pgsync.sync.Sync.logical_slot_changes"
+        ) as mock_logical_slot_changes:
+            with patch.object(
+                sync, "_slot_covers_checkpoint", return_value=True
+            ):
+                sync.checkpoint = 1
+                sync.pull()
+            # no xmin scan, the slot is replayed without an upper bound
+            mock_es.assert_not_called()
+            mock_logical_slot_changes.assert_called_once_with(
+                txmin=1,
+                txmax=None,
+                logical_slot_chunk_size=settings.LOGICAL_SLOT_CHUNK_SIZE,
+                upto_lsn=ANY,
+                wal_lsn=None,
+            )
+
+    @patch("pgsync.sync.SearchClient.bulk")
+    def test_pull_polling_watermark(self, mock_es, sync):
+        sync.tree.root.watermark = "isbn"
+        try:
+            with patch.object(
+                sync, "watermark_changes"
+            ) as mock_watermark_changes:
+                with patch(
+                    "pgsync.sync.Sync.logical_slot_changes"
+                ) as mock_logical_slot_changes:
+                    sync.pull(polling=True)
+                    mock_watermark_changes.assert_called_once_with()
+                    mock_logical_slot_changes.assert_not_called()
+                    mock_es.assert_not_called()
+        finally:
+            sync.tree.root.watermark = None
+
+    @patch("pgsync.sync.SearchClient.bulk")
+    def test_watermark_changes_first_run(self, mock_es, sync):
+        sync.tree.root.watermark = "isbn"
+        saved: dict = {}
+        try:
+            with patch(
+                "pgsync.sync.Sync.watermarks",
+                new_callable=PropertyMock,
+                return_value={},
+            ) as mock_watermarks:
+                mock_watermarks.side_effect = lambda *args: (
+                    saved.update(args[0]) if args else {}
+                )
+                with patch.object(sync, "_max_watermark", return_value="abc"):
+                    with patch.object(sync, "sync") as mock_sync:
+                        sync.watermark_changes()
+                        mock_sync.assert_called_once_with()
+            mock_es.assert_called_once()
+            assert saved == {sync.tree.root.name: "abc"}
+        finally:
+            sync.tree.root.watermark = None
+
+    def test__page_ranges(self):
+        assert Sync._page_ranges(10, 3) == [(0, 3), (3, 6), (6, None)]
+        assert Sync._page_ranges(2, 4) == [(0, 1), (1, None)]
+        assert Sync._page_ranges(0, 4) == [(0, None)]
+
+    def test_parallel_workers(self):
+        with patch.object(settings, "SQLALCHEMY_USE_NULLPOOL", False):
+            with patch.object(settings, "SQLALCHEMY_POOL_SIZE", 4):
+                with patch.object(settings, "SQLALCHEMY_MAX_OVERFLOW", 2):
+                    # one connection is kept for the coordinator
+                    assert parallel_workers() == 5
+                with patch.object(settings, "SQLALCHEMY_MAX_OVERFLOW", -1):
+                    assert parallel_workers() is None
+        with patch.object(settings, "SQLALCHEMY_USE_NULLPOOL", True):
+            assert parallel_workers() is None
+
     @patch("pgsync.sync.SearchClient.bulk")
     @patch("pgsync.sync.logger")
     def test__on_publish(self, mock_logger, mock_es, sync):
@@ -723,6 +957,136 @@ class TestSync(object):
         mock_es.debug.call_count == 3
         mock_es.assert_any_call("testdb", ANY)
 
+    def test__compact(self, sync):
+        """Test changes to the same row are folded into one net change."""
+
+        def book(tg_op, old=None, new=None):
+            return Payload(
+                schema="public",
+                tg_op=tg_op,
+                table="book",
+                old=old,
+                new=new,
+                xmin=1234,
+            )
+
+        def net(payloads):
+            return [
+                (payload.tg_op, payload.old, payload.new)
+                for payload in sync._compact(payloads)
+            ]
+
+        # INSERT + UPDATE + UPDATE -> INSERT
+        assert net(
+            [
+                book("INSERT", new={"isbn": "001", "title": "a"}),
+                book("UPDATE", new={"isbn": "001", "title": "b"}),
+                book("UPDATE", new={"isbn": "001", "title": "c"}),
+            ]
+        ) == [("INSERT", {}, {"isbn": "001", "title": "c"})]
+        # INSERT + DELETE -> DELETE, the doc may be indexed already
+        assert net(
+            [
+                book("INSERT", new={"isbn": "001", "title": "a"}),
+                book("DELETE", old={"isbn": "001"}),
+            ]
+        ) == [("DELETE", {"isbn": "001", "title": "a"}, {})]
+        # INSERT + DELETE + INSERT -> UPDATE
+        assert net(
+            [
+                book("INSERT", new={"isbn": "001"}),
+                book("DELETE", old={"isbn": "001"}),
+                book("INSERT", new={"isbn": "001", "title": "b"}),
+            ]
+        ) == [("UPDATE", {"isbn": "001"}, {"isbn": "001", "title": "b"})]
+        # INSERT + primary key UPDATE -> DELETE of the first key + INSERT
+        assert net(
+            [
+                book("INSERT", new={"isbn": "001", "title": "a"}),
+                book("UPDATE", old={"isbn": "001"}, new={"isbn": "002"}),
+                book("UPDATE", new={"isbn": "002", "title": "c"}),
+            ]
+        ) == [
+            ("DELETE", {"isbn": "001", "title": "a"}, {}),
+            ("INSERT", {}, {"isbn": "002", "title": "c"}),
+        ]
+        # UPDATE + primary key UPDATE + DELETE -> DELETE of the first key
+        assert net(
+            [
+                book("UPDATE", new={"isbn": "001", "title": "a"}),
+                book("UPDATE", old={"isbn": "001"}, new={"isbn": "002"}),
+                book("DELETE", old={"isbn": "002"}),
+            ]
+        ) == [("DELETE", {"isbn": "001"}, {})]
+        # DELETE + INSERT -> UPDATE
+        assert net(
+            [
+                book("DELETE", old={"isbn": "001"}),
+                book("INSERT", new={"isbn": "001", "title": "a"}),
+            ]
+        ) == [("UPDATE", {"isbn": "001"}, {"isbn": "001", "title": "a"})]
+        # a row taking over a moved key stays after the move
+        assert net(
+            [
+                book("UPDATE", old={"isbn": "001"}, new={"isbn": "002"}),
+                book("INSERT", new={"isbn": "001"}),
+                book("UPDATE", old={"isbn": "002"}, new={"isbn": "003"}),
+            ]
+        ) == [
+            ("UPDATE", {"isbn": "001"}, {"isbn": "003"}),
+            ("INSERT", {}, {"isbn": "001"}),
+        ]
+        # nothing is folded across a TRUNCATE
+        assert net(
+            [
+                book("INSERT", new={"isbn": "001"}),
+                book("TRUNCATE"),
+                book("UPDATE", new={"isbn": "001"}),
+            ]
+        ) == [
+            ("INSERT", {}, {"isbn": "001"}),
+            ("TRUNCATE", {}, {}),
+            ("UPDATE", {}, {"isbn": "001"}),
+        ]
+
+    def test__regroup(self, sync):
+        """Test non-adjacent runs are merged unless their rows overlap."""
+
+        def book(tg_op, old=None, new=None):
+            return Payload(
+                schema="public", tg_op=tg_op, table="book", old=old, new=new
+            )
+
+        def groups(payloads):
+            return [
+                [(payload.tg_op, payload.data["isbn"]) for payload in group]
+                for group in sync._regroup(payloads)
+            ]
+
+        assert groups(
+            [
+                book("INSERT", new={"isbn": "001"}),
+                book("UPDATE", new={"isbn": "002"}),
+                book("INSERT", new={"isbn": "003"}),
+                book("UPDATE", new={"isbn": "004"}),
+            ]
+        ) == [
+            [("INSERT", "001"), ("INSERT", "003")],
+            [("UPDATE", "002"), ("UPDATE", "004")],
+        ]
+        # the INSERT of 002 must stay after the UPDATE that vacated 002
+        assert groups(
+            [
+                book("INSERT", new={"isbn": "001"}),
+                book("UPDATE", old={"isbn": "002"}, new={"isbn": "005"}),
+                book("INSERT", new={"isbn": "002"}),
+            ]
+        ) == [
+            [("INSERT", "001")],
+            [("UPDATE", "005")],
+            [("INSERT", "002")],
+        ]
+
     @patch("pgsync.sync.Sync._on_publish")
     def test_on_publish(self, mock_on_publish, sync):
         payloads = [
@@ -738,6 +1102,76 @@ class TestSync(object):
         sync.on_publish(payloads)
         mock_on_publish.assert_called_once_with(payloads)
 
+    def test_sync_explain(self, sync):
+        plan: dict = {
+            "Plan": {
+                "Node Type": "Hash Join",
+                "Total Cost": 10.0,
+                "Plan Rows": 1,
+                "Plans": [
+                    {
+                        "Node Type": "Seq Scan",
+                        "Relation Name": "publisher",
+                        "Plan Rows": 1,
+                    }
+                ],
+            }
+        }
+        with patch("pgsync.sync.sys") as mock_sys:
+            with patch.object(sync, "explain_plan", return_value=plan):
+                with patch.object(
+                    sync,
+                    "_sample_filters",
+                    side_effect=[
+                        {"book": [{"isbn": "001"}]},
+                        {"publisher": [{"id": 1}]},
+                    ],
+                ):
+                    sync.explain()
+            writes: list = [
+                args[0] for args, _ in mock_sys.stdout.write.call_args_list
+            ]
+        assert (
+            "Query: sync by public.publisher keys: estimated cost per "
+            "1,000 docs 10,000.0\n"
+        ) in writes
+        # sequential scans are only flagged on the filtered queries
+        assert (
+            writes.count(
+                "  public.publisher: Sequential scan on publisher "
+                "(~1 rows)\n"
+            )
+            == 2
+        )
+        # the index is suggested once
+        assert len([write for write in writes if "CREATE INDEX" in write]) == 1
+
+    def test_sync_explain_composite_key(self, sync):
+        """Test EXPLAIN ANALYZE runs with composite sample keys."""
+        with patch("pgsync.sync.sys") as mock_sys:
+            with patch.object(
+                sync, "explain_plan", wraps=sync.explain_plan
+            ) as mock_explain_plan:
+                with patch.object(
+                    sync,
+                    "_sample_filters",
+                    side_effect=[
+                        {"book": [{"isbn": "001", "title": "It"}]},
+                        {"publisher": [{"id": 1, "name": "Oxford"}]},
+                    ],
+                ):
+                    sync.explain()
+            writes: list = [
+                args[0] for args, _ in mock_sys.stdout.write.call_args_list
+            ]
+        assert [
+            kwargs["analyze"] for _, kwargs in mock_explain_plan.call_args_list
+        ] == [False, False, True, True]
+        assert any(
+            write.startswith("Query: sync by public.publisher keys")
+            for write in writes
+        )
+
     def test_sync_analyze(self, sync):
         with patch("pgsync.sync.sys") as mock_sys:
             sync.analyze()
@@ -1249,6 +1683,35 @@ class TestSync(object):
         for _ in sync._payloads(payloads):
             pass
 
+    @patch.object(settings, "FILTER_CHUNK_SIZE", 2)
+    def test__plan_filters(self, sync):
+        node = sync.tree.get_node("publisher", "public")
+        filters: dict = {
+            "book": [
+                {"isbn": "003"},
+                {"isbn": "001"},
+                {"isbn": "003"},
+                {"isbn": "002"},
+            ],
+            "publisher": [{"id": 2}, {"id": 1}, {"id": 2}],
+        }
+        # one query per root batch, not one per chunk combination
+        assert list(sync._plan_filters(node, filters)) == [
+            {
+                "book": [{"isbn": "001"}, {"isbn": "002"}],
+                "publisher": [{"id": 1}, {"id": 2}],
+            },
+            {
+                "book": [{"isbn": "003"}],
+                "publisher": [{"id": 1}, {"id": 2}],
+            },
+        ]
+        assert list(sync._plan_filters(node, {"book": []})) == []
+        assert sync._unique_filters([{"id": None}, {"id": 1}]) == [
+            {"id": None},
+            {"id": 1},
+        ]
+
     def test_payloads_invalid_tg_op(self, mocker, sync):
         payloads: t.List[Payload] = [
             Payload(
@@ -1280,16 +1743,10 @@ class TestSync(object):
                 importlib.reload(settings)
                 for _ in sync._payloads(payloads):
                     pass
-        assert mock_sync.call_count == 25
-        assert mock_sync.call_args_list[-1] == call(
-            filters={
-                "book": [
-                    {"isbn": "002"},
-                    {"isbn": "002"},
-                    {"isbn": "002"},
-                    {"isbn": "002"},
-                ]
-            },
+        # duplicate keys collapse into a single query
+        mock_sync.assert_called_once_with(
+            filters={"book": [{"isbn": "002"}]},
+            subtree=None,
         )
 
         # updating a child table
@@ -1316,7 +1773,9 @@ class TestSync(object):
                     importlib.reload(settings)
                     for _ in sync._payloads(payloads):
                         pass
-                mock_sync.assert_called_once_with(filters=filters)
+                mock_sync.assert_called_once_with(
+                    filters=filters, subtree=None
+                )
 
     @patch("pgsync.sync.compiled_query")
     def test_sync(self, mock_compiled_query, sync):
@@ -1742,6 +2201,72 @@ class TestSync(object):
             if checkpoint_path.exists():
                 checkpoint_path.unlink()
 
+    def test_checkpoint_wal_lsn(self, sync):
+        """Test the WAL position is stored alongside the checkpoint."""
+        with override_env_var(REDIS_CHECKPOINT="False"):
+            importlib.reload(settings)
+            sync._set_checkpoint(54321, wal_lsn="0/16B3748")
+            assert sync.checkpoint == 54321
+            assert sync.checkpoint_wal_lsn == "0/16B3748"
+
+            with patch.object(
+                sync, "confirmed_flush_lsn", return_value="0/16B3740"
+            ):
+                assert sync._slot_covers_checkpoint() is True
+            with patch.object(
+                sync, "confirmed_flush_lsn", return_value="0/16B3750"
+            ):
+                assert sync._slot_covers_checkpoint() is False
+
+            # a checkpoint without a position can't be caught up from
+            sync.checkpoint = 54322
+            assert sync.checkpoint == 54322
+            assert sync.checkpoint_wal_lsn is None
+            assert sync._slot_covers_checkpoint() is False
+
+            os.unlink(sync.checkpoint_file)
+
+    def test_watermarks(self, sync):
+        """Test the watermark of each table is persisted."""
+        with override_env_var(REDIS_CHECKPOINT="False"):
+            importlib.reload(settings)
+            assert sync.watermarks == {}
+            sync.watermarks = {"public.book": "2024-01-01 00:00:00"}
+            assert sync.watermarks == {"public.book": "2024-01-01 00:00:00"}
+            os.unlink(f"{sync.checkpoint_file}.watermarks")
+
+    def test__watermark_value(self):
+        assert Sync._watermark_value(None) is None
+        assert Sync._watermark_value(7) == 7
+        assert Sync._watermark_value("a") == "a"
+        assert (
+            Sync._watermark_value(datetime(2024, 1, 1))
+            == "2024-01-01 00:00:00"
+        )
+
+    def test__watermark_floor(self):
+        table = sa.Table(
+            "watermark",
+            sa.MetaData(),
+            sa.Column("updated_at", sa.DateTime),
+            sa.Column("seq", sa.Integer),
+            sa.Column("code", sa.String),
+        )
+        with patch.object(settings, "WATERMARK_LAG", 30.0):
+            floor = Sync._watermark_floor(
+                table.c.updated_at, "2024-01-01 00:00:00"
+            )
+            params = floor.compile(dialect=postgresql.dialect()).params
+            assert timedelta(seconds=30) in params.values()
+            assert "2024-01-01 00:00:00" in params.values()
+            floor = Sync._watermark_floor(table.c.seq, 100)
+            params = floor.compile(dialect=postgresql.dialect()).params
+            assert sorted(params.values()) == [30.0, 100]
+            # text has no distance to step back by
+            assert Sync._watermark_floor(table.c.code, "m") == "m"
+        with patch.object(settings, "WATERMARK_LAG", 0.0):
+            assert Sync._watermark_floor(table.c.seq, 100) == 100
+
     def test_checkpoint_setter_none_raises_error(self, sync):
         """Test that setting checkpoint to None raises TypeError."""
         with pytest.raises(TypeError) as excinfo:
@@ -1971,21 +2496,26 @@ class TestSync(object):
         assert sync.tree.root is not None
         assert sync.tree.root.table == "book"
 
-    @patch("pgsync.sync.Sync.logical_slot_get_changes")
-    def test_truncate_slots_when_truncate_true(self, mock_changes, sync):
-        """Test _truncate_slots calls logical_slot_get_changes when _truncate is True."""
+    @patch("pgsync.sync.Sync.confirmed_flush_lsn", return_value=None)
+    @patch("pgsync.sync.Sync.replication_slot_advance")
+    def test_truncate_slots_when_truncate_true(
+        self, mock_advance, mock_lsn, sync
+    ):
+        """Test _truncate_slots advances the slot when _truncate is True."""
         sync._truncate = True
+        sync._checkpoint_lsn = "0/10"
         sync._truncate_slots()
-        mock_changes.assert_called_once_with(
-            "testdb_testdb", upto_nchanges=None
-        )
+        mock_advance.assert_called_once_with("testdb_testdb", "0/10")
+        sync._checkpoint_lsn = None
 
-    @patch("pgsync.sync.Sync.logical_slot_get_changes")
-    def test_truncate_slots_when_truncate_false(self, mock_changes, sync):
+    @patch("pgsync.sync.Sync.replication_slot_advance")
+    def test_truncate_slots_when_truncate_false(self, mock_advance, sync):
         """Test _truncate_slots does nothing when _truncate is False."""
         sync._truncate = False
+        sync._checkpoint_lsn = "0/10"
         sync._truncate_slots()
-        mock_changes.assert_not_called()
+        mock_advance.assert_not_called()
+        sync._checkpoint_lsn = None
 
     def test_validate_raises_for_invalid_schema(self, sync):
         """Test validate raises SchemaError for incompatible schema."""
@@ -2456,6 +2986,428 @@ class TestWALStreaming:
         assert call_kwargs["decode"] is True
         assert "include-xids" in call_kwargs["options"]
 
+    @patch("pgsync.sync.pg_logical_repl_conn")
+    @patch("pgsync.sync.logger")
+    def test_wal_consumer_starts_pgoutput_replication(
+        self, mock_logger, mock_conn_func
+    ):
+        """Test wal_consumer streams pgoutput when WAL_PLUGIN=pgoutput."""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_conn_func.return_value = mock_conn
+
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        sync.wal = True
+        mock_cursor.consume_stream = Mock(side_effect=KeyboardInterrupt)
+
+        with patch.object(settings, "WAL_PLUGIN", "pgoutput"):
+            assert sync.plugin == "pgoutput"
+            with pytest.raises(KeyboardInterrupt):
+                sync.wal_consumer()
+
+        call_kwargs = mock_cursor.start_replication.call_args[1]
+        assert call_kwargs["decode"] is False
+        assert call_kwargs["options"]["proto_version"] == "1"
+        assert (
+            call_kwargs["options"]["publication_names"]
+            == sync.publication_name
+        )
+        mock_cursor.consume_stream.assert_called_once_with(
+            sync.consume_pgoutput
+        )
+        assert sync.publication_tables == {("public", "book")}
+        sync.wal = False
+
+    @patch("pgsync.sync.logger")
+    def test_consume_pgoutput(self, mock_logger):
+        """Test consume_pgoutput buffers decoded rows and ACKs COMMIT."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        cursor = Mock()
+        sync._buffer = []
+        sync._decoder = Mock()
+        payload = Payload(
+            tg_op="INSERT", table="book", schema="public", new={"isbn": "1"}
+        )
+        sync._decoder.decode.return_value = (b"I", [payload])
+        sync.consume_pgoutput(
+            Mock(payload=b"I...", data_start=100, cursor=cursor)
+        )
+        assert sync._buffer == [payload]
+        assert sync._buffer_last_lsn == 100
+
+        sync._decoder.decode.return_value = (b"C", [])
+        with patch.object(sync, "_flush_buffer") as mock_flush:
+            sync.consume_pgoutput(
+                Mock(payload=b"C...", data_start=200, cursor=cursor)
+            )
+            mock_flush.assert_called_once_with(
+                cursor=cursor, flush_lsn=200, force_ack=True
+            )
+        sync._buffer = []
+        sync._decoder = None
+
+    @patch("pgsync.sync.logger")
+    def test_flush_buffer_hands_off_to_flush_worker(self, mock_logger):
+        """Test a full flush queue decouples decoding from indexing."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        cursor = Mock()
+        payload = Payload(
+            tg_op="INSERT", table="book", schema="public", new={"isbn": "1"}
+        )
+        sync._flush_queue = queue.Queue(maxsize=2)
+        sync._buffer = [payload]
+        sync._buffer_last_lsn = 90
+        try:
+            with patch.object(sync, "_bulk_payloads") as mock_bulk:
+                sync._flush_buffer(cursor, flush_lsn=100, force_ack=True)
+                # nothing is indexed or ACKed by the stream reader
+                mock_bulk.assert_not_called()
+                cursor.send_feedback.assert_not_called()
+                assert sync._buffer == []
+                assert sync._flush_queue.get_nowait() == ([payload], 100)
+
+                # feedback only follows what the worker has indexed
+                sync._acked_lsn = 100
+                sync._flush_buffer(cursor, flush_lsn=200, force_ack=True)
+                sync._flush_buffer(cursor, flush_lsn=300, force_ack=True)
+                cursor.send_feedback.assert_called_once_with(
+                    flush_lsn=100, force=True
+                )
+                assert sync._flush_queue.qsize() == 2
+        finally:
+            sync._flush_queue = None
+            sync._acked_lsn = None
+            sync._feedback_lsn = None
+
+    @patch("pgsync.sync.logger")
+    def test_flush_worker_acks_in_order(self, mock_logger):
+        """Test the flush worker indexes batches before marking them acked."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        payload = Payload(
+            tg_op="INSERT", table="book", schema="public", new={"isbn": "1"}
+        )
+        acked: list = []
+        sync._flush_queue = queue.Queue()
+        for item in [([payload], 100), ([], 150), None]:
+            sync._flush_queue.put(item)
+        try:
+            with patch.object(
+                sync,
+                "_bulk_payloads",
+                side_effect=lambda payloads: acked.append(sync._acked_lsn),
+            ) as mock_bulk:
+                sync.flush_worker().join(timeout=5)
+                mock_bulk.assert_called_once_with([payload])
+            # the first batch was indexed before anything was acked
+            assert acked == [None]
+            assert sync._acked_lsn == 150
+        finally:
+            sync._flush_queue = None
+            sync._acked_lsn = None
+
+    @patch("pgsync.sync.pg_logical_repl_conn")
+    @patch("pgsync.sync.logger")
+    def test_wal_consumer_drains_flush_worker(
+        self, mock_logger, mock_conn_func
+    ):
+        """Test wal_consumer indexes queued batches before returning."""
+        mock_cursor = Mock()
+        mock_conn_func.return_value.cursor.return_value = mock_cursor
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        payload = Payload(
+            tg_op="INSERT", table="book", schema="public", new={"isbn": "1"}
+        )
+
+        def read_message():
+            sync._buffer = [payload]
+            sync._flush_buffer(mock_cursor, flush_lsn=100, force_ack=True)
+            raise KeyboardInterrupt
+
+        mock_cursor.read_message = Mock(side_effect=read_message)
+        try:
+            with patch.object(settings, "WAL_FLUSH_QUEUE_SIZE", 1):
+                with patch.object(sync, "_bulk_payloads") as mock_bulk:
+                    with pytest.raises(KeyboardInterrupt):
+                        sync.wal_consumer()
+                    mock_bulk.assert_called_once_with([payload])
+            assert sync._flush_queue is None
+            assert sync._acked_lsn == 100
+        finally:
+            sync._acked_lsn = None
+            sync._feedback_lsn = None
+
+    @patch("pgsync.sync.select.select")
+    def test_consume_stream_acks_while_idle(self, mock_select):
+        """Test batches indexed in the background are ACKed when idle."""
+        from pgsync.sync import consume_stream
+
+        cursor = Mock()
+        cursor.read_message.side_effect = ["m1", None, KeyboardInterrupt]
+        consume, idle = Mock(), Mock()
+        with patch.object(settings, "WAL_FLUSH_QUEUE_SIZE", 2):
+            with pytest.raises(KeyboardInterrupt):
+                consume_stream(cursor, consume, idle=idle)
+        consume.assert_called_once_with("m1")
+        idle.assert_called_once_with(cursor)
+        mock_select.assert_called_once_with(
+            [cursor], [], [], settings.WAL_FEEDBACK_INTERVAL
+        )
+        cursor.consume_stream.assert_not_called()
+
+        # flushed inline, the stream is consumed as before
+        with patch.object(settings, "WAL_FLUSH_QUEUE_SIZE", 0):
+            consume_stream(cursor, consume, idle=idle)
+        cursor.consume_stream.assert_called_once_with(consume)
+
+    @patch("pgsync.sync.logger")
+    def test_idle_sends_acked_feedback(self, mock_logger):
+        """Test the last indexed batch is ACKed on an idle stream."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        cursor = Mock()
+        sync._idle(cursor)
+        cursor.send_feedback.assert_not_called()
+        sync._flush_queue = queue.Queue()
+        sync._acked_lsn = 100
+        try:
+            sync._idle(cursor)
+            sync._idle(cursor)
+            # sent once, not again until the worker acks more
+            cursor.send_feedback.assert_called_once_with(
+                flush_lsn=100, force=True
+            )
+        finally:
+            sync._flush_queue = None
+            sync._acked_lsn = None
+            sync._feedback_lsn = None
+
+    @pytest.mark.usefixtures("table_creator")
+    @patch("pgsync.sync.SearchClient")
+    @patch("pgsync.sync.logger")
+    def test_logical_slot_changes_pages_by_lsn(
+        self, mock_logger, mock_search_client
+    ):
+        """Test each page is advanced past and xids outside the window skipped."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        insert: str = (
+            "table public.book: INSERT: isbn[character varying]:'{}' "
+            "title[character varying]:'x'"
+        )
+        pages: list = [
+            [
+                ROW("BEGIN 10", "10", "0/10"),
+                ROW(insert.format("a"), "10", "0/10"),
+                ROW("COMMIT 10", "10", "0/20"),
+            ],
+            [
+                ROW("BEGIN 11", "11", "0/20"),
+                ROW(insert.format("b"), "11", "0/20"),
+                ROW("COMMIT 11", "11", "0/30"),
+                ROW("BEGIN 12", "12", "0/30"),
+                ROW(insert.format("c"), "12", "0/30"),
+                ROW("COMMIT 12", "12", "0/40"),
+            ],
+            [],
+        ]
+        with (
+            patch.object(
+                sync, "logical_slot_peek_changes", side_effect=pages
+            ) as mock_peek,
+            patch.object(sync, "replication_slot_advance") as mock_advance,
+            patch.object(sync, "logical_slot_count_changes") as mock_count,
+            patch.object(sync, "confirmed_flush_lsn", return_value="0/8"),
+            patch.object(sync.search_client, "bulk") as mock_bulk,
+            patch.object(
+                sync, "_payloads", side_effect=lambda payloads: payloads
+            ),
+            patch.object(sync, "log_lsn_progress") as mock_progress,
+        ):
+            sync.logical_slot_changes(
+                txmin=10,
+                txmax=12,
+                upto_lsn="0/48",
+                logical_slot_chunk_size=3,
+            )
+            assert (
+                mock_peek.call_args_list
+                == [
+                    call(
+                        slot_name="testdb_testdb",
+                        upto_lsn="0/48",
+                        upto_nchanges=3,
+                    )
+                ]
+                * 3
+            )
+            # the exact count is opt-in
+            mock_count.assert_not_called()
+            assert [c.args[:4] for c in mock_progress.call_args_list] == [
+                ("0/8", "0/20", "0/48", 1),
+                ("0/8", "0/40", "0/48", 2),
+            ]
+            assert mock_advance.call_args_list == [
+                call("testdb_testdb", "0/20"),
+                call("testdb_testdb", "0/40"),
+            ]
+            # xid 12 is outside [txmin, txmax)
+            assert [
+                [payload.new["isbn"] for payload in c.args[1]]
+                for c in mock_bulk.call_args_list
+            ] == [["a"], ["b"]]
+            assert sync.checkpoint == 12
+
+        with (
+            patch.object(sync, "logical_slot_peek_changes", return_value=[]),
+            patch.object(
+                sync, "logical_slot_count_changes", return_value=7
+            ) as mock_count,
+            patch.object(sync, "confirmed_flush_lsn", return_value="0/8"),
+            patch("pgsync.sync.settings.LOGICAL_SLOT_COUNT_CHANGES", True),
+        ):
+            sync.logical_slot_changes(upto_lsn="0/48")
+            mock_count.assert_called_once_with(
+                "testdb_testdb", txmin=None, txmax=None, upto_lsn="0/48"
+            )
+
+    @patch("pgsync.sync.SearchClient")
+    def test_truncate_slots_advances_to_checkpoint_lsn(
+        self, mock_search_client
+    ):
+        """Test the slot is advanced to the LSN of the last checkpoint."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        sync._truncate = True
+        with (
+            patch.object(sync, "replication_slot_advance") as mock_advance,
+            patch.object(sync, "confirmed_flush_lsn", return_value="0/20"),
+        ):
+            # no checkpoint yet
+            sync._checkpoint_lsn = None
+            sync._truncate_slots()
+            mock_advance.assert_not_called()
+
+            # the slot is already past the checkpoint
+            sync._checkpoint_lsn = "0/18"
+            sync._truncate_slots()
+            mock_advance.assert_not_called()
+
+            sync._checkpoint_lsn = "0/30"
+            sync._truncate_slots()
+            mock_advance.assert_called_once_with("testdb_testdb", "0/30")
+            mock_advance.reset_mock()
+
+            # a producer only process lags one run behind the WAL position
+            sync.consumer = False
+            sync._checkpoint_lsn = None
+            with patch.object(
+                type(sync),
+                "current_wal_lsn",
+                new_callable=PropertyMock,
+                side_effect=["0/40", "0/50"],
+            ):
+                sync._truncate_slots()
+                mock_advance.assert_not_called()
+                sync._truncate_slots()
+                mock_advance.assert_called_once_with("testdb_testdb", "0/40")
+                assert sync._checkpoint_lsn == "0/50"
+        sync.consumer = True
+        sync._truncate = False
+        sync._checkpoint_lsn = None
+
+    @patch("pgsync.sync.SearchClient")
+    def test_log_lsn_progress(self, mock_search_client):
+        """Test catch-up progress is rendered from LSN positions."""
+        sync = Sync(
+            {
+                "index": "testdb",
+                "database": "testdb",
+                "nodes": {"table": "book"},
+            },
+            validate=False,
+            repl_slots=False,
+        )
+        with patch("pgsync.sync.sys") as mock_sys:
+            sync.log_lsn_progress(
+                "0/0", "0/100000", "0/400000", 3000, 2.0, bar_length=4
+            )
+            line: str = mock_sys.stdout.write.call_args[0][0]
+            assert "[=---] 1.0/4.0 MB ( 25.00%)" in line
+            assert "3,000 changes 1,500/s ETA 0:00:06" in line
+
+            sync.log_lsn_progress(
+                "0/0", "0/0", "0/400000", 0, 0.0, total=10, bar_length=4
+            )
+            line = mock_sys.stdout.write.call_args[0][0]
+            assert "0/10 changes 0/s ETA -:--:--" in line
+
+            # nothing to catch up on
+            sync.log_lsn_progress("0/10", "0/10", "0/10", 0, 1.0)
+            line = mock_sys.stdout.write.call_args[0][0]
+            assert "(100.00%)" in line
+
     @patch("pgsync.sync.show_settings")
     @patch("pgsync.sync.validate_config")
     @patch("pgsync.sync.config_loader")
@@ -2535,6 +3487,110 @@ class TestWALStreaming:
         sync_instance.wal_consumer.assert_called_once()
         assert len(started_threads) == 0
 
+    @patch("pgsync.sync.show_settings")
+    @patch("pgsync.sync.validate_config")
+    @patch("pgsync.sync.config_loader")
+    @patch("pgsync.sync.WALReader")
+    @patch("pgsync.sync.Sync")
+    def test_main_wal_same_database_shares_reader(
+        self,
+        MockSync,
+        MockWALReader,
+        mock_config_loader,
+        _mock_validate,
+        _mock_show,
+    ):
+        """Test schema entries for one database share a WAL reader."""
+        import tempfile
+
+        from click.testing import CliRunner
+
+        from pgsync.sync import main
+
+        mock_config_loader.return_value = [
+            {"database": "db1", "index": "idx1", "nodes": {"table": "t1"}},
+            {"database": "db1", "index": "idx2", "nodes": {"table": "t2"}},
+        ]
+        sync_instances = [Mock(database="db1"), Mock(database="db1")]
+        MockSync.side_effect = sync_instances
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as tmp:
+            with patch.object(settings, "WAL_SHARED_READER", True):
+                runner = CliRunner()
+                runner.invoke(main, ["--wal", "-c", tmp.name])
+
+        MockWALReader.assert_called_once_with(sync_instances)
+        MockWALReader.return_value.run.assert_called_once()
+        for s in sync_instances:
+            s.wal_consumer.assert_not_called()
+
+    @patch("pgsync.sync.show_settings")
+    @patch("pgsync.sync.validate_config")
+    @patch("pgsync.sync.config_loader")
+    @patch("pgsync.sync.Sync")
+    def test_main_parallel_exceeds_pool(
+        self, MockSync, mock_config_loader, _mock_validate, _mock_show
+    ):
+        """Test --parallel beyond the connection pool is rejected."""
+        import tempfile
+
+        from click.testing import CliRunner
+
+        from pgsync.sync import main
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as tmp:
+            with patch("pgsync.sync.parallel_workers", return_value=3):
+                runner = CliRunner()
+                result = runner.invoke(
+                    main, ["--parallel", "4", "-c", tmp.name]
+                )
+
+        assert result.exit_code == 2
+        assert "--parallel" in result.output
+        MockSync.assert_not_called()
+
+    def test_wal_reader_fans_out_and_acks_minimum(self):
+        """Test the shared reader decodes once and ACKs the minimum LSN."""
+        from pgsync.sync import WALReader
+
+        book = Mock(
+            slot_name="db_book", publication_tables={("public", "book")}
+        )
+        book.confirmed_flush_lsn.return_value = "0/20"
+        author = Mock(
+            slot_name="db_author", publication_tables={("public", "author")}
+        )
+        author.confirmed_flush_lsn.return_value = "0/10"
+        reader = WALReader([book, author])
+        reader._cursor = Mock()
+        # the slot furthest behind is streamed
+        assert reader.leader is author
+
+        payload = Payload(
+            tg_op="INSERT", table="book", schema="public", new={"id": 1}
+        )
+        author.parse_logical_slot.return_value = payload
+        message = Mock(payload="table public.book: INSERT: id[integer]:1")
+        message.data_start = 100
+        reader.consume(message)
+        author.parse_logical_slot.assert_called_once_with(message.payload)
+        book._buffer_payload.assert_called_once_with(
+            reader._cursors["db_book"], payload, 100
+        )
+        author._buffer_payload.assert_not_called()
+
+        # feedback waits for every subscriber and sends the minimum
+        reader.confirm("db_book", 200)
+        reader._cursor.send_feedback.assert_not_called()
+        reader._cursors["db_author"].send_feedback(flush_lsn=150, force=True)
+        reader._cursor.send_feedback.assert_called_once_with(
+            flush_lsn=150, force=True
+        )
+        reader.confirm("db_author", 300)
+        reader._cursor.send_feedback.assert_called_with(
+            flush_lsn=200, force=True
+        )
+
 
 # ============================================================================
 # POLL_DB TESTS - Lines 1687-1750 (Producer thread)
@@ -3132,7 +4188,7 @@ class TestSyncEdgeCases:
     def test_sync_with_plugins(self, sync):
         """Test sync applies plugins to documents."""
         mock_plugin = Mock()
-        mock_plugin.transform.return_value = iter(
+        mock_plugin.transform_batch.return_value = iter(
             [
                 {
                     "_id": "001",
@@ -3150,10 +4206,13 @@ class TestSyncEdgeCases:
                 [(["001"], {"isbn": "001"}, ["001"])]
             )
 
-            list(sync.sync())
+            docs = list(sync.sync())
 
-            # Plugin should be called
-            mock_plugin.transform.assert_called()
+            # Plugins get the docs in batches
+            mock_plugin.transform_batch.assert_called_once_with(
+                ANY, chunk_size=settings.PLUGIN_BATCH_SIZE
+            )
+            assert docs[0]["_source"]["modified"] is True
 
     def test_sync_verbose_mode(self, sync):
         """Test sync verbose mode prints debug info."""
@@ -3171,6 +4230,120 @@ class TestSyncEdgeCases:
                 # Should print debug info
                 assert mock_print.called
 
+    def test_sync_reuses_bound_query(self, sync):
+        """Test sync builds one query per filter shape and binds values."""
+        sync._queries = {}
+        with patch.object(sync, "fetchmany") as mock_fetch:
+            mock_fetch.return_value = iter([])
+            list(sync.sync(filters={"book": [{"isbn": "001"}]}))
+            statement = mock_fetch.call_args[0][0]
+            assert mock_fetch.call_args[1]["params"] == {
+                "book_0_isbn": ["001"]
+            }
+
+            mock_fetch.return_value = iter([])
+            with patch.object(sync, "_build_queries") as mock_build:
+                list(
+                    sync.sync(
+                        filters={"book": [{"isbn": "002"}, {"isbn": "003"}]}
+                    )
+                )
+                mock_build.assert_not_called()
+            assert mock_fetch.call_args[0][0] is statement
+            assert mock_fetch.call_args[1]["params"] == {
+                "book_0_isbn": ["002", "003"]
+            }
+        assert len(sync._queries) == 1
+
+    @pytest.mark.skipif(
+        IS_MYSQL_COMPAT,
+        reason="Skipped because IS_MYSQL_COMPAT env var is set",
+    )
+    @patch.object(settings, "JSON_PASSTHROUGH", True)
+    def test_sync_passthrough(self, sync):
+        """Test sync passes the document through as JSON text."""
+        sync.search_client.raw_json = True
+        assert sync.passthrough is True
+        with patch.object(sync, "fetchmany") as mock_fetch:
+            mock_fetch.return_value = iter(
+                [([], '{"isbn": "001", "title": "It"}', ["001"])]
+            )
+            docs = list(sync.sync())
+        assert docs[0]["_id"] == "001"
+        assert json.loads(docs[0]["_source"]) == {
+            "isbn": "001",
+            "title": "It",
+            "_meta": {"book": {"isbn": ["001"]}},
+        }
+
+        sync.routing = "isbn"
+        assert sync.passthrough is False
+
+    def test__subtree(self, sync):
+        """Test a child change is confined to its branch of the doc."""
+        node = sync.tree.get_node("publisher", "public")
+        assert sync._subtree(node) is None
+        with override_env_var(PARTIAL_UPDATES="True"):
+            importlib.reload(settings)
+            assert sync._subtree(node) is node
+            # the root document is always re-indexed in full
+            assert sync._subtree(sync.tree.root) is None
+            sync.pipeline = "pipeline"
+            assert sync._subtree(node) is None
+            sync.pipeline = None
+        importlib.reload(settings)
+
+    def test_sync_partial(self, sync):
+        """Test a branch of the doc is sent as a partial update."""
+        node = sync.tree.get_node("publisher", "public")
+        with patch.object(sync, "fetchmany") as mock_fetch:
+            mock_fetch.return_value = iter(
+                [
+                    (
+                        [{"publisher": {"id": [1]}}],
+                        {"isbn": "001", "publisher": {"id": 1}},
+                        ["001"],
+                    )
+                ]
+            )
+            docs = list(
+                sync.sync(filters={"book": [{"isbn": "001"}]}, subtree=node)
+            )
+        assert docs[0]["_op_type"] == "update"
+        assert "_source" not in docs[0]
+        assert docs[0]["doc"] == {
+            "isbn": "001",
+            "publisher": {"id": 1},
+            "_meta": {
+                "publisher": {"id": [1]},
+                "book": {"isbn": ["001"]},
+            },
+        }
+
+    def test_sync_skips_unchanged(self, sync):
+        """Test docs that hash the same as last indexed are not resent."""
+        rows = [([], {"isbn": "001", "title": "It"}, ["001"])]
+        filters: dict = {"book": [{"isbn": "001"}]}
+        with override_env_var(FINGERPRINT_STORE="memory"):
+            importlib.reload(settings)
+            with patch.object(sync, "fetchmany") as mock_fetch:
+                mock_fetch.side_effect = lambda *args, **kwargs: iter(rows)
+                assert len(list(sync.sync(filters=filters))) == 1
+                # unacknowledged docs are resent
+                assert len(list(sync.sync(filters=filters))) == 1
+                sync.search_client.acknowledge(["001"], [])
+                assert list(sync.sync(filters=filters)) == []
+                # a full load resends every doc
+                assert len(list(sync.sync())) == 1
+            sync._fingerprints = None
+        importlib.reload(settings)
+
+    def test__append_meta(self):
+        assert Sync._append_meta('{"a": 1} ', {"b": {}}) == (
+            '{"a": 1, "_meta": {"b": {}}}'
+        )
+        assert Sync._append_meta("{}", {}) == '{"_meta": {}}'
+
     def test_payload_data_property_update_op(self):
         """Test Payload.data property for UPDATE operation."""
         payload = Payload(
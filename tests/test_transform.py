@@ -919,3 +919,178 @@ class TestTransform(object):
         assert result == {}
         result = Transform._replace([1, 2, 3], nodes)
         assert result == {}
+
+    def test_compile(self):
+        """Test the compiled plan only visits the fields with rules."""
+        nodes = {
+            "table": "book",
+            "transform": {
+                "rename": {"isbn": "id"},
+                "concat": {
+                    "columns": ["id", "title"],
+                    "destination": "key",
+                    "delimiter": "-",
+                },
+            },
+            "children": [
+                {
+                    "table": "publisher",
+                    "transform": {"replace": {"name": {"a": "A"}}},
+                },
+                {"table": "author", "label": "authors"},
+            ],
+        }
+        plan = Transform.compile(nodes)
+        assert plan
+        assert plan.fields == {"publisher"}
+        assert list(plan.children) == ["publisher"]
+        assert not Transform.compile({"table": "book"})
+
+        authors: list = [{"name": "ann"}]
+        row = plan.apply(
+            {
+                "isbn": "001",
+                "title": "It",
+                "publisher": {"name": "banana"},
+                "authors": authors,
+            }
+        )
+        assert row == {
+            "id": "001",
+            "title": "It",
+            "publisher": {"name": "bAnAnA"},
+            "authors": [{"name": "ann"}],
+            "key": "001-It",
+        }
+        # fields without rules are left untouched
+        assert row["authors"] is authors
+
+    def test_get_does_not_modify_nodes(self):
+        """Test get merges the child transforms into a copy."""
+        nodes = {
+            "table": "book",
+            "transform": {"rename": {"isbn": "id"}},
+            "children": [
+                {
+                    "table": "publisher",
+                    "transform": {"rename": {"name": "pub"}},
+                },
+            ],
+        }
+        assert Transform.get(nodes, RENAME_TRANSFORM) == {
+            "isbn": "id",
+            "publisher": {"name": "pub"},
+        }
+        assert nodes["transform"]["rename"] == {"isbn": "id"}
+
+    def test_get_primary_keys_fan_out(self):
+        """Test keys repeated across many children are merged once."""
+        primary_keys = [
+            {"book": {"isbn": ["001"]}},
+            [
+                {"author": [{"id": [i % 10]}], "city": {"id": i % 3}}
+                for i in range(1000, 0, -1)
+            ],
+            {"tag": []},
+        ]
+        assert Transform.get_primary_keys(primary_keys) == {
+            "book": {"isbn": ["001"]},
+            "author": {"id": list(range(10))},
+            "city": {"id": [0, 1, 2]},
+            "tag": {},
+        }
+
+    def test_pushdown(self):
+        """Test the rules the query can apply are split from the rest."""
+        transform = {
+            "rename": {"isbn": "id", "tags": "labels", "meta": {"a": "b"}},
+            "replace": {"code": {"-": "="}, "tags": {"-": "="}},
+            "concat": [
+                {"columns": ["id", "code", "x"], "destination": "key"},
+                {"columns": ["id", "price"], "destination": "other"},
+                {"columns": ["id"], "destination": "last"},
+            ],
+        }
+        pushed, residual = Transform.pushdown(
+            transform,
+            ["isbn", "code", "tags", "price", "meta"],
+            {"isbn", "code"},
+        )
+        assert pushed == {
+            "replace": {"code": {"-": "="}},
+            "rename": {"isbn": "id"},
+            "concat": [
+                {"columns": ["id", "code", "x"], "destination": "key"},
+            ],
+        }
+        # tags is not text, so its replace and rename stay in Python
+        assert residual == {
+            "replace": {"tags": {"-": "="}},
+            "rename": {"tags": "labels", "meta": {"a": "b"}},
+            "concat": [
+                {"columns": ["id", "price"], "destination": "other"},
+                {"columns": ["id"], "destination": "last"},
+            ],
+        }
+
+    def test_pushdown_keeps_names(self):
+        """Test renames the rules left in Python depend on stay in Python."""
+        # clashes with another field, or a child with rules of its own
+        pushed, residual = Transform.pushdown(
+            {"rename": {"isbn": "title", "publisher": "pub"}},
+            ["isbn", "title", "publisher"],
+            {"isbn", "title"},
+            fixed={"publisher"},
+        )
+        assert pushed == {}
+        assert residual == {"rename": {"isbn": "title", "publisher": "pub"}}
+        # renamed to a field another rule renames
+        pushed, residual = Transform.pushdown(
+            {"rename": {"isbn": "id", "id": 42}}, ["isbn"], {"isbn"}
+        )
+        assert pushed == {}
+        # the concat destination is an existing field
+        pushed, residual = Transform.pushdown(
+            {"concat": {"columns": ["isbn"], "destination": "title"}},
+            ["isbn", "title"],
+            {"isbn", "title"},
+        )
+        assert pushed == {}
+        assert residual == {
+            "concat": [{"columns": ["isbn"], "destination": "title"}]
+        }
+        assert Transform.pushdown({}, ["isbn"], {"isbn"}) == ({}, {})
+
+    def test_pushdown_empty_search(self):
+        """Test replace rules with an empty search string stay in Python."""
+        # REPLACE(x, '', 'y') is x, but Python inserts y between each char
+        pushed, residual = Transform.pushdown(
+            {"replace": {"isbn": {"": "-"}, "title": {"a": "b"}}},
+            ["isbn", "title"],
+            {"isbn", "title"},
+        )
+        assert pushed == {"replace": {"title": {"a": "b"}}}
+        assert residual == {"replace": {"isbn": {"": "-"}}}
+
+    def test_pushdown_matches_transform(self):
+        """Test the pushed down and residual rules give the same doc."""
+        transform = {
+            "rename": {"isbn": "id", "price": "cost"},
+            "replace": {"code": {"-": "=", "_": " "}},
+            "concat": [
+                {"columns": ["id", "code", "x"], "destination": "key"},
+                {"columns": ["cost", "key"], "destination": "summary"},
+            ],
+        }
+        row = {"isbn": "001", "code": "a-b_c", "price": 0, "title": ""}
+        pushed, residual = Transform.pushdown(
+            transform, list(row), {"isbn", "code", "title"}
+        )
+        assert pushed["concat"] == transform["concat"][:1]
+        # what the query returns with the pushed down rules
+        queried = {"id": "001", "code": "a=b c", "price": 0, "title": ""}
+        queried["cost"] = queried.pop("price")
+        queried["key"] = "001a=b cx"
+        assert Transform.compile({"transform": residual}).apply(
+            queried
+        ) == Transform.transform(dict(row), {"transform": transform})
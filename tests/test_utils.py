@@ -366,6 +366,27 @@ class TestFormatNumber:
         assert result == "2,500,000"
 
 
+class TestLsnToInt:
+    """Tests for the lsn_to_int utility function."""
+
+    def test_lsn_to_int(self):
+        """Test lsn_to_int combines the high and low 32 bits."""
+        from pgsync.utils import lsn_to_int
+
+        assert lsn_to_int("0/0") == 0
+        assert lsn_to_int("0/16B6A28") == 0x16B6A28
+        assert lsn_to_int("16/B374D848") == (0x16 << 32) + 0xB374D848
+        assert lsn_to_int("1/0") - lsn_to_int("0/FFFFFFFF") == 1
+
+    def test_int_to_lsn(self):
+        """Test int_to_lsn is the inverse of lsn_to_int."""
+        from pgsync.utils import int_to_lsn, lsn_to_int
+
+        assert int_to_lsn(0) == "0/0"
+        assert int_to_lsn(0x16B6A28) == "0/16B6A28"
+        assert int_to_lsn(lsn_to_int("16/B374D848")) == "16/B374D848"
+
+
 class TestMutuallyExclusiveOption:
     """Tests for MutuallyExclusiveOption."""
 